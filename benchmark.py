@@ -0,0 +1,170 @@
+"""Simulator benchmarks.
+
+The benchmarks use hand-assembled programs, so no RISC-V toolchain is needed.
+Run with:
+
+```
+python3 benchmark.py
+```
+"""
+import time
+import tracemalloc
+from pyv.context import SimContext
+from pyv.models.singlecycle import SingleCycleModel
+from pyv.module import Module
+from pyv.port import Input
+from pyv.reg import Reg, RegArray
+from pyv.simulator import Simulator
+
+# programs/loop_acc
+LOOP_ACC = [
+    0x00001137,  # li sp,4096
+    0x0040006f,  # j main
+    0x000012b7,  # lui x5,1
+    0x3e800113,  # li x2,1000
+    0x00000093,  # li x1,0
+    0x00108093,  # addi x1,x1,1
+    0xfe209ee3,  # bne x1,x2,loop
+    0x0012a023,  # sw x1,0(x5)
+    0x0000006f,  # j end
+]
+
+
+def words_to_bytes(words: list[int]) -> list[int]:
+    return [(w >> (8 * i)) & 0xff for w in words for i in range(4)]
+
+
+def run_loop_acc(num_cycles: int, **kwargs) -> tuple[SingleCycleModel, float]:
+    core = SingleCycleModel()
+    core.load_instructions(words_to_bytes(LOOP_ACC))
+
+    start = time.perf_counter()
+    core.run(num_cycles, **kwargs)
+    end = time.perf_counter()
+
+    return core, end - start
+
+
+def result(core: SingleCycleModel):
+    return (
+        core.get_cycles(),
+        [core.readReg(i) for i in range(32)],
+        core.readPC(),
+        core.readDataMem(4096, 4)
+    )
+
+
+def scheduler_modes(num_cycles: int = 2010):
+    print("===== SCHEDULER MODES (loop_acc) =====")
+    results = []
+    for mode in [Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED]:
+        core, t = run_loop_acc(num_cycles, mode=mode)
+        if mode == Simulator.EVENT_DRIVEN:
+            evals = sum(e for e, _ in core.sim.get_queue_stats().values())
+            evals /= num_cycles
+        else:
+            evals = core.sim._schedule.num_methods()
+        print(f"{mode:>6}: {t:.3f}s ({evals:.2f} method evaluations/cycle)")
+        results.append(result(core))
+
+    assert results[0] == results[1], "Results differ between modes!"
+    print("")
+
+
+def fast_forward(num_cycles: int = 20000):
+    print("===== QUIESCENCE FAST-FORWARD (loop_acc) =====")
+    for enabled in [False, True]:
+        core, t = run_loop_acc(num_cycles, fast_forward=enabled)
+        skipped = core.sim.get_skipped_cycles()
+        print(f"fast_forward={enabled!s:<5}: {t:.3f}s ({skipped} cycles skipped)")  # noqa: E501
+    print("")
+
+
+class IdleRegs(Module):
+    """A counter next to many registers that never change."""
+    def __init__(self, num_regs: int):
+        super().__init__()
+        self.cnt = Reg(int, sensitive_methods=[self.process])
+        self.regs = [Reg(int) for _ in range(num_regs)]
+
+    def process(self):
+        self.cnt.next.write(self.cnt.cur.read() + 1)
+
+
+def idle_registers(num_regs: int = 10000, num_cycles: int = 1000):
+    print("===== IDLE REGISTERS =====")
+    Simulator.clear()
+    sim = Simulator()
+    dut = IdleRegs(num_regs)
+    dut.name = 'dut'
+    sim.addObj(dut)
+    sim.init()
+
+    start = time.perf_counter()
+    sim.run(num_cycles)
+    end = time.perf_counter()
+    print(f"{num_regs} idle registers, {num_cycles} cycles: "
+          f"{end - start:.3f}s")
+    print("")
+
+
+def event_queue(num_timers: int = 1000, num_cycles: int = 10000):
+    print("===== EVENT QUEUE =====")
+    Simulator.clear()
+    sim = Simulator()
+    calls = 0
+
+    def callback():
+        nonlocal calls
+        calls += 1
+
+    for i in range(num_timers):
+        sim.post_event_rel(1 + i % 7, callback, period=3 + i % 5)
+
+    start = time.perf_counter()
+    sim.run(num_cycles)
+    end = time.perf_counter()
+    print(f"{num_timers} periodic timers, {num_cycles} cycles: "
+          f"{end - start:.3f}s ({calls} events)")
+    print("")
+
+
+# Measured the same way with py-v 0.6.0 (before the slotted object model)
+BASELINE_BYTES = {'Input(int)': 416, 'Reg(int)': 1457}
+
+
+def _bytes_per_obj(create, num: int) -> float:
+    with SimContext():
+        tracemalloc.start()
+        objs = [create() for _ in range(num)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del objs
+    return size / num
+
+
+def memory_footprint(num: int = 100000):
+    print("===== MEMORY FOOTPRINT =====")
+    port = _bytes_per_obj(lambda: Input(int), num)
+    reg = _bytes_per_obj(lambda: Reg(int), num)
+    arr = _bytes_per_obj(lambda: RegArray(int, 64), num // 64) / 64
+    base_port = BASELINE_BYTES['Input(int)']
+    base_reg = BASELINE_BYTES['Reg(int)']
+    print("                   0.6.0 ->   now")
+    print(f"Input(int)       : {base_port:5} -> {port:5.0f} bytes/port")
+    print(f"Reg(int)         : {base_reg:5} -> {reg:5.0f} bytes/register")
+    print(f"RegArray(int, 64): {base_reg:5} -> {arr:5.0f} bytes/element "
+          "(vs. Reg(int))")
+    print("")
+
+
+def main():
+    scheduler_modes()
+    fast_forward()
+    idle_registers()
+    event_queue()
+    memory_footprint()
+
+
+if __name__ == '__main__':
+    main()
@@ -19,9 +19,6 @@ def execute_bin(
     print("* Loading binary...")
     core.load_binary(path_to_bin)
 
-    # Set probes
-    core.set_probes([])
-
     # Simulate
     print("* Starting simulation...\n")
 
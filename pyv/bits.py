@@ -0,0 +1,253 @@
+"""Fixed-width bit vectors.
+
+`Bits[N]` is an unsigned integer of `N` bits. Values are truncated to the
+width on construction, and arithmetic and bitwise operators wrap around
+like in hardware:
+
+```
+a = Bits[8](0x1ff)      # Bits[8](0xff)
+a + 1                   # Bits[8](0x0)
+a[7:4]                  # Bits[4](0xf), bits 7 down to 4
+a.signed                # -1
+concat(a[3:0], Bits[4](2))  # Bits[8](0xf2)
+```
+
+Like `Struct`, a bit vector *is* an `int`, so it can be compared to (and used
+in place of) plain integers, and is never copied by ports or registers. The
+type `Bits[N]` is created once per width, so it can be used as a port type:
+`Input(Bits[32])`.
+
+Operators combining two bit vectors take the larger of the two widths. All
+other operations (e.g., `//`, `%`, comparisons) behave like on `int`.
+
+For batch processing (e.g., analyzing traces), the `*_array()` class methods
+apply the same operations to NumPy arrays of up to 64 bit values. NumPy is
+optional and only imported when one of these methods is called.
+"""
+
+from typing import Callable
+from pyv.util import COPY_SHARED
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        raise ImportError("ERROR: Array operations of `Bits` require NumPy.")
+    return numpy
+
+
+def _bits(width: int, val: int) -> 'Bits':
+    # Used for pickling, as `Bits[N]` cannot be looked up by name
+    return Bits[width](val)
+
+
+def _binary_op(name: str) -> Callable:
+    op = getattr(int, name)
+
+    def fn(self, other):
+        val = op(self, other)
+        if val is NotImplemented:
+            return val
+        cls = self.__class__
+        if isinstance(other, Bits) and other.width > cls.width:
+            cls = other.__class__
+        return int.__new__(cls, val & cls._mask)
+    return fn
+
+
+class Bits(int):
+    """Base class for fixed-width bit vectors. Use `Bits[N]` to get the type
+    for a given width."""
+
+    __slots__ = ()
+    _copy_mode = COPY_SHARED
+    width: int = 0
+    """Width in bits"""
+    _mask: int = 0
+    _types: dict[int, type] = {}
+
+    def __class_getitem__(cls, width: int) -> type['Bits']:
+        """Returns the bit vector type of the given width.
+
+        Raises:
+            ValueError: Invalid width.
+        """
+        t = Bits._types.get(width)
+        if t is None:
+            if not isinstance(width, int) or width < 1:
+                raise ValueError(f"ERROR: Invalid bit vector width {width}.")
+            t = type(f'Bits[{width}]', (Bits,), {
+                '__slots__': (),
+                '__module__': __name__,
+                'width': width,
+                '_mask': (1 << width) - 1,
+            })
+            Bits._types[width] = t
+        return t
+
+    def __new__(cls, val: int = 0):
+        if not cls.width:
+            raise TypeError("ERROR: Use `Bits[N]` to create a bit vector.")
+        return int.__new__(cls, val & cls._mask)
+
+    def __repr__(self):
+        return f'Bits[{self.width}]({int(self):#x})'
+
+    __str__ = __repr__
+
+    def __len__(self):
+        return self.width
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_bits, (self.width, int(self)))
+
+    def __getitem__(self, key) -> 'Bits':
+        """Returns a single bit (`a[3]`), or a slice of bits (`a[7:4]`, upper
+        index first, both inclusive).
+
+        Raises:
+            IndexError: Index out of range.
+        """
+        if isinstance(key, slice):
+            hi, lo = key.start, key.stop
+            if key.step is not None or not 0 <= lo <= hi < self.width:
+                raise IndexError(
+                    f"ERROR: Invalid slice [{hi}:{lo}] of {self!r}.")
+            return Bits[hi - lo + 1](self >> lo)
+        if not 0 <= key < self.width:
+            raise IndexError(f"ERROR: Bit {key} of {self!r} out of range.")
+        return Bits[1]((self >> key) & 1)
+
+    @property
+    def signed(self) -> int:
+        """The value as a two's complement integer."""
+        sign = 1 << (self.width - 1)
+        return (int(self) ^ sign) - sign
+
+    @property
+    def unsigned(self) -> int:
+        """The value as a plain (non-negative) integer."""
+        return int(self)
+
+    def sext(self, width: int) -> 'Bits':
+        """Sign-extends (or truncates) the value to `width` bits."""
+        return Bits[width](self.signed)
+
+    def zext(self, width: int) -> 'Bits':
+        """Zero-extends (or truncates) the value to `width` bits."""
+        return Bits[width](self)
+
+    def to_list(self) -> list[int]:
+        """Returns the bits of the value, MSB at index 0 (see
+        `pyv.util.get_bit_vector()`)."""
+        val = int(self)
+        return [(val >> i) & 1 for i in range(self.width - 1, -1, -1)]
+
+    __add__ = _binary_op('__add__')
+    __sub__ = _binary_op('__sub__')
+    __mul__ = _binary_op('__mul__')
+    __and__ = _binary_op('__and__')
+    __or__ = _binary_op('__or__')
+    __xor__ = _binary_op('__xor__')
+    __lshift__ = _binary_op('__lshift__')
+    __rshift__ = _binary_op('__rshift__')
+    __radd__ = _binary_op('__radd__')
+    __rsub__ = _binary_op('__rsub__')
+    __rmul__ = _binary_op('__rmul__')
+    __rand__ = _binary_op('__rand__')
+    __ror__ = _binary_op('__ror__')
+    __rxor__ = _binary_op('__rxor__')
+
+    def __invert__(self):
+        return int.__new__(self.__class__, ~int(self) & self._mask)
+
+    def __neg__(self):
+        return int.__new__(self.__class__, -int(self) & self._mask)
+
+    # Batch operations on NumPy arrays
+
+    @classmethod
+    def _check_array_width(cls):
+        if not cls.width or cls.width > 64:
+            raise TypeError(
+                f"ERROR: Array operations support 1 to 64 bits, "
+                f"got {cls.width}.")
+
+    @classmethod
+    def array(cls, values):
+        """Converts values to a `uint64` array, truncated to the width.
+
+        Negative values are taken as two's complement.
+        """
+        np = _numpy()
+        cls._check_array_width()
+        arr = np.asarray(values)
+        if arr.dtype != np.uint64:
+            arr = arr.astype(np.int64).astype(np.uint64)
+        return arr & np.uint64(cls._mask)
+
+    @classmethod
+    def slice_array(cls, arr, hi: int, lo: int):
+        """Returns bits `[hi:lo]` of each element (see `__getitem__()`)."""
+        np = _numpy()
+        cls._check_array_width()
+        if not 0 <= lo <= hi < cls.width:
+            raise IndexError(f"ERROR: Invalid slice [{hi}:{lo}] of {cls}.")
+        mask = np.uint64((1 << (hi - lo + 1)) - 1)
+        return (cls.array(arr) >> np.uint64(lo)) & mask
+
+    @classmethod
+    def signed_array(cls, arr):
+        """Returns the two's complement values of all elements as an `int64`
+        array."""
+        np = _numpy()
+        arr = cls.array(arr)
+        if cls.width == 64:
+            return arr.view(np.int64)
+        sign = 1 << (cls.width - 1)
+        return (arr.astype(np.int64) ^ sign) - sign
+
+    @classmethod
+    def to_bit_matrix(cls, arr):
+        """Returns the bits of each element as a row of a `uint8` matrix, MSB
+        first (see `to_list()`)."""
+        np = _numpy()
+        shifts = np.arange(cls.width - 1, -1, -1, dtype=np.uint64)
+        arr = cls.array(arr)
+        return ((arr[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def concat(*parts: Bits) -> Bits:
+    """Concatenates bit vectors, the first one ending up in the most
+    significant bits (like `{a, b}` in Verilog)."""
+    val = 0
+    width = 0
+    for p in parts:
+        val = (val << p.width) | int(p)
+        width += p.width
+    return Bits[width](val)
+
+
+def concat_array(*parts):
+    """Concatenates arrays element-wise (see `concat()`).
+
+    Args:
+        parts: `(type, array)` pairs, e.g., `(Bits[4], hi), (Bits[8], lo)`.
+            The total width must not exceed 64 bits.
+    """
+    np = _numpy()
+    res = None
+    width = 0
+    for cls, arr in parts:
+        arr = cls.array(arr)
+        res = arr if res is None else (res << np.uint64(cls.width)) | arr
+        width += cls.width
+    Bits[width]._check_array_width()
+    return res
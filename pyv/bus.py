@@ -0,0 +1,139 @@
+"""Memory-mapped I/O.
+
+A `Bus` has the same port interface as a `Memory` and sits between a core
+and its main memory. Accesses are routed either to the RAM or to a device
+(e.g., a timer or a UART), based on the 4 KiB page of the address:
+
+```
+self.mem = Memory(8 * 1024)
+self.bus = Bus(self.mem)
+self.uart = Uart()
+self.bus.attach(self.uart, 0x1000_0000)
+self.mem_stg = MEMStage(self.bus.read_port0, self.bus.write_port)
+```
+
+Routing uses a page table (a dict indexed by page number), so the cost of an
+access does not depend on the number of devices. As long as no device is
+attached, accesses go straight to the RAM.
+"""
+
+from pyv.mem import PAGE_BITS, PAGE_SIZE, MemoryBase
+from pyv.module import Module
+
+
+class Device(Module):
+    """Base class for memory-mapped devices.
+
+    A device covers one or more pages of a `Bus` (see `Bus.attach()`). Both
+    methods get the address relative to the device's base address.
+    """
+
+    def read(self, offset: int, w: int) -> int:
+        """Returns the value of `w` bytes (1, 2, or 4) at `offset`.
+
+        Like all combinational reads, this may be called multiple times per
+        cycle (also with unstable addresses), so it must not have side
+        effects. Defaults to 0.
+        """
+        return 0
+
+    def write(self, offset: int, w: int, wdata: int):
+        """Writes `w` bytes (1, 2, or 4) of `wdata` to `offset`.
+
+        Called on the clock edge. Ignored by default.
+        """
+
+
+class Bus(MemoryBase):
+    """Routes memory accesses to RAM or memory-mapped devices.
+
+    Writes take effect with the clock edge. While read port 0 addresses a
+    device, the read is repeated after each clock edge, so changes of device
+    registers become visible.
+
+    Read port 1 is routed the same way as read port 0.
+    """
+
+    def __init__(self, ram: MemoryBase):
+        """Bus constructor.
+
+        Args:
+            ram (MemoryBase): Memory for all addresses not covered by a
+                device.
+        """
+        super().__init__(name='UnnamedBus')
+        self.ram = ram
+        """Main memory"""
+        # Page number -> (device, base address)
+        self._devices: dict[int, tuple[Device, int]] = {}
+        self._dev_next = False
+        # Fast path: Access the RAM directly until a device gets attached
+        self._read = ram._read
+        self._write = ram._write
+
+        self.read_port0.re_i._add_watcher(self)
+
+    def attach(self, dev: Device, base: int, size: int = PAGE_SIZE):
+        """Attaches a device.
+
+        Args:
+            dev (Device): The device.
+            base (int): Base address. Must be page-aligned (4 KiB).
+            size (int, optional): Size of the address range in bytes. Rounded
+                up to whole pages. Defaults to one page.
+
+        Raises:
+            ValueError: Unaligned base address, invalid size, or the range
+                overlaps with another device.
+        """
+        if base % PAGE_SIZE or base < 0 or size <= 0:
+            raise ValueError(f"ERROR (Bus ({self.name})): Invalid device range at {base:08X} (size {size}). The base address must be page-aligned.")  # noqa: E501
+        start = base >> PAGE_BITS
+        pages = range(start, start + (size + PAGE_SIZE - 1) // PAGE_SIZE)
+        for pn in pages:
+            if pn in self._devices:
+                raise ValueError(f"ERROR (Bus ({self.name})): Device range at {base:08X} (size {size}) overlaps with another device.")  # noqa: E501
+        for pn in pages:
+            self._devices[pn] = (dev, base)
+        self._read = self._dispatch_read
+        self._write = self._dispatch_write
+
+    def get_device(self, addr: int) -> Device:
+        """Returns the device `addr` is routed to, or `None` for RAM."""
+        dev = self._devices.get(addr >> PAGE_BITS)
+        return None if dev is None else dev[0]
+
+    def _dispatch_read(self, addr, w):
+        dev = self._devices.get(addr >> PAGE_BITS)
+        if dev is None:
+            return self.ram._read(addr, w)
+        return dev[0].read(addr - dev[1], w)
+
+    def _dispatch_write(self, addr, w, wdata):
+        dev = self._devices.get(addr >> PAGE_BITS)
+        if dev is None:
+            self.ram._write(addr, w, wdata)
+        else:
+            dev[0].write(addr - dev[1], w, wdata)
+
+    # Overridden per instance by the RAM fast path (see `__init__()`)
+    _read = _dispatch_read
+    _write = _dispatch_write
+
+    def _prepare_next_val(self):
+        super()._prepare_next_val()
+        devices = self._devices
+        self._dev_next = bool(
+            devices
+            and (self.addr_next >> PAGE_BITS) in devices
+            and self.read_port0.re_i.read())
+
+    def _is_idle(self) -> bool:
+        return not self.we_next and not self._dev_next
+
+    def _tick(self):
+        super()._tick()
+        if self._dev_next:
+            # Device registers may have changed with this clock edge
+            self._mark_dirty()
+            self.process_read0()
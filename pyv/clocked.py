@@ -7,36 +7,61 @@ class Clock:
     For now, clocked elements are:
     - Registers
     - Memories
+
+    Each simulation context (`pyv.context.SimContext`) has its own clock.
     """
 
-    @staticmethod
-    def tick():
+    def __init__(self, regs: 'RegList', mems: 'MemList'):
+        self._regs = regs
+        self._mems = mems
+
+    def tick(self) -> bool:
         """Performs a clock tick (rising edge).
 
-        First, saves the current inputs (`RegList.prepare_next_val()`,
-        `MemList.prepare_next_val()`). Then, applies tick to all registers
-        (`RegList.tick()`) and memories (`MemList.tick()`).
+        First, saves the current inputs of all registers and memories. Then,
+        applies tick to them.
+
+        Only elements that have been marked dirty since the last tick (and
+        those that don't support dirty tracking) are visited (see
+        `Clocked._mark_dirty()`).
+
+        Returns:
+            bool: True if the tick left all clocked elements unchanged (see
+                `Clocked._is_idle()`).
         """
-        RegList.prepare_next_val()
-        MemList.prepare_next_val()
-        RegList.tick()
-        MemList.tick()
+        regs = self._regs.take_dirty()
+        mems = self._mems.take_dirty()
+        for r in regs:
+            r._prepare_next_val()
+        for m in mems:
+            m._prepare_next_val()
+        idle = _all_idle(regs) and _all_idle(mems)
+        for r in regs:
+            r._tick()
+        for m in mems:
+            m._tick()
+        return idle
 
-    @staticmethod
-    def reset():
+    def reset(self):
         """Resets registers (`RegList.reset()`) and memories
         (`MemList.reset()`).
         """
-        RegList.reset()
-        MemList.reset()
+        self._regs.reset()
+        self._mems.reset()
 
-    @staticmethod
-    def clear():
+    def clear(self):
         """Clears list of registers (`RegList.clear()`) and memories
         (`MemList.clear()`).
         """
-        RegList.clear()
-        MemList.clear()
+        self._regs.clear()
+        self._mems.clear()
+
+
+def _all_idle(elems: list['Clocked']) -> bool:
+    for e in elems:
+        if not e._is_idle():
+            return False
+    return True
 
 
 class Clocked(ABC):
@@ -45,6 +70,16 @@ class Clocked(ABC):
     Methods `_prepare_next_val()`, `_tick()`, and `_reset()` must be
     implemented by any class inheriting.
     """
+
+    __slots__ = ()
+
+    _track_dirty = False
+    # If True, the element is only visited on a clock edge after it has been
+    # marked dirty (see `_mark_dirty()`). Otherwise, it is visited on every
+    # clock edge.
+    _dirty = False
+    # Whether the element is marked dirty for the next clock edge
+
     @abstractmethod
     def _prepare_next_val(self):
         """Saves current input(s)"""
@@ -57,84 +92,109 @@ class Clocked(ABC):
     def _reset(self):
         """Reset function of individual clocked element."""
 
+    def _is_idle(self) -> bool:
+        """Whether the next tick leaves this element unchanged.
 
-class RegList():
-    """This class keeps track of all instantiated registers.
-    """
-
-    # The list of instantiated registers
-    _reg_list = []
+        Called after `_prepare_next_val()`. Elements that don't override this
+        method are never considered idle.
+        """
+        return False
 
-    @staticmethod
-    def add_to_reg_list(obj):
-        """Adds a register object to the global list of registers.
+    def _mark_dirty(self):
+        """Makes sure this element is visited on the next clock edge.
 
-        Args:
-            obj: The register object
+        Elements with `_track_dirty` set must call this whenever their next
+        state might differ from their current state, e.g., when one of their
+        inputs changes.
         """
-        RegList._reg_list.append(obj)
-
-    @staticmethod
-    def prepare_next_val():
-        """Saves inputs of registers"""
-        for r in RegList._reg_list:
-            r._prepare_next_val()
 
-    @staticmethod
-    def tick():
-        """Ticks all registers."""
-        for r in RegList._reg_list:
-            r._tick()
 
-    @staticmethod
-    def reset():
-        """Resets all registers."""
-        for r in RegList._reg_list:
-            r._reset()
+class _ClockedList():
+    """Keeps track of clocked elements of one kind."""
+
+    def __init__(self):
+        self._elems = []
+        # Elements without dirty tracking
+        self._untracked = []
+        # Elements marked dirty for the next clock edge
+        self._dirty = []
+
+    def _add(self, obj: Clocked):
+        self._elems.append(obj)
+        if obj._track_dirty:
+            obj._dirty = False
+            self.mark_dirty(obj)
+        else:
+            self._untracked.append(obj)
+
+    def mark_dirty(self, obj: Clocked):
+        """Marks an element dirty for the next clock edge."""
+        if not obj._dirty:
+            obj._dirty = True
+            self._dirty.append(obj)
+
+    def take_dirty(self) -> list[Clocked]:
+        """Returns all elements to visit on this clock edge, and resets the
+        dirty set."""
+        dirty = self._dirty
+        self._dirty = []
+        for e in dirty:
+            e._dirty = False
+        return self._untracked + dirty
+
+    def prepare_next_val(self):
+        """Saves inputs of all elements."""
+        for e in self._elems:
+            e._prepare_next_val()
+
+    def tick(self):
+        """Ticks all elements."""
+        for e in self._elems:
+            e._tick()
+
+    def reset(self):
+        """Resets all elements."""
+        for e in self._elems:
+            e._reset()
+
+    def clear(self):
+        """Clears the list of elements."""
+        self._elems = []
+        self._untracked = []
+        self._dirty = []
+
+
+class RegList(_ClockedList):
+    """This class keeps track of all instantiated registers of a simulation
+    context.
+    """
 
-    @staticmethod
-    def clear():
-        """Clears the list of registers."""
-        RegList._reg_list = []
+    def add_to_reg_list(self, obj: Clocked):
+        """Adds a register object to the list of registers.
 
+        Args:
+            obj: The register object
+        """
+        self._add(obj)
 
-class MemList():
-    """Base class for all memories.
+    @property
+    def _reg_list(self) -> list[Clocked]:
+        """The list of instantiated registers"""
+        return self._elems
 
-    This class keeps track of all memories.
-    """
 
-    # List of instantiated memories
-    _mem_list = []
+class MemList(_ClockedList):
+    """This class keeps track of all memories of a simulation context."""
 
-    @staticmethod
-    def add_to_mem_list(obj):
-        """Add memory to global list of memories.
+    def add_to_mem_list(self, obj: Clocked):
+        """Add memory to the list of memories.
 
         Args:
             obj: The memory object.
         """
-        MemList._mem_list.append(obj)
-
-    @staticmethod
-    def prepare_next_val():
-        """Saves inputs of memories."""
-        for m in MemList._mem_list:
-            m._prepare_next_val()
-
-    @staticmethod
-    def tick():
-        """Ticks all memories."""
-        for m in MemList._mem_list:
-            m._tick()
-
-    @staticmethod
-    def reset():
-        """Resets all memories."""
-        for m in MemList._mem_list:
-            m._reset()
+        self._add(obj)
 
-    @staticmethod
-    def clear():
-        """Clears list of memories."""
-        MemList._mem_list = []
+    @property
+    def _mem_list(self) -> list[Clocked]:
+        """List of instantiated memories"""
+        return self._elems
@@ -0,0 +1,118 @@
+"""Simulation contexts.
+
+A `SimContext` owns all state of one simulation: its ports, registers,
+memories, on-stable callbacks, tracing level, and the simulator instance.
+Ports, registers and memories are added to the *current* context of the
+calling thread when they are created. Use a `with` statement to make a
+context current:
+
+```
+with SimContext():
+    model = SingleCycleModel()
+```
+
+Each thread starts with its own default context. As objects keep a reference
+to the context they were created in, multiple models can coexist in one
+process and be simulated interleaved, or in separate threads.
+"""
+
+import threading
+from typing import Callable
+from pyv.clocked import Clock, MemList, RegList
+from pyv.log import Trace
+
+
+class _StableCallback:
+    """On-stable callback that only runs if one of the ports it depends on
+    changed since it last ran."""
+
+    def __init__(self, callback: Callable, ports: list):
+        from pyv.port import Constant
+
+        self.callback = callback
+        # Run in the first cycle no matter what
+        self._dirty = True
+        for p in ports:
+            # Constants never change
+            if not isinstance(p, Constant):
+                p._add_watcher(self)
+
+    def _mark_dirty(self):
+        self._dirty = True
+
+    def __call__(self):
+        if self._dirty:
+            self._dirty = False
+            self.callback()
+
+
+class SimContext:
+    """Holds the state of one simulation."""
+
+    def __init__(self):
+        from pyv.port import PortList
+
+        self.sim = None
+        """The simulator bound to this context (see `Simulator.__init__()`)"""
+        self.ports = PortList()
+        """All ports"""
+        self.regs = RegList()
+        """All registers"""
+        self.mems = MemList()
+        """All memories"""
+        self.clock = Clock(self.regs, self.mems)
+        """The clock driving all registers and memories"""
+        self.stable_callbacks: list[Callable] = []
+        """On-stable callbacks"""
+        self.notify_enabled = True
+        """Whether port value changes are propagated to downstream inputs.
+        This is disabled in the simulator's cycle-based mode, where every
+        process method is evaluated anyway."""
+        self.silent_changes: list = []
+        """Nets whose value changed while propagation was disabled"""
+        self.trace = Trace()
+        """Tracing level (see `Simulator.set_trace_level()`)"""
+
+    def register_stable_callback(
+        self,
+        callback: Callable,
+        depends_on: list = None
+    ):
+        """Registers an on-stable callback.
+
+        See `Simulator.register_stable_callback()`.
+        """
+        if depends_on is not None:
+            callback = _StableCallback(callback, depends_on)
+        self.stable_callbacks.append(callback)
+
+    def clear(self):
+        """Clears lists of registers, memories, ports (and probes), and
+        on-stable callbacks, and turns tracing off."""
+        self.clock.clear()
+        self.ports.clear()
+        self.stable_callbacks = []
+        self.trace.set_level(Trace.OFF)
+
+    def __enter__(self) -> 'SimContext':
+        _stack().append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _stack().pop()
+
+
+_local = threading.local()
+
+
+def _stack() -> list[SimContext]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        # Default context of this thread
+        stack = _local.stack = [SimContext()]
+    return stack
+
+
+def get_context() -> SimContext:
+    """Returns the current simulation context of the calling thread."""
+    return _stack()[-1]
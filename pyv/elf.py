@@ -0,0 +1,183 @@
+"""ELF loader.
+
+Loads 32-bit little-endian RISC-V ELF executables (e.g., the `.out` files
+built in `programs/`) without any external tools:
+
+```
+elf = ElfFile.from_file('programs/fibonacci/fibonacci.out')
+elf.load(mem)           # Places all PT_LOAD segments
+elf.entry               # Start address
+elf.symbols['main']     # Symbol(name='main', addr=..., size=..., type=2)
+elf.lookup(pc)          # Symbol containing the address
+```
+
+Segments are placed at their physical address (`p_paddr`), which is the
+load address also used by `objcopy -O binary`. The part of a segment not
+backed by the file (e.g., `.bss`) is filled with zeros.
+"""
+
+import bisect
+import struct
+from typing import NamedTuple
+
+_EHDR = struct.Struct('<16sHHIIIIIHHHHHH')
+_PHDR = struct.Struct('<IIIIIIII')
+_SHDR = struct.Struct('<IIIIIIIIII')
+_SYM = struct.Struct('<IIIBBH')
+
+_ELFCLASS32 = 1
+_ELFDATA2LSB = 1
+_EM_RISCV = 243
+_PT_LOAD = 1
+_SHT_SYMTAB = 2
+_STT_SECTION = 3
+_STT_FILE = 4
+
+STT_NOTYPE = 0
+"""Symbol type: Unspecified (e.g., labels in assembly code)"""
+STT_OBJECT = 1
+"""Symbol type: Data object"""
+STT_FUNC = 2
+"""Symbol type: Function"""
+
+
+class Segment(NamedTuple):
+    """Loadable segment."""
+    addr: int
+    """Load address"""
+    data: bytes
+    """Contents from the file"""
+    size: int
+    """Size in memory. Bytes beyond `data` are zero."""
+    flags: int
+    """Permission flags (`PF_X` = 1, `PF_W` = 2, `PF_R` = 4)"""
+
+
+class Symbol(NamedTuple):
+    """Entry of the symbol table."""
+    name: str
+    addr: int
+    size: int
+    type: int
+    """Symbol type (`STT_NOTYPE`, `STT_OBJECT`, `STT_FUNC`, ...)"""
+
+
+class ElfFile:
+    """Parsed ELF executable."""
+
+    def __init__(self, data: bytes):
+        """Parses an ELF file.
+
+        Args:
+            data: Contents of the file.
+
+        Raises:
+            ValueError: Not a 32-bit little-endian RISC-V ELF file, or the
+                file is truncated.
+        """
+        data = memoryview(bytes(data))
+        try:
+            (ident, _, machine, _, self.entry, phoff, shoff, _, _,
+             phentsize, phnum, shentsize, shnum, shstrndx
+             ) = _EHDR.unpack_from(data)
+        except struct.error:
+            raise ValueError("ERROR (ELF): File too short.")
+        if ident[:4] != b'\x7fELF':
+            raise ValueError("ERROR (ELF): Not an ELF file.")
+        if ident[4] != _ELFCLASS32 or ident[5] != _ELFDATA2LSB:
+            raise ValueError(
+                "ERROR (ELF): Only 32-bit little-endian files are supported.")
+        if machine != _EM_RISCV:
+            raise ValueError(
+                f"ERROR (ELF): Unsupported machine {machine} (not RISC-V).")
+
+        self.segments: list[Segment] = []
+        """Loadable segments"""
+        self.symbols: dict[str, Symbol] = {}
+        """Symbols by name"""
+
+        try:
+            for i in range(phnum):
+                (ptype, offset, _, paddr, filesz, memsz, flags, _
+                 ) = _PHDR.unpack_from(data, phoff + i * phentsize)
+                if ptype == _PT_LOAD and memsz:
+                    if offset + filesz > len(data):
+                        raise struct.error
+                    self.segments.append(Segment(
+                        paddr, bytes(data[offset:offset + filesz]), memsz,
+                        flags))
+
+            sections = [_SHDR.unpack_from(data, shoff + i * shentsize)
+                        for i in range(shnum)]
+            for sh in sections:
+                if sh[1] == _SHT_SYMTAB:
+                    strtab = sections[sh[6]]
+                    self._read_symbols(
+                        data[sh[4]:sh[4] + sh[5]],
+                        bytes(data[strtab[4]:strtab[4] + strtab[5]]))
+        except (struct.error, IndexError):
+            raise ValueError("ERROR (ELF): File is truncated or corrupt.")
+
+        # For address lookups
+        self._by_addr = sorted(self.symbols.values(), key=lambda s: s.addr)
+        self._addrs = [s.addr for s in self._by_addr]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ElfFile':
+        """Reads and parses an ELF file."""
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def _read_symbols(self, symtab: memoryview, strtab: bytes):
+        for name, value, size, info, _, shndx in _SYM.iter_unpack(
+                symtab[:len(symtab) - len(symtab) % _SYM.size]):
+            stype = info & 0xf
+            if not name or not shndx or stype in (_STT_SECTION, _STT_FILE):
+                continue
+            end = strtab.index(b'\0', name)
+            sym = Symbol(strtab[name:end].decode(), value, size, stype)
+            # Prefer sized symbols (e.g., over labels of the same name)
+            old = self.symbols.get(sym.name)
+            if old is None or not old.size:
+                self.symbols[sym.name] = sym
+
+    def lookup(self, addr: int) -> Symbol:
+        """Returns the symbol containing `addr`.
+
+        Symbols without a size (e.g., assembly labels) are taken to extend up
+        to the next symbol.
+
+        Returns:
+            The symbol, or `None` if there is none.
+        """
+        i = bisect.bisect_right(self._addrs, addr) - 1
+        if i < 0:
+            return None
+        # Among symbols at the same address, prefer sized ones
+        start = self._addrs[i]
+        candidates = []
+        while i >= 0 and self._addrs[i] == start:
+            candidates.append(self._by_addr[i])
+            i -= 1
+        for sym in candidates:
+            if sym.size and addr < sym.addr + sym.size:
+                return sym
+        for sym in candidates:
+            if not sym.size:
+                return sym
+        return None
+
+    def load(self, mem):
+        """Places all loadable segments into a memory.
+
+        Args:
+            mem (Memory): Target memory (see `Memory.load()`).
+
+        Raises:
+            ValueError: A segment does not fit into the memory.
+        """
+        for seg in self.segments:
+            mem.load(seg.data, seg.addr)
+            if seg.size > len(seg.data):
+                mem.load(bytes(seg.size - len(seg.data)),
+                         seg.addr + len(seg.data))
@@ -0,0 +1,406 @@
+"""Immutable record types for port values.
+
+A `Latch` subclass declares its fields like a dataclass:
+
+```
+class IFID_t(Latch):
+    inst: int = 0
+    pc: int = 0
+```
+
+Compared to a `@dataclass`, a latch
+- stores its fields in `__slots__` (no per-instance `__dict__`),
+- is immutable, so it can be passed between ports and registers without
+  being copied (`copy.deepcopy()` returns the latch itself),
+- compares by identity first, and then field by field, stopping at the first
+  differing field,
+- caches its hash.
+
+Use `_replace()` to derive a new value with some fields changed.
+
+A `Struct` is a latch whose fields have a fixed bit width. The whole value is
+packed into a single integer (a `Struct` *is* an `int`):
+
+```
+class IFID_t(Struct):
+    inst: int = Field(32)
+    pc: int = Field(32)
+```
+
+Comparing two structs is a single integer comparison, and the fields that
+differ between two values can be found with one XOR (see `Struct._changed()`).
+"""
+
+from operator import attrgetter
+from typing import Callable
+from pyv.util import COPY_SHARED
+
+_MISSING = object()
+
+
+def _make_fn(name: str, args: str, body: list[str], env: dict):
+    src = f"def {name}({args}):\n" + "\n".join(f"    {line}" for line in body)
+    ns = {}
+    exec(src, env, ns)
+    return ns[name]
+
+
+class _LatchMeta(type):
+    """Creates the slots and the specialized methods of a `Latch` class."""
+
+    def __new__(mcls, name, bases, ns):
+        own = [f for f in ns.get('__annotations__', {})
+               if not f.startswith('_')]
+        fields = []
+        defaults = {}
+        for base in bases:
+            for f in getattr(base, '_fields', ()):
+                if f not in fields:
+                    fields.append(f)
+            defaults.update(getattr(base, '_defaults', {}))
+        new_slots = []
+        for f in own:
+            if f in ns:
+                # Class attributes would shadow the slots
+                defaults[f] = ns.pop(f)
+            if f not in fields:
+                fields.append(f)
+                new_slots.append(f)
+        ns.setdefault('__slots__', tuple(new_slots))
+        cls = super().__new__(mcls, name, bases, ns)
+        cls._fields = tuple(fields)
+        cls._defaults = defaults
+        if fields:
+            mcls._add_methods(cls)
+        return cls
+
+    @staticmethod
+    def _add_methods(cls):
+        fields = cls._fields
+        # Fields are assigned while the instance is temporarily of a mutable
+        # twin class with the same slots, which is much faster than calling
+        # object.__setattr__() for each field.
+        mutable = type.__new__(type(cls), f'_Mutable{cls.__name__}', (cls,), {
+            '__slots__': (),
+            '__setattr__': object.__setattr__,
+            '__delattr__': object.__delattr__,
+            '__module__': cls.__module__,
+        })
+        env = {'_cls': cls, '_mut': mutable, '_new': object.__new__,
+               '_setattr': object.__setattr__, '_M': _MISSING}
+        args = []
+        for f in fields:
+            if f in cls._defaults:
+                env[f'_d_{f}'] = cls._defaults[f]
+                args.append(f'{f}=_d_{f}')
+            else:
+                args.append(f)
+
+        cls.__init__ = _make_fn(
+            '__init__', ', '.join(['self'] + args),
+            ["_setattr(self, '__class__', _mut)"]
+            + [f'self.{f} = {f}' for f in fields]
+            + ['self._hash = None', 'self.__class__ = _cls'],
+            env
+        )
+
+        cls._replace = _make_fn(
+            '_replace', ', '.join(['self', '*'] + [f'{f}=_M' for f in fields]),
+            ['new = _new(_mut)']
+            + [f'new.{f} = self.{f} if {f} is _M else {f}' for f in fields]
+            + ['new._hash = None', 'new.__class__ = _cls', 'return new'],
+            env
+        )
+
+        same = ' and '.join(f'self.{f} == other.{f}' for f in fields)
+        cls.__eq__ = _make_fn(
+            '__eq__', 'self, other',
+            ['if self is other:',
+             '    return True',
+             'if other.__class__ is not _cls:',
+             '    return NotImplemented',
+             f'return {same}'],
+            env
+        )
+        cls.__ne__ = _make_fn(
+            '__ne__', 'self, other',
+            ['if self is other:',
+             '    return False',
+             'if other.__class__ is not _cls:',
+             '    return NotImplemented',
+             f'return not ({same})'],
+            env
+        )
+
+        values = ', '.join(f'self.{f}' for f in fields)
+        cls._astuple = _make_fn(
+            '_astuple', 'self', [f'return ({values},)'], env)
+
+
+class Latch(metaclass=_LatchMeta):
+    """Base class for immutable, slotted port value types."""
+
+    __slots__ = ('_hash',)
+    _copy_mode = COPY_SHARED
+    _fields: tuple[str, ...] = ()
+    """Field names, in declaration order"""
+    _defaults: dict = {}
+    """Default values of the fields"""
+
+    def __init__(self):
+        object.__setattr__(self, '_hash', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"'{type(self).__name__}' is immutable, use _replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' is immutable")
+
+    def __hash__(self):
+        h = self._hash
+        if h is None:
+            h = hash(self._astuple())
+            object.__setattr__(self, '_hash', h)
+        return h
+
+    def __repr__(self):
+        fields = ', '.join(f'{f}={getattr(self, f)!r}' for f in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), self._astuple())
+
+    def _astuple(self) -> tuple:
+        """Returns the field values as a tuple."""
+        return ()
+
+    def _asdict(self) -> dict:
+        """Returns a dict mapping the field names to their values."""
+        return dict(zip(self._fields, self._astuple()))
+
+    def _replace(self, **changes) -> 'Latch':
+        """Returns a new latch with the given fields replaced."""
+        if changes:
+            raise TypeError(f"Unknown fields: {', '.join(changes)}")
+        return self
+
+    @classmethod
+    def _change_filter(cls, fields: list[str]) -> Callable:
+        """Returns a function `changed(old, new)` which tells whether any of
+        the given fields differ between two values.
+
+        Raises:
+            ValueError: Unknown field.
+        """
+        _check_fields(cls, fields)
+        get = attrgetter(*fields)
+
+        def changed(old, new):
+            return get(old) != get(new)
+        return changed
+
+
+def _check_fields(cls, fields: list[str]):
+    if not fields:
+        raise ValueError(f"ERROR: No fields of '{cls.__name__}' given.")
+    for f in fields:
+        if f not in cls._fields:
+            raise ValueError(
+                f"ERROR: '{cls.__name__}' has no field '{f}'.")
+
+
+class Field:
+    """Declares a bit field of a `Struct`."""
+
+    def __init__(self, width: int, default: int = 0, signed: bool = False):
+        """Create a new bit field.
+
+        Args:
+            width: Width of the field in bits.
+            default: Default value.
+            signed: Whether the field holds a two's complement value.
+
+        Raises:
+            ValueError: Invalid width.
+        """
+        if width < 1:
+            raise ValueError(f"ERROR: Invalid field width {width}.")
+        self.width = width
+        self.default = default
+        self.signed = signed
+        self.offset = 0
+        """Bit position of the field's LSB within the struct"""
+        self.is_bool = False
+        """Whether the field is read as `bool`"""
+
+    @property
+    def mask(self) -> int:
+        """Mask of the field within the struct."""
+        return ((1 << self.width) - 1) << self.offset
+
+
+class _StructMeta(type):
+    """Lays out the fields of a `Struct` class and creates its accessors."""
+
+    def __new__(mcls, name, bases, ns):
+        annotations = ns.get('__annotations__', {})
+        layout: dict[str, Field] = {}
+        for base in bases:
+            layout.update(getattr(base, '_layout', {}))
+        offset = sum(f.width for f in layout.values())
+        for f, ann in annotations.items():
+            if f.startswith('_'):
+                continue
+            field = ns.pop(f, None)
+            if not isinstance(field, Field):
+                raise TypeError(
+                    f"ERROR: Field '{f}' of struct '{name}' needs a width "
+                    "(use `Field()`).")
+            if f in layout:
+                raise TypeError(
+                    f"ERROR: Field '{f}' of struct '{name}' already exists.")
+            field.offset = offset
+            field.is_bool = ann is bool or ann == 'bool'
+            offset += field.width
+            layout[f] = field
+        ns.setdefault('__slots__', ())
+        cls = super().__new__(mcls, name, bases, ns)
+        cls._layout = layout
+        cls._fields = tuple(layout)
+        cls._width = offset
+        if layout:
+            mcls._add_methods(cls)
+        return cls
+
+    @staticmethod
+    def _add_methods(cls):
+        layout = cls._layout
+        env = {'_cls': cls, '_new': int.__new__, '_M': _MISSING}
+        args = []
+        packed = []
+        for f, field in layout.items():
+            env[f'_d_{f}'] = field.default
+            args.append(f'{f}=_d_{f}')
+            m = (1 << field.width) - 1
+            packed.append(f'(({f} & {m}) << {field.offset})')
+
+            get = f'(self >> {field.offset}) & {m}'
+            if field.signed:
+                sign = 1 << (field.width - 1)
+                get = f'((({get}) ^ {sign}) - {sign})'
+            if field.is_bool:
+                get = f'bool({get})'
+            setattr(cls, f, property(
+                _make_fn(f, 'self', [f'return {get}'], env),
+                doc=f'Bits [{field.offset + field.width - 1}:{field.offset}]'
+            ))
+
+        cls.__new__ = _make_fn(
+            '__new__', ', '.join(['cls'] + args),
+            [f"return _new(cls, {' | '.join(packed)})"],
+            env
+        )
+
+        replace = ['v = self']
+        for f, field in layout.items():
+            m = (1 << field.width) - 1
+            clear = ~field.mask
+            replace += [f'if {f} is not _M:',
+                        f'    v = (v & {clear}) | (({f} & {m}) << '
+                        f'{field.offset})']
+        cls._replace = _make_fn(
+            '_replace', ', '.join(['self', '*'] + [f'{f}=_M' for f in layout]),
+            replace + ['return _new(_cls, v)'],
+            env
+        )
+
+        values = ', '.join(f'self.{f}' for f in layout)
+        cls._astuple = _make_fn(
+            '_astuple', 'self', [f'return ({values},)'], env)
+
+
+class Struct(int, metaclass=_StructMeta):
+    """Base class for packed bit-field port value types.
+
+    The value of a struct is a single integer, with the first field in the
+    least significant bits. Structs compare, hash, and copy like integers.
+    Note that this means two structs of different types (or a struct and an
+    `int`) compare equal if their packed values are equal.
+
+    Field values are truncated to the field width when packed.
+    """
+
+    __slots__ = ()
+    _copy_mode = COPY_SHARED
+    _layout: dict[str, Field] = {}
+    """Fields by name, in declaration order"""
+    _fields: tuple[str, ...] = ()
+    """Field names, in declaration order"""
+    _width: int = 0
+    """Total width in bits"""
+
+    @classmethod
+    def _from_int(cls, val: int) -> 'Struct':
+        """Creates a struct from its packed value."""
+        return int.__new__(cls, val)
+
+    def __repr__(self):
+        fields = ', '.join(f'{f}={getattr(self, f)!r}' for f in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+    __str__ = __repr__
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self._from_int, (int(self),))
+
+    def _astuple(self) -> tuple:
+        """Returns the field values as a tuple."""
+        return ()
+
+    def _asdict(self) -> dict:
+        """Returns a dict mapping the field names to their values."""
+        return dict(zip(self._fields, self._astuple()))
+
+    def _replace(self, **changes) -> 'Struct':
+        """Returns a new struct with the given fields replaced."""
+        if changes:
+            raise TypeError(f"Unknown fields: {', '.join(changes)}")
+        return self
+
+    @classmethod
+    def _change_filter(cls, fields: list[str]) -> Callable:
+        """Returns a function `changed(old, new)` which tells whether any of
+        the given fields differ between two values (see
+        `Latch._change_filter()`).
+
+        Raises:
+            ValueError: Unknown field.
+        """
+        _check_fields(cls, fields)
+        mask = 0
+        for f in fields:
+            mask |= cls._layout[f].mask
+
+        def changed(old, new):
+            return (old ^ new) & mask
+        return changed
+
+    def _changed(self, other: 'Struct') -> list[str]:
+        """Returns the names of all fields that differ from `other`."""
+        diff = self ^ other
+        if not diff:
+            return []
+        return [f for f, field in self._layout.items() if diff & field.mask]
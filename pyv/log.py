@@ -1,6 +1,52 @@
 import logging
 
 
+class Trace:
+    """Tracing switch of one simulation context.
+
+    Each `pyv.context.SimContext` has its own `Trace` (`SimContext.trace`).
+    Log calls on the simulation hot path are guarded by `info` or `debug` of
+    the context's trace. With tracing disabled, no message is formatted and no
+    logger method is called at all.
+
+    Use `Simulator.set_trace_level()` to change the level.
+    """
+
+    __slots__ = ('level', 'info', 'debug')
+
+    OFF = 0
+    """No tracing."""
+    INFO = 1
+    """Trace cycles, port values (see `Simulator.set_probes()`), and
+    events."""
+    DEBUG = 2
+    """Additionally trace process methods, port changes, and register and
+    memory accesses."""
+
+    def __init__(self):
+        self.level = Trace.OFF
+        """Current tracing level"""
+        self.info = False
+        """Whether the current level includes `INFO`"""
+        self.debug = False
+        """Whether the current level includes `DEBUG`"""
+
+    def set_level(self, level: int):
+        """Sets the tracing level.
+
+        Args:
+            level (int): `Trace.OFF`, `Trace.INFO`, or `Trace.DEBUG`.
+
+        Raises:
+            ValueError: Invalid level.
+        """
+        if level not in (Trace.OFF, Trace.INFO, Trace.DEBUG):
+            raise ValueError(f"Invalid trace level '{level}'.")
+        self.level = level
+        self.info = level >= Trace.INFO
+        self.debug = level >= Trace.DEBUG
+
+
 def getLogger():
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
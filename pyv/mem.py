@@ -1,8 +1,14 @@
+import mmap
+import os
+import struct
+import sys
+from abc import abstractmethod
 from pyv.module import Module
 from pyv.port import Input, Output
 from pyv.util import MASK_32, PyVObj
 from pyv.log import logger
-from pyv.clocked import Clocked, MemList
+from pyv.clocked import Clocked
+from pyv.context import get_context
 
 
 class ReadPort(PyVObj):
@@ -40,27 +46,31 @@ class WritePort(PyVObj):
         self.wdata_i = wdata_i
         """Write data input"""
 
+
 # TODO: Check if addr is valid
 
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+# Typed views can only be used if the host byte order matches the memory's
+_NATIVE_LE = sys.byteorder == 'little'
 
-class Memory(Module, Clocked):
-    """Simple memory module with 2 read ports and 1 write port
 
-    A memory is represented by a simple list of bytes.
+class MemoryBase(Module, Clocked):
+    """Base class for modules with the port interface of a memory: 2 read
+    ports and 1 write port.
 
-    Byte-ordering: Little-endian
+    Reads are combinational, writes take effect with the next clock edge.
+    Subclasses implement the actual accesses (`_read()` and `_write()`).
     """
 
-    def __init__(self, size: int = 32):
-        """Memory constructor.
+    _track_dirty = True
 
-        Args:
-            size: Size of memory in bytes.
-        """
-        super().__init__(name='UnnamedMemory')
-        MemList.add_to_mem_list(self)
-        self.mem = [0 for i in range(0, size)]
-        """Memory array. List of length `size`."""
+    def __init__(self, name: str):
+        super().__init__(name=name)
+        ctx = get_context()
+        self._clocked_list = ctx.mems
+        self._clocked_list.add_to_mem_list(self)
+        self._trace = ctx.trace
 
         # Read port 0
         self.read_port0 = ReadPort(
@@ -84,35 +94,18 @@ class Memory(Module, Clocked):
             wdata_i=Input(int, [None])
         )
 
-    def _read(self, addr, w):
-        # During the processing of the current cycle, it might occur that
-        # an unstable port value is used as the address. However, the port
-        # will eventually become stable, so we should "allow" that access
-        # by just returning a dummy value, e.g., 0.
-        #
-        # Note: An actual illegal address exception caused by a running
-        # program should be handled synchronously, i.e. with the next
-        # active clock edge (tick).
-        try:
-            if w == 1:  # byte
-                val = MASK_32 & self.mem[addr]
-            elif w == 2:  # half word
-                val = MASK_32 & (self.mem[addr + 1] << 8 | self.mem[addr])
-            elif w == 4:  # word
-                val = MASK_32 & (
-                    self.mem[addr + 3] << 24
-                    | self.mem[addr + 2] << 16
-                    | self.mem[addr + 1] << 8
-                    | self.mem[addr])
-            else:
-                raise Exception(
-                    f'ERROR (Memory ({self.name}), read): Invalid width {w}')
+        # Inputs sampled on the clock edge
+        for port in [self.write_port.we_i, self.write_port.wdata_i,
+                     self.read_port0.addr_i, self.read_port0.width_i]:
+            port._add_watcher(self)
 
-            logger.debug(f"MEM ({self.name}): read value {val:08X} from address {addr:08X}")  # noqa: E501
-        except IndexError:
-            val = 0
+    @abstractmethod
+    def _read(self, addr: int, w: int) -> int:
+        """Returns `w` bytes (1, 2, or 4) at `addr`."""
 
-        return val
+    @abstractmethod
+    def _write(self, addr: int, w: int, wdata: int):
+        """Writes `w` bytes (1, 2, or 4) of `wdata` to `addr`."""
 
     def _process_read(self, read_port):
         re = read_port.re_i.read()
@@ -141,6 +134,12 @@ class Memory(Module, Clocked):
         self.wdata_next = self.write_port.wdata_i.read()
         self.w_next = self.read_port0.width_i.read()
 
+    def _mark_dirty(self):
+        self._clocked_list.mark_dirty(self)
+
+    def _is_idle(self) -> bool:
+        return not self.we_next
+
     def _tick(self):
         we = self.we_next
         addr = self.addr_next
@@ -148,22 +147,133 @@ class Memory(Module, Clocked):
         w = self.w_next
 
         if we:
+            # Write again on the next edge, unless the inputs change
+            self._mark_dirty()
             if not (w == 1 or w == 2 or w == 4):
                 raise Exception(
                     f'ERROR (Memory ({self.name}), write): Invalid width {w}')
-            logger.debug(
-                f"MEM {self.name}: write {wdata:08X} to address {addr:08X}")
+            if self._trace.debug:
+                logger.debug(
+                    f"MEM {self.name}: write {wdata:08X} to address {addr:08X}")  # noqa: E501
+
+            self._write(addr, w, wdata)
+
+    def _reset(self):
+        pass
+
+
+class Memory(MemoryBase):
+    """Simple memory module with 2 read ports and 1 write port
 
-            if w == 1:  # byte
-                self.mem[addr] = 0xff & wdata
+    A memory is represented by a `bytearray`. Aligned half word and word
+    accesses go through typed `memoryview`s of the array, unaligned ones
+    through `struct`.
+
+    Byte-ordering: Little-endian
+    """
+
+    def __init__(self, size: int = 32):
+        """Memory constructor.
+
+        Args:
+            size: Size of memory in bytes.
+        """
+        super().__init__(name='UnnamedMemory')
+        self.mem = bytearray(size)
+
+    @property
+    def mem(self) -> bytearray:
+        """Memory array. `bytearray` of length `size`.
+
+        The array cannot be resized. Assigning a new bytes-like object
+        replaces the whole array.
+        """
+        return self._mem
+
+    @mem.setter
+    def mem(self, data):
+        self._mem = mem = bytearray(data)
+        view = memoryview(mem)
+        self._halves = None
+        self._words = None
+        if _NATIVE_LE:
+            if len(mem) % 2 == 0:
+                self._halves = view.cast('H')
+            if len(mem) % 4 == 0:
+                self._words = view.cast('I')
+
+    def load(self, data, addr: int = 0):
+        """Copies bytes into the memory.
+
+        Args:
+            data: Bytes-like object, or list of byte values.
+            addr (int, optional): Start address. Defaults to 0.
+
+        Raises:
+            ValueError: Data does not fit into the memory.
+        """
+        end = addr + len(data)
+        if addr < 0 or end > len(self._mem):
+            raise ValueError(f"ERROR (Memory ({self.name})): {len(data)} bytes at address {addr:08X} exceed the memory size of {len(self._mem)} bytes.")  # noqa: E501
+        self._mem[addr:end] = data
+
+    def read_bytes(self, addr: int, nbytes: int) -> bytes:
+        """Returns `nbytes` bytes starting at `addr`.
+
+        Bytes beyond the end of the memory are omitted.
+        """
+        return bytes(self._mem[addr:addr + nbytes])
+
+    def _read(self, addr, w):
+        # During the processing of the current cycle, it might occur that
+        # an unstable port value is used as the address. However, the port
+        # will eventually become stable, so we should "allow" that access
+        # by just returning a dummy value, e.g., 0.
+        #
+        # Note: An actual illegal address exception caused by a running
+        # program should be handled synchronously, i.e. with the next
+        # active clock edge (tick).
+        try:
+            if w == 4:  # word
+                words = self._words
+                if words is not None and not addr & 3:
+                    val = words[addr >> 2]
+                else:
+                    val = _U32.unpack_from(self._mem, addr)[0]
+            elif w == 1:  # byte
+                val = self._mem[addr]
             elif w == 2:  # half word
-                self.mem[addr] = 0xff & wdata
-                self.mem[addr + 1] = (0xff00 & wdata) >> 8
-            elif w == 4:  # word
-                self.mem[addr] = 0xff & wdata
-                self.mem[addr + 1] = (0xff00 & wdata) >> 8
-                self.mem[addr + 2] = (0xff0000 & wdata) >> 16
-                self.mem[addr + 3] = (0xff000000 & wdata) >> 24
+                halves = self._halves
+                if halves is not None and not addr & 1:
+                    val = halves[addr >> 1]
+                else:
+                    val = _U16.unpack_from(self._mem, addr)[0]
+            else:
+                raise Exception(
+                    f'ERROR (Memory ({self.name}), read): Invalid width {w}')
+
+            if self._trace.debug:
+                logger.debug(f"MEM ({self.name}): read value {val:08X} from address {addr:08X}")  # noqa: E501
+        except (IndexError, struct.error):
+            val = 0
+
+        return val
+
+    def _write(self, addr, w, wdata):
+        if w == 4:  # word
+            words = self._words
+            if words is not None and not addr & 3:
+                words[addr >> 2] = MASK_32 & wdata
+            else:
+                _U32.pack_into(self._mem, addr, MASK_32 & wdata)
+        elif w == 1:  # byte
+            self._mem[addr] = 0xff & wdata
+        else:  # half word
+            halves = self._halves
+            if halves is not None and not addr & 1:
+                halves[addr >> 1] = 0xffff & wdata
+            else:
+                _U16.pack_into(self._mem, addr, 0xffff & wdata)
 
     # TODO: when memory gets loaded with program *before* simulation,
     # simulation start will cause a reset. So for now, we skip the reset here.
@@ -173,5 +283,275 @@ class Memory(Module, Clocked):
 
         All elements are set to 0.
         """
-        for i in range(0, len(self.mem)):
-            self.mem[i] = 0
+        self._mem[:] = bytes(len(self._mem))
+
+
+PAGE_BITS = 12
+"""Number of address bits within a page of `PagedMemory`"""
+PAGE_SIZE = 1 << PAGE_BITS
+"""Page size of `PagedMemory` in bytes (4 KiB)"""
+_PAGE_MASK = PAGE_SIZE - 1
+
+
+class PagedMemory(Memory):
+    """Sparse memory covering the full 32-bit address space.
+
+    The memory is split into 4 KiB pages, which are only allocated when they
+    are first written to (or loaded). Reads of unallocated pages return 0.
+    Addresses are taken modulo 2^32, so, e.g., a stack at the top of the
+    address space works as expected.
+
+    The most recently used page is cached, so consecutive accesses to the
+    same page skip the page table lookup.
+
+    Program images can also be mapped from a file (`map_image()`) instead
+    of being copied. Their pages are set up on first access.
+
+    Unlike `Memory`, there is no flat `mem` array. Use `load()`,
+    `map_image()`, and `read_bytes()` instead.
+    """
+
+    def __init__(self):
+        self._pages: dict[int, tuple] = {}
+        # Mapped images: (first page number, memoryview of the mapping)
+        self._images: list[tuple[int, memoryview]] = []
+        # Most recently used page: page number, and (array, halves, words)
+        self._last_pn = -1
+        self._last_page = None
+        self._lookups = 0
+        self._unmapped_reads = 0
+        super().__init__(0)
+
+    @property
+    def mem(self):
+        """Not available for paged memories. Assigning a bytes-like object
+        discards all pages and loads the data at address 0."""
+        raise AttributeError(
+            f"ERROR (PagedMemory ({self.name})): No flat memory array. Use `load()` or `read_bytes()`.")  # noqa: E501
+
+    @mem.setter
+    def mem(self, data):
+        self._pages = {}
+        self._images = []
+        self._last_pn = -1
+        self._last_page = None
+        self.load(data)
+
+    @staticmethod
+    def _new_page(mem) -> tuple:
+        view = memoryview(mem)
+        if _NATIVE_LE:
+            return (mem, view.cast('H'), view.cast('I'))
+        return (mem, None, None)
+
+    def _find_page(self, pn: int) -> tuple:
+        # Returns the page, setting it up from a mapped image if needed
+        page = self._pages.get(pn)
+        if page is None and self._images:
+            for start, view in reversed(self._images):
+                off = (pn - start) << PAGE_BITS
+                if 0 <= off < len(view):
+                    chunk = view[off:off + PAGE_SIZE]
+                    if len(chunk) < PAGE_SIZE:
+                        # Partial last page
+                        mem = bytearray(PAGE_SIZE)
+                        mem[:len(chunk)] = chunk
+                        chunk = mem
+                    page = self._pages[pn] = self._new_page(chunk)
+                    break
+        return page
+
+    def _get_page(self, pn: int, alloc: bool) -> tuple:
+        # Page table lookup, bypassed by the callers for the last used page
+        self._lookups += 1
+        page = self._find_page(pn)
+        if page is None:
+            if not alloc:
+                return None
+            page = self._pages[pn] = self._new_page(bytearray(PAGE_SIZE))
+        self._last_pn = pn
+        self._last_page = page
+        return page
+
+    def load(self, data, addr: int = 0):
+        """Copies bytes into the memory, allocating the pages they cover.
+
+        Args:
+            data: Bytes-like object, or list of byte values.
+            addr (int, optional): Start address. Defaults to 0.
+
+        Raises:
+            ValueError: Data exceeds the 32-bit address space.
+        """
+        data = memoryview(bytes(data))
+        end = addr + len(data)
+        if addr < 0 or end > 1 << 32:
+            raise ValueError(f"ERROR (PagedMemory ({self.name})): {len(data)} bytes at address {addr:08X} exceed the 32-bit address space.")  # noqa: E501
+        pos = 0
+        while addr < end:
+            off = addr & _PAGE_MASK
+            n = min(PAGE_SIZE - off, end - addr)
+            mem = self._get_page(addr >> PAGE_BITS, True)[0]
+            mem[off:off + n] = data[pos:pos + n]
+            addr += n
+            pos += n
+
+    def map_image(self, path: str, addr: int = 0):
+        """Maps a file (e.g., a program binary) into the memory.
+
+        The file is mapped copy-on-write (`mmap.ACCESS_COPY`): Writes only
+        affect this memory, never the file. Processes mapping the same file
+        share its physical pages until they write to them. As pages are set
+        up on first access, mapping takes constant time, regardless of the
+        file size.
+
+        The mapping replaces all previous contents of the covered pages.
+
+        Args:
+            path (str): Path to the file.
+            addr (int, optional): Start address. Must be page-aligned.
+                Defaults to 0.
+
+        Raises:
+            ValueError: Unaligned address, or the file exceeds the 32-bit
+                address space.
+        """
+        if addr & _PAGE_MASK:
+            raise ValueError(f"ERROR (PagedMemory ({self.name})): Image address {addr:08X} is not page-aligned.")  # noqa: E501
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if addr < 0 or addr + size > 1 << 32:
+                raise ValueError(f"ERROR (PagedMemory ({self.name})): {size} bytes at address {addr:08X} exceed the 32-bit address space.")  # noqa: E501
+            if not size:
+                return
+            view = memoryview(
+                mmap.mmap(f.fileno(), size, access=mmap.ACCESS_COPY))
+
+        start = addr >> PAGE_BITS
+        end = start + ((size + _PAGE_MASK) >> PAGE_BITS)
+        for pn in [pn for pn in self._pages if start <= pn < end]:
+            del self._pages[pn]
+        self._images.append((start, view))
+        self._last_pn = -1
+        self._last_page = None
+
+    def read_bytes(self, addr: int, nbytes: int) -> bytes:
+        """Returns `nbytes` bytes starting at `addr`.
+
+        Unallocated pages read as zeros.
+        """
+        res = bytearray()
+        addr &= MASK_32
+        while nbytes > 0:
+            off = addr & _PAGE_MASK
+            n = min(PAGE_SIZE - off, nbytes)
+            page = self._find_page(addr >> PAGE_BITS)
+            if page is None:
+                res += bytes(n)
+            else:
+                res += page[0][off:off + n]
+            addr = (addr + n) & MASK_32
+            nbytes -= n
+        return bytes(res)
+
+    def _read(self, addr, w):
+        addr &= MASK_32
+        off = addr & _PAGE_MASK
+        if off + w > PAGE_SIZE:
+            if not (w == 2 or w == 4):
+                raise Exception(
+                    f'ERROR (Memory ({self.name}), read): Invalid width {w}')
+            # Access crosses a page boundary
+            val = 0
+            for i in range(w):
+                val |= self._read(addr + i, 1) << (8 * i)
+            return val
+
+        pn = addr >> PAGE_BITS
+        if pn == self._last_pn:
+            page = self._last_page
+        else:
+            page = self._get_page(pn, False)
+            if page is None:
+                if not (w == 1 or w == 2 or w == 4):
+                    raise Exception(
+                        f'ERROR (Memory ({self.name}), read): Invalid width {w}')  # noqa: E501
+                self._unmapped_reads += 1
+                return 0
+
+        if w == 4:  # word
+            words = page[2]
+            if words is not None and not off & 3:
+                val = words[off >> 2]
+            else:
+                val = _U32.unpack_from(page[0], off)[0]
+        elif w == 1:  # byte
+            val = page[0][off]
+        elif w == 2:  # half word
+            halves = page[1]
+            if halves is not None and not off & 1:
+                val = halves[off >> 1]
+            else:
+                val = _U16.unpack_from(page[0], off)[0]
+        else:
+            raise Exception(
+                f'ERROR (Memory ({self.name}), read): Invalid width {w}')
+
+        if self._trace.debug:
+            logger.debug(f"MEM ({self.name}): read value {val:08X} from address {addr:08X}")  # noqa: E501
+        return val
+
+    def _write(self, addr, w, wdata):
+        addr &= MASK_32
+        off = addr & _PAGE_MASK
+        if off + w > PAGE_SIZE:
+            # Access crosses a page boundary
+            for i in range(w):
+                self._write(addr + i, 1, wdata >> (8 * i))
+            return
+
+        pn = addr >> PAGE_BITS
+        if pn == self._last_pn:
+            page = self._last_page
+        else:
+            page = self._get_page(pn, True)
+
+        if w == 4:  # word
+            words = page[2]
+            if words is not None and not off & 3:
+                words[off >> 2] = MASK_32 & wdata
+            else:
+                _U32.pack_into(page[0], off, MASK_32 & wdata)
+        elif w == 1:  # byte
+            page[0][off] = 0xff & wdata
+        else:  # half word
+            halves = page[1]
+            if halves is not None and not off & 1:
+                halves[off >> 1] = 0xffff & wdata
+            else:
+                _U16.pack_into(page[0], off, 0xffff & wdata)
+
+    def get_pages(self) -> list[int]:
+        """Returns the base addresses of all allocated pages, in ascending
+        order."""
+        return [pn << PAGE_BITS for pn in sorted(self._pages)]
+
+    def get_page_stats(self) -> dict[str, int]:
+        """Returns page-level statistics.
+
+        Returns:
+            dict: `pages`: number of allocated pages, `mapped`: how many of
+            them are backed by a mapped image, `bytes`: memory allocated for
+            the other pages in bytes, `lookups`: number of page table lookups
+            (i.e., accesses that missed the last used page),
+            `unmapped_reads`: number of reads of unallocated pages.
+        """
+        mapped = sum(isinstance(page[0], memoryview)
+                     for page in self._pages.values())
+        return {
+            'pages': len(self._pages),
+            'mapped': mapped,
+            'bytes': (len(self._pages) - mapped) * PAGE_SIZE,
+            'lookups': self._lookups,
+            'unmapped_reads': self._unmapped_reads,
+        }
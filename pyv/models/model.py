@@ -5,6 +5,10 @@ import traceback
 
 class Model:
     """Base class for all core models.
+
+    A model should create its modules and call `Model.__init__()` within its
+    own simulation context (see `pyv.context`), so that multiple models can
+    coexist.
     """
     def __init__(self):
         print("Initializing model...")
@@ -41,18 +45,28 @@ class Model:
         `probes` will be logged during simulation. If `probes` is empty, ALL
         ports will be logged.
 
+        See `Simulator.set_probes()`.
+
         Args:
             probes (list[str]): List of strings to match ports to probe
         """
         self.sim.set_probes(probes)
 
-    def run(self, num_cycles=1):
+    def run(
+        self,
+        num_cycles=1,
+        mode: str = Simulator.EVENT_DRIVEN,
+        fast_forward: bool = True
+    ):
         """Runs the simulation.
 
         Args:
             num_cycles (int, optional): Number of clock cycles to simulate.
+            mode (str, optional): Scheduling mode (see `Simulator.run()`).
+            fast_forward (bool, optional): Whether to skip cycles once the
+                design is quiescent (see `Simulator.run()`).
         """
-        self.sim.run(num_cycles)
+        self.sim.run(num_cycles, mode=mode, fast_forward=fast_forward)
 
     def get_cycles(self):
         """Get number cycles executed.
@@ -1,11 +1,15 @@
+from typing import Callable
+from pyv.bus import Bus
 from pyv.csr import CSRUnit
+from pyv.elf import ElfFile
 from pyv.exception_unit import ExceptionUnit
 from pyv.stages import EXMEM_t, IFID_t, IFStage, IDStage, EXStage, MEMStage, \
     WBStage, BranchUnit
-from pyv.mem import Memory
+from pyv.mem import Memory, PagedMemory
 from pyv.reg import Regfile
 from pyv.module import Module
 from pyv.models.model import Model
+from pyv.context import SimContext
 from pyv.port import Wire
 
 
@@ -14,22 +18,31 @@ class SingleCycle(Module):
 
     Default memory size: 8 KiB
     """
-    def __init__(self):
+    def __init__(self, mem: Memory = None):
+        """Creates the core.
+
+        Args:
+            mem (Memory, optional): Main memory. Defaults to an 8 KiB
+                `Memory`. Use a `PagedMemory` for programs that need the full
+                32-bit address space.
+        """
         super().__init__()
         # Stages/modules
         self.regf = Regfile()
         """RISC-V 32-bit base register file"""
         self.csr_unit = CSRUnit()
         """RISC-V CSRs"""
-        self.mem = Memory(8 * 1024)
+        self.mem = Memory(8 * 1024) if mem is None else mem
         """Main Memory (for both instructions and data)"""
+        self.bus = Bus(self.mem)
+        """Data bus (main memory and memory-mapped devices)"""
         self.if_stg = IFStage(self.mem.read_port1)
         """Instruction Fetch"""
         self.id_stg = IDStage(self.regf, self.csr_unit)
         """Instruction Decode"""
         self.ex_stg = EXStage()
         """Execute"""
-        self.mem_stg = MEMStage(self.mem.read_port0, self.mem.write_port)
+        self.mem_stg = MEMStage(self.bus.read_port0, self.bus.write_port)
         """Mem stage"""
         self.wb_stg = WBStage(self.regf)
         """Write-back"""
@@ -87,12 +100,22 @@ class SingleCycle(Module):
 class SingleCycleModel(Model):
     """Model wrapper for SingleCycle."""
 
-    def __init__(self):
-        self.core = SingleCycle()
-        """Module instance"""
-        self.setTop(self.core, 'SingleCycleTop')
+    def __init__(self, mem: Callable[[], Memory] = None):
+        """Creates the model.
 
-        super().__init__()
+        Args:
+            mem (optional): Callable returning the main memory (e.g., the
+                `PagedMemory` class). It is called within the model's
+                context. Defaults to an 8 KiB `Memory`.
+        """
+        self.ctx = SimContext()
+        """Simulation context of this model"""
+        with self.ctx:
+            self.core = SingleCycle(None if mem is None else mem())
+            """Module instance"""
+            self.setTop(self.core, 'SingleCycleTop')
+
+            super().__init__()
 
     def log(self):
         """Custom log function.
@@ -106,22 +129,44 @@ class SingleCycleModel(Model):
         """Load instructions into the instruction memory.
 
         Args:
-            instructions (list): List of instruction words.
+            instructions: Instruction bytes (bytes-like object, or list of
+                byte values).
         """
-        self.core.mem.mem[:len(instructions)] = instructions
+        self.core.mem.load(instructions)
 
     def load_binary(self, file):
         """Load a program binary into the instruction memory.
 
+        If the main memory is a `PagedMemory`, the binary is mapped
+        copy-on-write instead of copied (see `PagedMemory.map_image()`).
+
         Args:
             file (string): Path to the binary.
         """
-        f = open(file, 'rb')
-        ba = bytearray(f.read())
-        f.close()
-        inst = list(ba)
+        mem = self.core.mem
+        if isinstance(mem, PagedMemory):
+            mem.map_image(file)
+            return
+        with open(file, 'rb') as f:
+            mem.load(f.read())
+
+    def load_elf(self, file) -> ElfFile:
+        """Load an ELF executable.
 
-        self.core.mem.mem[:len(inst)] = inst
+        All loadable segments are placed into the main memory, and the core
+        starts at the entry point after the next reset (i.e., the next
+        `run()`).
+
+        Args:
+            file (string): Path to the ELF file.
+
+        Returns:
+            ElfFile: The parsed file (e.g., for symbol lookups).
+        """
+        elf = ElfFile.from_file(file)
+        elf.load(self.core.mem)
+        self.core.if_stg.set_start_pc(elf.entry)
+        return elf
 
     def readReg(self, reg):
         """Read a register in the register file.
@@ -152,7 +197,7 @@ class SingleCycleModel(Model):
         Returns:
             list: List of bytes.
         """
-        return [hex(self.core.mem.mem[addr + i]) for i in range(0, nbytes)]
+        return [hex(b) for b in self.core.mem.read_bytes(addr, nbytes)]
 
     def readInstMem(self, addr, nbytes):
         """Read bytes from instruction memory.
@@ -164,4 +209,4 @@ class SingleCycleModel(Model):
         Returns:
             list: List of bytes.
         """
-        return [hex(self.core.mem.mem[addr + i]) for i in range(0, nbytes)]
+        return [hex(b) for b in self.core.mem.read_bytes(addr, nbytes)]
@@ -1,5 +1,6 @@
 from typing import Callable
-from pyv.simulator import Simulator
+from pyv.context import get_context
+from pyv.port import PortRW
 from pyv.util import PyVObj
 
 
@@ -12,7 +13,9 @@ class Module(PyVObj):
 
     def __init__(self, name='UnnamedModule'):
         super().__init__(name)
+        self._ctx = get_context()
         self._stable_callbacks = []
+        self._stable_callback_deps = None
 
     def _init(self, parent=None):
         super()._init(parent)
@@ -20,13 +23,23 @@ class Module(PyVObj):
 
     def _init_stable_callbacks(self):
         for sb in self._stable_callbacks:
-            Simulator.register_stable_callback(sb)
-
-    def register_stable_callbacks(self, callbacks: list[Callable]):
+            self._ctx.register_stable_callback(
+                sb, self._stable_callback_deps)
+
+    def register_stable_callbacks(
+        self,
+        callbacks: list[Callable],
+        depends_on: list[PortRW] = None
+    ):
         """Register methods to be called back once all signal values during the
         current cycle have stabilized.
 
         Args:
             callbacks (list[Callable]): List of methods to register
+            depends_on (list[PortRW], optional): Ports the callbacks depend
+                on. If given, the callbacks only run in cycles in which at
+                least one of these ports changed. By default, the callbacks
+                run in every cycle.
         """
         self._stable_callbacks = callbacks
+        self._stable_callback_deps = depends_on
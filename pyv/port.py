@@ -1,33 +1,141 @@
 from abc import ABC, abstractmethod
-import copy
 import inspect
-from typing import Any, TypeVar, Generic, Type
+from typing import Any, Callable, TypeVar, Generic, Type
+from pyv.context import get_context, SimContext
 from pyv.log import logger
-from pyv.util import PyVObj
+from pyv.util import PyVObj, get_copy_fn
 
 
 T = TypeVar('T')
 
 
+class _Net:
+    """Value cell shared by all ports of a connection tree.
+
+    Every port references the net of its tree directly (`Port._net`), so
+    reading a port takes the same time no matter how deep it sits in the
+    tree. On a value change, the net notifies a flat list of all process
+    methods sensitive to any input of the tree (see `compile()`), and marks
+    all watchers of the tree's ports dirty (e.g., registers, see
+    `PortRW._add_watcher()`).
+    """
+
+    __slots__ = ('val', 'root', 'ctx', 'watchers', '_queue', '_ids', '_gated')
+
+    def __init__(self, root: 'Port', val):
+        self.val = val
+        """Current value"""
+        self.root = root
+        """Root driver of the tree"""
+        self.ctx: SimContext = root._ctx
+        """Simulation context of the tree"""
+        self.watchers: tuple = ()
+        """Objects to mark dirty on a value change"""
+        # Change queue the listener ids belong to (None: not compiled)
+        self._queue = None
+        self._ids: list[int] = ()
+        # Listeners which are only sensitive to some fields of the value
+        self._gated: list[tuple[Callable, int]] = ()
+
+    def invalidate(self):
+        """Marks the listener list as outdated (e.g., after connecting a new
+        port to the tree)."""
+        self._queue = None
+
+    def compile(self, queue):
+        """Flattens the process methods of the root and all downstream
+        inputs into a single list of change queue ids.
+
+        The order matches the order in which the ports would be notified
+        one by one. Duplicates are removed.
+
+        Methods that are only sensitive to some fields of the value (see
+        `Input.__init__()`) are kept in a separate list, along with their
+        change filter. If a method is sensitive to the whole value via
+        another input of the tree, the filter is dropped.
+        """
+        root = self.root
+        inputs = list(root._downstream_inputs)
+        if isinstance(root, Input):
+            inputs.insert(0, root)
+
+        ids = []
+        gated = []
+        for port in inputs:
+            handler = port._process_method_handler
+            for func in handler._process_methods:
+                if func is not None:
+                    i = queue.register(func)
+                    changed = handler._change_filters.get(func)
+                    if changed is not None:
+                        gated.append((changed, i))
+                    elif i not in ids:
+                        ids.append(i)
+        self._ids = ids
+        self._gated = [(f, i) for f, i in gated if i not in ids]
+        self._queue = queue
+
+    def notify(self, old, new):
+        """Adds all listeners to the simulator's change queue.
+
+        Args:
+            old: Previous value.
+            new: New value.
+        """
+        queue = self.ctx.sim._change_queue
+        if queue is not self._queue:
+            self.compile(queue)
+        push_id = queue.push_id
+        for i in self._ids:
+            push_id(i)
+        for changed, i in self._gated:
+            if changed(old, new):
+                push_id(i)
+
+
 class Port(PyVObj, ABC):
-    """Abstract base class for ports."""
+    """Abstract base class for ports.
+
+    Ports use `__slots__`, and lists which are empty for most ports (e.g.,
+    `_children`) are only allocated on first use. Until then, they are empty
+    tuples.
+    """
+
+    __slots__ = ('_type', '_ctx', '_net', '_root_driver', '_downstream_inputs',
+                 '_parent', '_children')
+
     def __init__(self, type, val) -> None:
         super().__init__(name='UnnamedPort')
         self._type = type
         if val is not None:
-            self._val = copy.deepcopy(val)
+            copy_val = get_copy_fn(type)
+            if copy_val is not None:
+                val = copy_val(val)
         else:
             # Take the type's default value
-            self._val = self._type()
+            val = self._type()
+        self._ctx = get_context()
+        self._net = _Net(self, val)
         self._root_driver = self
-        self._downstream_inputs: list[Input] = []
+        self._downstream_inputs: list[Input] = ()
 
         # Who drives this port?
         self._parent = None
         # Which ports does this port drive?
-        self._children = []
+        self._children: list[Port] = ()
+
+        self._ctx.ports.add_port(self)
+
+    @property
+    def _val(self):
+        return self._net.val
 
-        PortList.add_port(self)
+    @_val.setter
+    def _val(self, val):
+        net = self._net
+        net.val = val
+        for w in net.watchers:
+            w._mark_dirty()
 
     @abstractmethod
     def read(self):
@@ -39,79 +147,184 @@ class Port(PyVObj, ABC):
         self._visited = True
 
     def _add_downstream_input(self, port: 'Port'):
+        if not self._downstream_inputs:
+            self._downstream_inputs = []
         self._downstream_inputs.append(port)
 
+    def _add_child(self, port: 'Port'):
+        if not self._children:
+            self._children = []
+        self._children.append(port)
+
     def _clear_root_attrs(self):
-        del self._val
-        self._downstream_inputs = []
+        self._downstream_inputs = ()
 
 
 class PortList:
-    port_list: list[Port] = []
-    port_list_filtered: list[Port] = []
-
-    @staticmethod
-    def add_port(port):
-        PortList.port_list.append(port)
-
-    @staticmethod
-    def clear():
-        PortList.port_list = []
-        PortList.port_list_filtered = []
-
-    @staticmethod
-    def log_ports():
-        if len(PortList.port_list_filtered) > 0:
-            ports_to_log = PortList.port_list_filtered
+    """Keeps track of all ports of a simulation context."""
+
+    def __init__(self):
+        self.port_list: list[Port] = []
+        self.port_list_filtered: list[Port] = []
+
+    def add_port(self, port):
+        self.port_list.append(port)
+
+    def clear(self):
+        self.port_list = []
+        self.port_list_filtered = []
+
+    def compile_nets(self, queue):
+        """Compiles the listener lists of all nets (see `_Net.compile()`).
+
+        Args:
+            queue: The simulator's change queue.
+        """
+        for p in self.port_list:
+            if p._root_driver is p:
+                p._net.compile(queue)
+
+    def fold_constants(self) -> list['Input']:
+        """Detaches all inputs driven by a `Constant` from the sensitivity
+        bookkeeping.
+
+        As the value of such an input never changes, its process methods
+        never need to be notified, and watchers of its value never need to
+        be marked dirty. The inputs are removed from the downstream inputs
+        of their constant root driver, and the watchers of the constant's
+        net are dropped. Reading the inputs is unaffected.
+
+        Process methods of the inputs still run once in the first cycle (see
+        `_ProcessMethodHandler.init_process_methods()`).
+
+        Returns:
+            The folded inputs.
+        """
+        folded = []
+        for p in self.port_list:
+            if isinstance(p, Constant) and p._root_driver is p:
+                folded += p._downstream_inputs
+                p._downstream_inputs = ()
+                p._net.watchers = ()
+                p._net.invalidate()
+        return folded
+
+    def set_write_checks(self, enabled: bool) -> list['PortRW']:
+        """Enables or disables the checks of `PortRW.write()` for all root
+        ports.
+
+        Returns:
+            The root ports.
+        """
+        roots = [p for p in self.port_list
+                 if isinstance(p, PortRW) and p._root_driver is p]
+        for p in roots:
+            p._set_write_checks(enabled)
+        return roots
+
+    def log_ports(self):
+        if len(self.port_list_filtered) > 0:
+            ports_to_log = self.port_list_filtered
         else:
-            ports_to_log = PortList.port_list
+            ports_to_log = self.port_list
 
         for p in ports_to_log:
             logger.info(f"{p.name}: {p.read()}")
 
-    @staticmethod
-    def filter(patterns: list[str]):
+    def filter(self, patterns: list[str]):
         for pat in patterns:
-            for port in PortList.port_list:
+            for port in self.port_list:
                 if pat in port.name:
-                    if port not in PortList.port_list_filtered:
-                        PortList.port_list_filtered.append(port)
+                    if port not in self.port_list_filtered:
+                        self.port_list_filtered.append(port)
+
+
+_NO_FILTERS: dict = {}
+# Sensitivity list of inputs without any process method (`[None]`), shared
+# by all of them
+_NO_PROCESS: tuple = (None,)
 
 
 class _ProcessMethodHandler():
-    def __init__(self, sensitive_methods) -> None:
+    __slots__ = ('_ctx', '_process_methods', '_change_filters', '_queue',
+                 '_method_ids')
+
+    def __init__(
+        self,
+        sensitive_methods,
+        ctx: SimContext,
+        type=None,
+        sensitive_fields=None
+    ) -> None:
+        self._ctx = ctx
+
         # Setup sensitivity list
-        self._process_methods = []
-        for m in sensitive_methods:
-            self._add_process_method(m)
+        self._process_methods: list[Callable] = ()
+        if sensitive_methods == [None]:
+            self._process_methods = _NO_PROCESS
+        else:
+            for m in sensitive_methods:
+                self._add_process_method(m)
+
+        # Change filters of methods sensitive to some fields only
+        self._change_filters: dict[Callable, Callable] = _NO_FILTERS
+        if sensitive_fields:
+            if not hasattr(type, '_change_filter'):
+                raise TypeError(f"ERROR: Field sensitivity requires a Latch or Struct type, got {type}.")  # noqa: E501
+            self._change_filters = {}
+            for m, fields in sensitive_fields.items():
+                self._change_filters[m] = type._change_filter(fields)
+
+        # Ids of the process methods in the simulator's change queue
+        self._queue = None
+        self._method_ids: list[int] = ()
 
     def _add_process_method(self, func):
         if func not in self._process_methods:
+            if type(self._process_methods) is not list:
+                self._process_methods = list(self._process_methods)
             self._process_methods.append(func)
+            self._queue = None
 
     def _parent_has_process_method(self, parent: PyVObj):
         return (hasattr(parent, 'process')
                 and inspect.ismethod(getattr(parent, 'process')))
 
     def init_process_methods(self, parent: PyVObj):
-        if self._process_methods == []:
+        if not self._process_methods:
             if self._parent_has_process_method(parent):
                 self._add_process_method(parent.process)
-        elif self._process_methods == [None]:
-            self._process_methods = []
+        elif self._process_methods is _NO_PROCESS:
+            self._process_methods = ()
+            self._queue = None
+        for m in self._change_filters:
+            if m not in self._process_methods:
+                raise ValueError(f"ERROR: Method {m.__name__} has sensitive fields, but is not a sensitive method.")  # noqa: E501
 
         # Add process methods to simulation queue so they get executed in the
         # first cycle no matter what
         self.add_methods_to_sim_queue()
 
     def add_methods_to_sim_queue(self):
-        import pyv.simulator as simulator
-        for func in self._process_methods:
-            simulator.Simulator.globalSim._add_to_change_queue(func)
+        queue = self._ctx.sim._change_queue
+        if queue is not self._queue:
+            self._method_ids = [
+                queue.register(func) for func in self._process_methods
+                if func is not None
+            ]
+            self._queue = queue
+        for i in self._method_ids:
+            queue.push_id(i)
 
 
 class PortRW(Port, Generic[T]):
     """Base class for read/write ports"""
+
+    __slots__ = ('_watchers',)
+    _checked_type: type = None
+    # Set on the unchecked variant of a port class (see
+    # `_set_write_checks()`): the regular class.
+
     def __init__(self, type: Type[T]):
         """Create a new `PortRW` object.
 
@@ -119,6 +332,8 @@ class PortRW(Port, Generic[T]):
             type: Data type for this port.
         """
         super().__init__(type, None)
+        # Objects to mark dirty when the value of this port changes
+        self._watchers: tuple = ()
 
     def read(self) -> T:
         """Reads the current value of the port.
@@ -126,10 +341,7 @@ class PortRW(Port, Generic[T]):
         Returns:
             The current value of the port.
         """
-        if self._root_driver is self:
-            return self._val
-        else:
-            return self._root_driver.read()
+        return self._net.val
 
     def write(self, val: T):
         """Writes a new value to the port.
@@ -146,36 +358,80 @@ class PortRW(Port, Generic[T]):
         """
 
         if self._root_driver is self:
-            def update_val_and_propagate():
-                oldVal = self._val
-                newVal = val
-                self._val = newVal
-                self._propagate(oldVal, newVal)
-
-            # If the value is different from the current value we have to
-            # propagate the change to all children ports.
-
             # Make sure the type is correct
             if type(val) is not self._type:
                 raise TypeError(f"ERROR: Cannot write value of type {type(val)} to Port {self.name} which is of type {self._type}.")  # noqa: E501
 
-            if self._val != val:
-                update_val_and_propagate()
+            # If the value is different from the current value we have to
+            # propagate the change to all children ports.
+            net = self._net
+            if net.val != val:
+                oldVal = net.val
+                net.val = val
+                for w in net.watchers:
+                    w._mark_dirty()
+                ctx = net.ctx
+                if ctx.notify_enabled:
+                    self._propagate(oldVal, val)
+                else:
+                    ctx.silent_changes.append(net)
 
         else:
             raise Exception(f"ERROR (Port '{self.name}'): Only root driver port allowed to write!")  # noqa: E501
 
+    def _write_unchecked(self, val: T):
+        """`write()` without the root driver and type checks."""
+        net = self._net
+        if net.val != val:
+            oldVal = net.val
+            net.val = val
+            for w in net.watchers:
+                w._mark_dirty()
+            ctx = net.ctx
+            if ctx.notify_enabled:
+                self._propagate(oldVal, val)
+            else:
+                ctx.silent_changes.append(net)
+
+    def _set_write_checks(self, enabled: bool):
+        """Switches `write()` of a root port between the regular, checked
+        version and `_write_unchecked()`.
+
+        The port's class is swapped for a variant that only differs in
+        `write()`, so neither version has to test a flag on every write.
+        Non-root ports always keep the checked version.
+        """
+        cls = self.__class__
+        if enabled:
+            if cls._checked_type is not None:
+                self.__class__ = cls._checked_type
+        elif cls._checked_type is None and self._root_driver is self:
+            self.__class__ = _unchecked_type(cls)
+
     def _propagate(self, oldVal: T, newVal: T):
         """Propagate a value change.
         """
-        logger.debug(f"Port {self.name} changed from {oldVal} to {newVal}.")
-
-        for port in self._downstream_inputs:
-            logger.debug(f"Notifying {port.name}")
-            port._notify()
+        if self._ctx.trace.debug:
+            logger.debug(f"Port {self.name} changed from {oldVal} to {newVal}.")  # noqa: E501
+        self._net.notify(oldVal, newVal)
 
     def _set_root_driver(self, newRoot: Port):
         self._root_driver = newRoot
+        net = self._net = newRoot._net
+        if self._watchers:
+            net.watchers = (*net.watchers, *self._watchers)
+
+    def _add_watcher(self, obj):
+        """Calls `obj._mark_dirty()` whenever the value of this port changes.
+
+        Used for clocked elements (see `Clocked._mark_dirty()`) and gated
+        on-stable callbacks.
+        """
+        # Watchers are only added while building the design, so they are kept
+        # in (smaller) tuples
+        self._watchers = (*self._watchers, obj)
+        net = self._net
+        net.watchers = (*net.watchers, obj)
 
     def _update_root_driver(self, driver: Port):
         self._set_root_driver(driver._root_driver)
@@ -216,8 +472,9 @@ class PortRW(Port, Generic[T]):
         # Make the driver this port's parent.
         # Add this port to the list of the driver's children.
         if self._parent is None:
+            self._set_write_checks(True)
             self._parent = driver
-            driver._children.append(self)
+            driver._add_child(self)
             self._update_root_driver(driver)
             self._clear_root_attrs()
         else:
@@ -236,13 +493,51 @@ class PortRW(Port, Generic[T]):
         self.connect(driver)
 
 
+_unchecked_types: dict[type, type] = {}
+
+
+def _unchecked_type(cls: type) -> type:
+    """Returns the unchecked variant of a port class (see
+    `PortRW._set_write_checks()`)."""
+    t = _unchecked_types.get(cls)
+    if t is None:
+        t = _unchecked_types[cls] = type(cls.__name__, (cls,), {
+            '__slots__': (),
+            '__module__': cls.__module__,
+            '__qualname__': cls.__qualname__,
+            '_checked_type': cls,
+            'write': PortRW._write_unchecked,
+        })
+    return t
+
+
 class Input(PortRW[T]):
     """Represents an **Input** port."""
-    def __init__(self, type: type[T], sensitive_methods=[]):
+
+    __slots__ = ('_process_method_handler',)
+
+    def __init__(
+        self,
+        type: type[T],
+        sensitive_methods=[],
+        sensitive_fields: dict = None
+    ):
         """Create a new input port.
 
         If the value of the input changes, sensitive method will be triggered.
 
+        For inputs of a `Latch` or `Struct` type, a method can be made
+        sensitive to individual fields of the value only. It is then only
+        triggered if one of these fields changes:
+
+        ```
+        self.IDEX_i = Input(
+            IDEX_t,
+            sensitive_methods=[self.process, self.pass_through],
+            sensitive_fields={self.pass_through: ['rd', 'we']}
+        )
+        ```
+
         Args:
             type (type[T]): Data type of this input
             sensitive_methods (list, optional): List of methods to trigger when
@@ -253,33 +548,34 @@ class Input(PortRW[T]):
                 this port. **Important**: if you provide a custom sensitivity
                 list, but still want the default `process()` to be triggered as
                 well, you have to include it explicitly in the list.
+            sensitive_fields (dict, optional): Maps sensitive methods to the
+                names of the fields they are sensitive to. Methods not listed
+                here are sensitive to the whole value.
+
+        Raises:
+            TypeError: `sensitive_fields` given for a type without fields.
+            ValueError: Unknown field name.
         """
         super().__init__(type)
-        self._process_method_handler = _ProcessMethodHandler(sensitive_methods)
+        self._process_method_handler = _ProcessMethodHandler(
+            sensitive_methods, self._ctx, type, sensitive_fields)
 
     def _init(self, parent: PyVObj):
         super()._init(parent)
         self._process_method_handler.init_process_methods(parent)
+        self._net.invalidate()
 
     def _set_root_driver(self, newRoot: Port):
         super()._set_root_driver(newRoot)
         newRoot._add_downstream_input(self)
-
-    def _propagate(self, oldVal: T, newVal: T):
-        # TODO: Figure out how to log the change before the log of process
-        # queue
-
-        # logger.debug(f"Port {self.name} changed from {oldVal} to {newVal}.")
-
-        self._process_method_handler.add_methods_to_sim_queue()
-        super()._propagate(oldVal, newVal)
-
-    def _notify(self):
-        self._process_method_handler.add_methods_to_sim_queue()
+        self._net.invalidate()
 
 
 class Output(PortRW[T]):
     """Represents an **Output** port."""
+
+    __slots__ = ()
+
     def __init__(self, type: type[T]):
         """Create a new ouput port.
 
@@ -300,20 +596,32 @@ class Wire(Input[T]):
 
     If wire value changes, sensitive methods are triggered.
     """
-    def __init__(self, type: Type[T], sensitive_methods=[]):
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        type: Type[T],
+        sensitive_methods=[],
+        sensitive_fields: dict = None
+    ):
         """Create a new wire.
 
         Args:
             type: Data type of wire value
             sensitive_methods (list, optional): See `Input.__init__()`.
+            sensitive_fields (dict, optional): See `Input.__init__()`.
         """
-        super().__init__(type, sensitive_methods)
+        super().__init__(type, sensitive_methods, sensitive_fields)
 
 
 class Constant(Port):
     """Represents a constant signal. Once initialized, its value cannot be
     changed.
     """
+
+    __slots__ = ()
+
     def __init__(self, constVal: Any):
         """Create a new constant signal.
 
@@ -323,4 +631,4 @@ class Constant(Port):
         super().__init__(type(constVal), constVal)
 
     def read(self):
-        return self._val
+        return self._net.val
@@ -1,7 +1,7 @@
-import copy
-from pyv.util import PyVObj
+from pyv.util import PyVObj, get_copy_fn
 from pyv.port import Input, Wire
-from pyv.clocked import Clocked, RegList
+from pyv.clocked import Clocked
+from pyv.context import get_context
 from pyv.log import logger
 from typing import TypeVar, Generic, Type
 
@@ -9,7 +9,15 @@ T = TypeVar('T')
 
 
 class Reg(PyVObj, Clocked, Generic[T]):
-    """Represents a register."""
+    """Represents a register.
+
+    The reset input `rst` is only allocated when it is first accessed. Until
+    then, the register behaves as if `rst` was 0.
+    """
+
+    __slots__ = ('next', 'cur', '_rst', '_clocked_list', '_trace', '_dirty',
+                 '_nextv', '_reset_val', '_copy', '_do_reset', '_do_tick')
+    _track_dirty = True
 
     def __init__(self, type: Type[T], resetVal: T = 0, sensitive_methods=[]):
         """Create a new register.
@@ -22,21 +30,50 @@ class Reg(PyVObj, Clocked, Generic[T]):
         """
         super().__init__(name='UnnamedRegister')
 
-        # Add this register to the global register list
-        RegList.add_to_reg_list(self)
+        # Add this register to the register list of the current context
+        ctx = get_context()
+        self._clocked_list = ctx.regs
+        self._clocked_list.add_to_reg_list(self)
+        self._trace = ctx.trace
 
         self.next: Input = Input(type, [None])
         """Next value input"""
         self.cur: Wire = Wire(type, sensitive_methods)
         """Current value output"""
-        self.rst: Input = Input(int, [None])
-        """Synchronous Reset in (active high)"""
+        # Reset input (see `rst`)
+        self._rst: Input = None
+
+        # The register only needs to be visited on a clock edge if one of
+        # these ports changed since the last edge.
+        self.next._add_watcher(self)
+        self.cur._add_watcher(self)
 
         self._nextv = 0
         self._reset_val = resetVal
+        # How to copy the next value (None: immutable, no copy needed)
+        self._copy = get_copy_fn(type)
 
         # Whether to do a reset on the next tick
         self._do_reset = False
+        # Whether to update the current value on the next tick
+        self._do_tick = False
+
+    @property
+    def rst(self) -> Input:
+        """Synchronous Reset in (active high)"""
+        rst = self._rst
+        if rst is None:
+            rst = self._rst = Input(int, [None])
+            rst._add_watcher(self)
+            if self._visited:
+                rst.name = self.name + '.rst'
+                rst._init(self)
+        return rst
+
+    def _init(self, parent=None):
+        super()._init(parent)
+        if self._rst is not None:
+            self._rst.name = self.name + '.rst'
 
     def _prepare_next_val(self):
         """Copies the next value to an internal variable.
@@ -48,18 +85,23 @@ class Reg(PyVObj, Clocked, Generic[T]):
         self._do_reset = False
         self._do_tick = False
 
-        if self.rst.read() == 1:
+        rst = self._rst
+        rst = 0 if rst is None else rst.read()
+        if rst == 1:
             self._do_reset = True
-        elif self.rst.read() == 0:
-            if self.cur.read() != self.next.read():
-                self._nextv = copy.deepcopy(self.next.read())
+        elif rst == 0:
+            nextv = self.next.read()
+            if self.cur.read() != nextv:
+                copy_val = self._copy
+                self._nextv = nextv if copy_val is None else copy_val(nextv)
                 self._do_tick = True
         else:
             raise Exception("Error: Invalid rst signal!")
 
     def _tick(self):
         if self._do_reset:
-            logger.debug(f"Sync reset on register {self.name}. Reset value: {self._reset_val}.")  # noqa: E501
+            if self._trace.debug:
+                logger.debug(f"Sync reset on register {self.name}. Reset value: {self._reset_val}.")  # noqa: E501
             self._reset()
         elif self._do_tick:
             self.cur.write(self._nextv)
@@ -67,12 +109,25 @@ class Reg(PyVObj, Clocked, Generic[T]):
     def _reset(self):
         self.cur.write(self._reset_val)
 
+    def _mark_dirty(self):
+        self._clocked_list.mark_dirty(self)
+
+    def _is_idle(self) -> bool:
+        if self._do_reset:
+            return self.cur.read() == self._reset_val
+        return not self._do_tick
+
 
 class Regfile(Clocked):
     """RISC-V: Integer register file."""
 
+    _track_dirty = True
+
     def __init__(self):
-        RegList.add_to_reg_list(self)
+        ctx = get_context()
+        self._clocked_list = ctx.regs
+        self._clocked_list.add_to_reg_list(self)
+        self._trace = ctx.trace
         self.regs = [0] * 32
         self._next_w_idx = 0
         self._next_w_val = 0
@@ -103,7 +158,8 @@ class Regfile(Clocked):
             # because the decoder will only feed-in valid 5 bit indeces.
             try:
                 val = self.regs[reg]
-                logger.debug(f"Regfile READ: x{reg} = {val}")
+                if self._trace.debug:
+                    logger.debug(f"Regfile READ: x{reg} = {val}")
             except IndexError:
                 val = 0
 
@@ -123,11 +179,18 @@ class Regfile(Clocked):
             self._next_w_idx = reg
             self._next_w_val = val
             self.we = True
+            self._clocked_list.mark_dirty(self)
 
     def _prepare_next_val(self):
         # Not needed for now, as we don't have Input ports here
         pass
 
+    def _mark_dirty(self):
+        self._clocked_list.mark_dirty(self)
+
+    def _is_idle(self) -> bool:
+        return not self.we
+
     def _tick(self):
         """Register file tick.
 
@@ -136,7 +199,8 @@ class Regfile(Clocked):
         if not self.we:
             return
 
-        logger.debug(f"Regfile WRITE: x{self._next_w_idx} changed from {self.regs[self._next_w_idx]} to {self._next_w_val}")  # noqa: E501
+        if self._trace.debug:
+            logger.debug(f"Regfile WRITE: x{self._next_w_idx} changed from {self.regs[self._next_w_idx]} to {self._next_w_val}")  # noqa: E501
         self.regs[self._next_w_idx] = self._next_w_val
 
         # TODO: Technically, it shouldn't be the regfile's responsibility to
@@ -150,3 +214,153 @@ class Regfile(Clocked):
         # external modules, so it's actually not the memories responsibility to
         # reset them. We still do for additional simulation safety.
         self.we = False
+
+
+class RegArray(PyVObj, Clocked, Generic[T]):
+    """A bank of registers, clocked as a single element.
+
+    Compared to a list of `Reg`s, a register array has no ports per element.
+    Elements are read with `read()`, and written with `write_request()`. All
+    write requests are committed together on the next clock edge.
+
+    Processes that need to be notified when an element changes can subscribe
+    to it via `output()`. Only subscribed elements have a port.
+
+    Useful for modelling register files, FIFOs, or tag arrays.
+    """
+
+    _track_dirty = True
+
+    def __init__(self, type: Type[T], size: int, resetVal: T = 0):
+        """Create a new register array.
+
+        Args:
+            type: Data type of the elements.
+            size: Number of elements.
+            resetVal (optional): Reset value of all elements. Defaults to 0.
+        """
+        super().__init__(name='UnnamedRegArray')
+
+        ctx = get_context()
+        self._clocked_list = ctx.regs
+        self._clocked_list.add_to_reg_list(self)
+        self._trace = ctx.trace
+
+        self._type = type
+        self._size = size
+        self._reset_val = resetVal
+        # How to copy written values (None: immutable, no copy needed)
+        self._copy = get_copy_fn(type)
+        self.vals: list[T] = self._reset_vals()
+        """Current values"""
+        # Write requests to commit on the next tick (index -> value)
+        self._pending: dict[int, T] = {}
+        # Ports of subscribed elements (index -> port)
+        self._outs: dict[int, Wire] = {}
+
+    def _reset_vals(self) -> list[T]:
+        copy_val = self._copy
+        if copy_val is None:
+            return [self._reset_val] * self._size
+        return [copy_val(self._reset_val) for _ in range(self._size)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, idx: int) -> T:
+        """Reads the current value of an element.
+
+        Raises:
+            IndexError: Index out of range.
+        """
+        return self.vals[idx]
+
+    def write_request(self, idx: int, val: T):
+        """Requests a write to an element.
+
+        The write is committed with the next _tick(). If the same element is
+        written more than once before that, the last write wins.
+
+        Args:
+            idx (int): Index of the element to write.
+            val: Value to write.
+
+        Raises:
+            IndexError: Index out of range.
+        """
+        if not 0 <= idx < self._size:
+            raise IndexError(f"ERROR (RegArray '{self.name}'): Index {idx} out of range.")  # noqa: E501
+        copy_val = self._copy
+        self._pending[idx] = val if copy_val is None else copy_val(val)
+        self._clocked_list.mark_dirty(self)
+
+    def output(self, idx: int, sensitive_methods=[]) -> Wire:
+        """Returns a port that follows the value of an element.
+
+        Calling this again for the same element returns the same port. Must
+        be called before the simulator is initialized.
+
+        Args:
+            idx (int): Index of the element.
+            sensitive_methods (list, optional): Methods to trigger when the
+                value of the element changes (see `Reg.__init__()`).
+
+        Raises:
+            IndexError: Index out of range.
+        """
+        out = self._outs.get(idx)
+        if out is None:
+            val = self.vals[idx]
+            out = self._outs[idx] = Wire(self._type, sensitive_methods)
+            out._val = val
+        else:
+            for m in sensitive_methods:
+                out._process_method_handler._add_process_method(m)
+        return out
+
+    def _init(self, parent=None):
+        if self._visited:
+            return
+        self._visited = True
+
+        for idx, out in self._outs.items():
+            out.name = f"{self.name}[{idx}]"
+            out._init(self)
+
+    def _prepare_next_val(self):
+        # Write requests are already buffered
+        pass
+
+    def _mark_dirty(self):
+        self._clocked_list.mark_dirty(self)
+
+    def _is_idle(self) -> bool:
+        vals = self.vals
+        for idx, val in self._pending.items():
+            if vals[idx] != val:
+                return False
+        return True
+
+    def _tick(self):
+        """Commits all write requests."""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = {}
+        vals = self.vals
+        outs = self._outs
+        for idx, val in pending.items():
+            if self._trace.debug:
+                logger.debug(f"RegArray {self.name} WRITE: [{idx}] changed from {vals[idx]} to {val}")  # noqa: E501
+            vals[idx] = val
+            out = outs.get(idx)
+            if out is not None:
+                out.write(val)
+
+    def _reset(self):
+        """Resets all elements to the reset value and drops pending write
+        requests."""
+        self.vals = self._reset_vals()
+        self._pending = {}
+        for idx, out in self._outs.items():
+            out.write(self.vals[idx])
@@ -0,0 +1,386 @@
+"""Static scheduling of process methods.
+
+During elaboration (`Simulator.init()`), the port graph is scanned to find out
+which process methods can trigger which other process methods. From this
+graph, every process method is assigned a *rank* such that a method is ranked
+lower than all methods it can trigger. The simulator always runs the queued
+method with the lowest rank first, so each method is only evaluated once its
+upstream logic has settled.
+
+Besides the sensitivity lists, a method may also read ports of modules it
+merely holds a reference to (e.g., `IDStage` reading CSR values through
+`CSRUnit.read()`). Such a method is ranked after the writers of those ports,
+so it never reads a stale value.
+
+Methods that are part of a combinational feedback loop end up in the same
+strongly connected component (SCC) and share the same rank. Among those, the
+simulator falls back to the regular first-in-first-out order, iterating until
+the values become stable.
+"""
+
+import inspect
+from types import CodeType
+from typing import Callable, Iterable
+from pyv.clocked import Clocked
+from pyv.port import Input, Output, Port, PortRW, Wire
+from pyv.util import PyVObj, VArray, VMap, pyv_attrs
+
+
+def _owner(fn: Callable):
+    """Returns the object a (bound) process method belongs to."""
+    return getattr(fn, '__self__', None)
+
+
+def _code_names(fn: Callable, owner) -> set[str]:
+    """Returns all attribute names used by a method.
+
+    Names used by other methods of `owner` that are called by `fn` (e.g.,
+    helpers like `write_output()`) are included as well.
+
+    Returns:
+        The set of names, or `None` if `fn` is no regular Python method.
+    """
+    code = getattr(getattr(fn, '__func__', fn), '__code__', None)
+    if code is None:
+        return None
+
+    names = set()
+    todo = [code]
+    seen = set()
+    while todo:
+        code = todo.pop()
+        if code in seen:
+            continue
+        seen.add(code)
+        names.update(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, CodeType):
+                todo.append(const)
+        for name in code.co_names:
+            attr = getattr(type(owner), name, None)
+            if inspect.isfunction(attr):
+                todo.append(attr.__code__)
+    return names
+
+
+def _sub_objs(obj: PyVObj):
+    return [sub for _, sub in _sub_items(obj)]
+
+
+def _sub_items(obj: PyVObj):
+    if isinstance(obj, (VMap, VArray)):
+        elems = obj._elems
+        return elems.items() if isinstance(elems, dict) else enumerate(elems)
+    return pyv_attrs(obj)
+
+
+def _writable_ports(owner) -> dict[str, list[Port]]:
+    """Collects all ports a process method of `owner` can write to.
+
+    Ports of the owner itself (including those reachable via non-module
+    containers, e.g., `ReadPort`) are all taken into account. Of *foreign*
+    objects, i.e., submodules and registers, only the (non-wire) inputs are
+    considered, because a module would only ever drive those.
+
+    Returns:
+        The ports, grouped by the name of the owner's attribute they were
+        reached from.
+    """
+    from pyv.module import Module
+
+    ports = {}
+    visited = {id(owner)}
+
+    def visit(obj: PyVObj, foreign: bool, found: dict):
+        if isinstance(obj, Port):
+            if (not foreign
+                    or (isinstance(obj, Input) and not isinstance(obj, Wire))):
+                found[id(obj)] = obj
+            return
+        if id(obj) in visited:
+            return
+        visited.add(id(obj))
+        if isinstance(obj, (Module, Clocked)):
+            foreign = True
+        for sub in _sub_objs(obj):
+            visit(sub, foreign, found)
+
+    if isinstance(owner, PyVObj):
+        for key, obj in _sub_items(owner):
+            found = {}
+            visit(obj, False, found)
+            ports[key] = list(found.values())
+    return ports
+
+
+def _hierarchy(tops: Iterable[PyVObj]) -> dict[int, PyVObj]:
+    """Maps each object (by id) to its parent in the design hierarchy.
+
+    Like `PyVObj._init()`, the first object visiting another one becomes its
+    parent.
+    """
+    parents = {}
+    visited = set()
+
+    def visit(obj: PyVObj, parent):
+        if id(obj) in visited:
+            return
+        visited.add(id(obj))
+        parents[id(obj)] = parent
+        if not isinstance(obj, Port):
+            for sub in _sub_objs(obj):
+                visit(sub, obj)
+
+    for top in tops:
+        visit(top, None)
+    return parents
+
+
+def _is_descendant(obj: PyVObj, ancestor: PyVObj, parents) -> bool:
+    parent = parents.get(id(obj))
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parents.get(id(parent))
+    return False
+
+
+def _referenced_outputs(owner, parents) -> dict[str, list[Port]]:
+    """Collects outputs of modules `owner` holds a reference to.
+
+    Only modules which are *not* part of the owner's own hierarchy are taken
+    into account. Submodules are expected to be read via connected ports.
+
+    Returns:
+        The ports, grouped by the name of the owner's attribute they were
+        reached from.
+    """
+    from pyv.module import Module
+
+    ports = {}
+    visited = {id(owner)}
+
+    def collect(obj: PyVObj, found: dict):
+        if isinstance(obj, Port):
+            if isinstance(obj, Output):
+                found[id(obj)] = obj
+            return
+        if id(obj) in visited:
+            return
+        visited.add(id(obj))
+        for sub in _sub_objs(obj):
+            collect(sub, found)
+
+    def visit(obj: PyVObj, found: dict):
+        if isinstance(obj, Port) or id(obj) in visited:
+            return
+        if isinstance(obj, Module):
+            if not _is_descendant(obj, owner, parents):
+                collect(obj, found)
+            return
+        visited.add(id(obj))
+        for sub in _sub_objs(obj):
+            visit(sub, found)
+
+    if isinstance(owner, PyVObj):
+        for key, obj in _sub_items(owner):
+            found = {}
+            visit(obj, found)
+            ports[key] = list(found.values())
+    return ports
+
+
+def _used_ports(ports: dict[str, list[Port]], names: set[str]) -> list[Port]:
+    """Filters ports by the attribute names a method uses."""
+    return [p for key, group in ports.items()
+            if names is None or key in names
+            for p in group]
+
+
+def _triggered_methods(port: Port) -> list[Callable]:
+    """Returns all process methods triggered by a write to root `port`."""
+    methods = []
+    if isinstance(port, Input):
+        methods += port._process_method_handler._process_methods
+    for inp in port._downstream_inputs:
+        methods += inp._process_method_handler._process_methods
+    return methods
+
+
+class Schedule:
+    """Levelized schedule of process methods."""
+
+    def __init__(self, methods: Iterable[Callable] = ()):
+        self._succ: dict[Callable, list[Callable]] = {}
+        self._ranks: dict[Callable, int] = {}
+        self._feedback: set[Callable] = set()
+        self.stale = False
+        """Whether the ranks have to be recomputed due to newly learned
+        edges."""
+
+        for m in methods:
+            self.add_method(m)
+
+    @classmethod
+    def from_ports(
+        cls,
+        ports: Iterable[Port],
+        tops: Iterable[PyVObj] = ()
+    ) -> 'Schedule':
+        """Builds a schedule from the given list of ports.
+
+        Args:
+            ports: All ports of the design (e.g.,
+                `SimContext.ports.port_list`).
+            tops: Top-level objects of the design. Used to determine the
+                design hierarchy.
+        """
+        sched = cls()
+        for p in ports:
+            if isinstance(p, Input):
+                for m in p._process_method_handler._process_methods:
+                    sched.add_method(m)
+
+        owners = {}
+        for m in sched._succ:
+            owner = _owner(m)
+            if owner is not None:
+                owners.setdefault(id(owner), (owner, []))[1].append(m)
+
+        # Derive edges from the ports each method can write to. Only ports
+        # reached via attributes the method (or a helper it calls) actually
+        # uses are taken into account.
+        writers = {}
+        readers = []
+        parents = _hierarchy(tops)
+        for owner, methods in owners.values():
+            writable = _writable_ports(owner)
+            referenced = _referenced_outputs(owner, parents)
+            for m in methods:
+                names = _code_names(m, owner)
+                for p in _used_ports(writable, names):
+                    if isinstance(p, PortRW) and p._root_driver is p:
+                        writers.setdefault(id(p), []).append(m)
+                        for t in _triggered_methods(p):
+                            if t is not None and t is not m:
+                                sched.add_edge(m, t)
+                for p in _used_ports(referenced, names):
+                    readers.append((p, m))
+
+        # Readers of referenced modules' outputs come after their writers
+        for p, m in readers:
+            for w in writers.get(id(p._root_driver), []):
+                if _owner(w) is not _owner(m):
+                    sched.add_edge(w, m)
+
+        sched.levelize()
+        return sched
+
+    def add_method(self, fn: Callable):
+        if fn is not None and fn not in self._succ:
+            self._succ[fn] = []
+            self.stale = True
+
+    def add_edge(self, src: Callable, dst: Callable):
+        """Adds a dependency: `src` can trigger `dst`."""
+        self.add_method(src)
+        self.add_method(dst)
+        succ = self._succ[src]
+        if src != dst and dst not in succ:
+            succ.append(dst)
+            self.stale = True
+
+    def rank(self, fn: Callable) -> int:
+        """Returns the rank of a method. Unknown methods have rank -1."""
+        return self._ranks.get(fn, -1)
+
+    def is_feedback(self, fn: Callable) -> bool:
+        """Whether `fn` is part of a combinational feedback loop."""
+        return fn in self._feedback
+
+    def num_methods(self) -> int:
+        return len(self._succ)
+
+    def groups(self) -> list[list[Callable]]:
+        """Returns all methods grouped by rank, in ascending rank order.
+
+        Groups with more than one method form a feedback loop.
+        """
+        groups = {}
+        for m, r in self._ranks.items():
+            groups.setdefault(r, []).append(m)
+        return [groups[r] for r in sorted(groups)]
+
+    def learn(self, src: Callable, dst: Callable):
+        """Record that `src` triggered `dst` during simulation.
+
+        Only edges that contradict the current ranks are recorded. The ranks
+        are recomputed lazily (see `stale`).
+        """
+        if src == dst:
+            return
+        if dst not in self._ranks or self._ranks[dst] < self.rank(src):
+            self.add_edge(src, dst)
+
+    def levelize(self):
+        """(Re-)computes the rank of each method."""
+        sccs = self._sccs()
+        # Tarjan's algorithm emits SCCs in reverse topological order.
+        num = len(sccs)
+        self._ranks = {}
+        self._feedback = set()
+        for i, scc in enumerate(sccs):
+            for m in scc:
+                self._ranks[m] = num - 1 - i
+            if len(scc) > 1:
+                self._feedback.update(scc)
+        self.stale = False
+
+    def _sccs(self) -> list[list[Callable]]:
+        """Iterative version of Tarjan's SCC algorithm."""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        sccs = []
+        counter = 0
+
+        for root in self._succ:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                succ = self._succ[node]
+                recurse = False
+                while i < len(succ):
+                    nxt = succ[i]
+                    i += 1
+                    if nxt not in index:
+                        work.append((node, i))
+                        work.append((nxt, 0))
+                        recurse = True
+                        break
+                    elif nxt in on_stack:
+                        lowlink[node] = min(lowlink[node], index[nxt])
+                if recurse:
+                    continue
+                if lowlink[node] == index[node]:
+                    scc = []
+                    while True:
+                        m = stack.pop()
+                        on_stack.discard(m)
+                        scc.append(m)
+                        if m == node:
+                            break
+                    sccs.append(scc)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+        return sccs
@@ -0,0 +1,244 @@
+"""Automatic sensitivity inference.
+
+Sensitivity lists are usually declared by hand. Lists that are too broad
+cause redundant evaluations, while a missing entry causes a method to miss
+updates. This module can check (and fix) them based on what the process
+methods actually do:
+
+During a *calibration run*, all port reads are traced, and attributed to the
+process method performing them (also via helper methods). Afterwards, the
+read ports are compared to the declared sensitivity lists:
+
+```
+sim.init()
+report = sim.infer_sensitivity(1000)
+report.apply()
+```
+
+The calibration run is a regular run in the cycle-based mode, so every
+process method is evaluated in every cycle. Only inputs can be sensitivity
+targets; reads of outputs and constant-driven inputs are ignored.
+
+By default, `apply()` only adds missing sensitivities. Inputs that were not
+read during the calibration run are considered unused, but they may well be
+read on paths the workload did not cover (e.g., CSR writes). Removing them
+(`apply(prune=True)`) is only safe with a workload that covers all paths.
+
+The calibration run simulates the design itself: Afterwards, ports,
+registers, and memories hold the state reached by the calibration run. Reset
+the design (and reload memories) before the actual run, or calibrate a
+separate instance of the design.
+"""
+
+import sys
+from typing import Callable
+from pyv.log import logger
+from pyv.port import Constant, Input, Port, _unchecked_type
+
+
+def _traced_type(cls: type, record: Callable) -> type:
+    def read(self):
+        record(self)
+        return self._net.val
+
+    return type(cls.__name__, (cls,), {
+        '__slots__': (),
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '_untraced_type': cls,
+        'read': read,
+    })
+
+
+def _untraced_class(cls: type) -> type:
+    """Returns the class of a port after tracing.
+
+    Write checks may have been switched while tracing (see
+    `PortRW._set_write_checks()`), so the unchecked variant is derived
+    again from the plain port class if needed.
+    """
+    plain = next(c for c in cls.__mro__
+                 if vars(c).get('_untraced_type') is None
+                 and vars(c).get('_checked_type') is None)
+    if getattr(cls, '_checked_type', None) is not None:
+        return _unchecked_type(plain)
+    return plain
+
+
+class ReadTracer:
+    """Records which ports each process method reads.
+
+    While the tracer is active (`with` statement), all ports of the context
+    are switched to a variant of their class with a tracing `read()`.
+    """
+
+    def __init__(self, ports: list[Port], methods: list[Callable]):
+        self._ports = ports
+        self._methods = methods
+        self.reads: dict[Callable, dict[int, Port]] = {
+            m: {} for m in methods}
+        """For each method: The ports it read (by id)"""
+        # Code object -> owner id -> method
+        self._codes: dict = {}
+        for m in methods:
+            fn = getattr(m, '__func__', m)
+            code = getattr(fn, '__code__', None)
+            if code is not None:
+                owner = getattr(m, '__self__', None)
+                key = None if owner is None else id(owner)
+                self._codes.setdefault(code, {})[key] = m
+        self._types: dict[type, type] = {}
+
+    def _record(self, port: Port):
+        codes = self._codes
+        # Skip the tracing read() itself
+        f = sys._getframe(2)
+        while f is not None:
+            owners = codes.get(f.f_code)
+            if owners is not None:
+                owner = f.f_locals.get('self')
+                m = owners.get(None if owner is None else id(owner))
+                if m is None:
+                    m = owners.get(None)
+                if m is not None:
+                    self.reads[m][id(port)] = port
+                    return
+            f = f.f_back
+
+    def __enter__(self) -> 'ReadTracer':
+        types = self._types
+        for p in self._ports:
+            cls = p.__class__
+            t = types.get(cls)
+            if t is None:
+                t = types[cls] = _traced_type(cls, self._record)
+            p.__class__ = t
+        return self
+
+    def __exit__(self, *exc):
+        for p in self._ports:
+            p.__class__ = _untraced_class(p.__class__)
+
+
+def _is_dynamic(port: Port) -> bool:
+    # Whether the port could be a sensitivity target
+    return (isinstance(port, Input)
+            and not isinstance(port._root_driver, Constant))
+
+
+class SensitivityReport:
+    """Result of a calibration run (see `Simulator.infer_sensitivity()`)."""
+
+    def __init__(self, sim, inputs: list[Input], reads: dict):
+        self._sim = sim
+        self._inputs = inputs
+        self.read: dict[Callable, list[Input]] = {}
+        """For each process method: The inputs it read"""
+        self.sensitive: dict[Callable, list[Input]] = {m: [] for m in reads}
+        """For each process method: The inputs it is sensitive to"""
+
+        for m, ports in reads.items():
+            self.read[m] = [p for p in ports.values() if _is_dynamic(p)]
+        for p in inputs:
+            for m in p._process_method_handler._process_methods:
+                if m in self.sensitive:
+                    self.sensitive[m].append(p)
+
+    def missing(self, method: Callable) -> list[Input]:
+        """Returns inputs `method` read, but is not sensitive to."""
+        sensitive = self.sensitive[method]
+        return [p for p in self.read[method]
+                if not any(p is s for s in sensitive)]
+
+    def unused(self, method: Callable) -> list[Input]:
+        """Returns inputs `method` is sensitive to, but never read."""
+        read = self.read[method]
+        return [p for p in self.sensitive[method]
+                if not any(p is r for r in read)]
+
+    def log(self):
+        """Logs a warning for each method that read inputs it is not
+        sensitive to, and an info message for each method with unused
+        sensitivities."""
+        for m in self.read:
+            missing = self.missing(m)
+            if missing:
+                names = ', '.join(p.name for p in missing)
+                logger.warning(f"Process method {m.__qualname__} reads inputs it is not sensitive to: {names}")  # noqa: E501
+            unused = self.unused(m)
+            if unused:
+                names = ', '.join(p.name for p in unused)
+                logger.info(f"Process method {m.__qualname__} is sensitive to inputs it never read: {names}")  # noqa: E501
+
+    def apply(self, prune: bool = False):
+        """Makes each method sensitive to all inputs it read during the
+        calibration run (see `missing()`).
+
+        The static schedule is recomputed.
+
+        Args:
+            prune (bool, optional): Also remove sensitivities to inputs that
+                were never read (see `unused()`), leaving the minimal lists.
+                Only use this if the calibration workload covered all paths.
+                Methods that did not read any input keep their sensitivities.
+                Defaults to False.
+        """
+        readers: dict[int, list[Callable]] = {}
+        calibrated = set()
+        for m, ports in self.read.items():
+            if ports:
+                calibrated.add(m)
+            for p in ports:
+                readers.setdefault(id(p), []).append(m)
+
+        for p in self._inputs:
+            handler = p._process_method_handler
+            new = [m for m in handler._process_methods
+                   if not prune or m not in calibrated
+                   or m in readers.get(id(p), ())]
+            for m in readers.get(id(p), ()):
+                if m not in new:
+                    new.append(m)
+            if new == list(handler._process_methods):
+                continue
+            handler._process_methods = new or ()
+            handler._queue = None
+            if handler._change_filters:
+                handler._change_filters = {
+                    m: f for m, f in handler._change_filters.items()
+                    if m in new}
+            p._net.invalidate()
+
+        self._sim._levelize()
+
+
+def infer_sensitivity(sim, num_cycles: int) -> SensitivityReport:
+    """Runs a calibration run, and compares the ports read by each process
+    method to its sensitivity list.
+
+    See `Simulator.infer_sensitivity()`.
+    """
+    ctx = sim._ctx
+    ports = list(ctx.ports.port_list)
+    inputs = [p for p in ports if _is_dynamic(p)]
+    methods = []
+    for p in inputs:
+        for m in p._process_method_handler._process_methods:
+            if m is not None and m not in methods:
+                methods.append(m)
+
+    # Posted events are kept for the actual run, and the cycle counters
+    # restored
+    events = sim._event_queue
+    cycles = (sim._cycles, sim._skipped_cycles)
+    sim._event_queue = type(events)()
+    try:
+        with ReadTracer(ports, methods) as tracer:
+            sim.run(num_cycles, mode=sim.CYCLE_BASED, fast_forward=False)
+    finally:
+        sim._event_queue = events
+        sim._cycles, sim._skipped_cycles = cycles
+
+    report = SensitivityReport(sim, inputs, tracer.reads)
+    report.log()
+    return report
@@ -1,56 +1,333 @@
-from pyv.port import PortList
+from pyv.context import get_context, SimContext
+from pyv.port import Constant, Input, PortRW
+from pyv.scheduler import Schedule
+from pyv.sensitivity import SensitivityReport, infer_sensitivity
 from collections import deque
-from pyv.log import logger
-from pyv.clocked import Clock
+from pyv.log import logger, Trace
 from pyv.util import PyVObj
-from queue import PriorityQueue
-from typing import TypeAlias, Callable
-import uuid
+from heapq import heappop, heappush
+from typing import Callable
 from datetime import datetime
 
-Event: TypeAlias = tuple[int, uuid.UUID, Callable]
+
+class EventHandle:
+    """Handle of a posted event.
+
+    Returned by `Simulator.post_event_abs()` and `Simulator.post_event_rel()`.
+    """
+
+    def __init__(self, queue: '_EventQueue', time: int, callback: Callable,
+                 period: int):
+        self.time = time
+        """Time of the (next) occurrence of the event."""
+        self.callback = callback
+        """Callback function to call on event trigger."""
+        self.period = period
+        """For periodic events: Number of cycles between two occurrences.
+        0 otherwise."""
+        self.cancelled = False
+        """Whether the event has been cancelled."""
+        self._queue = queue
+        self._queued = False
+
+    def cancel(self):
+        """Cancels the event.
+
+        For a periodic event, all future occurrences are cancelled. Cancelling
+        an event that has already been triggered has no effect.
+        """
+        if not self.cancelled:
+            self.cancelled = True
+            if self._queued:
+                self._queue._cancel(self)
 
 
 class _EventQueue:
+    """Calendar queue for events.
+
+    Events are kept in one FIFO bucket per cycle, so events triggering in the
+    same cycle are processed in the order they were posted. A heap holds the
+    distinct bucket times, i.e., it is only touched once per bucket and not
+    once per event. Cancelled events are removed lazily.
+    """
+
     def __init__(self):
-        self._queue = PriorityQueue()
+        self._buckets: dict[int, deque[EventHandle]] = {}
+        # Number of live (i.e., not cancelled) events per bucket
+        self._live: dict[int, int] = {}
+        # Heap of bucket times (may contain times of removed buckets)
+        self._times: list[int] = []
+        self._num_events = 0
 
     def _get_num_events(self):
-        return len(self._queue.queue)
+        return self._num_events
 
-    def add_event(self, time_abs, callback):
+    def add_event(self, time_abs, callback, period=0) -> EventHandle:
         if time_abs < 0:
             raise Exception("Invalid event time.")
+        if period < 0:
+            raise Exception("Invalid event period.")
+
+        event = EventHandle(self, time_abs, callback, period)
+        self._insert(event)
+        return event
+
+    def _insert(self, event: EventHandle):
+        t = event.time
+        bucket = self._buckets.get(t)
+        if bucket is None:
+            bucket = self._buckets[t] = deque()
+            self._live[t] = 0
+            heappush(self._times, t)
+        bucket.append(event)
+        self._live[t] += 1
+        self._num_events += 1
+        event._queued = True
+
+    def _remove(self, t: int):
+        """Removes one live event from bucket `t`."""
+        self._num_events -= 1
+        self._live[t] -= 1
+        if self._live[t] == 0:
+            del self._buckets[t]
+            del self._live[t]
+
+    def _cancel(self, event: EventHandle):
+        event._queued = False
+        self._remove(event.time)
+
+    def get_next_event(self) -> EventHandle:
+        """Removes the next event from the queue.
+
+        A periodic event is re-inserted with its next occurrence time.
 
-        event: Event = (time_abs, uuid.uuid4(), callback)
-        self._queue.put(event)
-
-    def get_next_event(self) -> Event:
-        return self._queue.get(False)
+        Raises:
+            IndexError: The queue is empty.
+        """
+        t = self.next_event_time()
+        if t < 0:
+            raise IndexError("No events in queue.")
+
+        bucket = self._buckets[t]
+        event = bucket.popleft()
+        while event.cancelled:
+            event = bucket.popleft()
+        event._queued = False
+        self._remove(t)
+
+        if event.period > 0:
+            event.time += event.period
+            self._insert(event)
+        return event
 
     def next_event_time(self) -> int:
-        if self._get_num_events() > 0:
-            return self._queue.queue[0][0]
+        times = self._times
+        while times and times[0] not in self._buckets:
+            heappop(times)
+        if times:
+            return times[0]
         else:
             return -1
 
 
+class _ChangeQueue:
+    """Queue of process methods to run during the current cycle.
+
+    Every process method is assigned an integer id when it is registered.
+    The id indexes into a pending flag, so adding a method to the queue and
+    suppressing duplicates are both O(1).
+
+    Queued methods are kept in one FIFO bucket per rank (see
+    `pyv.scheduler`), and `pop()` always returns a method from the lowest
+    non-empty bucket. Without ranks, all methods share a single bucket.
+    """
+
+    def __init__(self):
+        self._fns: list[Callable] = []
+        self._ids: dict[Callable, int] = {}
+        self._ranks: list[int] = []
+        self._pending = bytearray()
+        self._rank_of: Callable = None
+        # Bucket index is rank + 1 (unknown methods have rank -1)
+        self._buckets: list[deque] = [deque(), deque()]
+        self._lo = len(self._buckets)
+        self._len = 0
+        self._running = -1
+
+        self.backedges: set[tuple[int, int]] = set()
+        """Pairs of ids `(src, dst)` where running `src` queued a method
+        `dst` of lower rank."""
+        self.num_enqueued: list[int] = []
+        """Number of times each method was added to the queue."""
+        self.num_suppressed: list[int] = []
+        """Number of times each method was already pending."""
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for bucket in self._buckets[self._lo:]:
+            for i in bucket:
+                yield self._fns[i]
+
+    def __contains__(self, fn):
+        i = self._ids.get(fn)
+        return i is not None and self._pending[i] == 1
+
+    def _rank(self, fn) -> int:
+        return 0 if self._rank_of is None else self._rank_of(fn)
+
+    def register(self, fn: Callable) -> int:
+        """Registers a process method.
+
+        Args:
+            fn: The process method.
+
+        Returns:
+            The id of the method. Registering a method twice returns the same
+            id.
+        """
+        i = self._ids.get(fn)
+        if i is None:
+            i = len(self._fns)
+            self._ids[fn] = i
+            self._fns.append(fn)
+            self._pending.append(0)
+            self.num_enqueued.append(0)
+            self.num_suppressed.append(0)
+            rank = self._rank(fn)
+            self._ranks.append(rank)
+            while rank + 1 >= len(self._buckets):
+                self._buckets.append(deque())
+        return i
+
+    def get_fn(self, id: int) -> Callable:
+        return self._fns[id]
+
+    def push(self, fn: Callable):
+        """Adds a method to the queue (unless it is already pending)."""
+        self.push_id(self.register(fn))
+
+    def push_id(self, i: int):
+        """Adds a method to the queue by its id."""
+        if self._pending[i]:
+            self.num_suppressed[i] += 1
+            return
+        self._pending[i] = 1
+        self.num_enqueued[i] += 1
+
+        b = self._ranks[i] + 1
+        running = self._running
+        if running >= 0 and b <= self._ranks[running]:
+            self.backedges.add((running, i))
+
+        self._buckets[b].append(i)
+        if b < self._lo:
+            self._lo = b
+        self._len += 1
+
+    def pop(self) -> Callable:
+        """Removes the next method from the queue and marks it as running.
+
+        Raises:
+            IndexError: The queue is empty.
+        """
+        if self._len == 0:
+            raise IndexError("pop from an empty change queue")
+        buckets = self._buckets
+        lo = self._lo
+        while not buckets[lo]:
+            lo += 1
+        self._lo = lo
+        i = buckets[lo].popleft()
+        self._pending[i] = 0
+        self._len -= 1
+        self._running = i
+        return self._fns[i]
+
+    def done(self):
+        """Signals that no method is running anymore."""
+        self._running = -1
+
+    def clear(self):
+        for bucket in self._buckets:
+            for i in bucket:
+                self._pending[i] = 0
+            bucket.clear()
+        self._lo = len(self._buckets)
+        self._len = 0
+
+    def set_ranks(self, rank_of: Callable):
+        """Updates the ranks of all registered methods.
+
+        Pending methods are re-bucketed, keeping their relative order.
+
+        Args:
+            rank_of: Function returning the rank of a method.
+        """
+        pending = [self._ids[fn] for fn in self]
+        self._rank_of = rank_of
+        self._ranks = [rank_of(fn) for fn in self._fns]
+        num_buckets = max(self._ranks, default=0) + 2
+        self._buckets = [deque() for _ in range(num_buckets)]
+        self._lo = num_buckets
+        self._len = 0
+        for i in pending:
+            self._pending[i] = 0
+            self.push_id(i)
+            self.num_enqueued[i] -= 1
+
+
 class Simulator:
-    globalSim = None
-    """This is a static pointer to the currently instantiated
-    simulator. It can be accessed from anywhere without
-    the need to know about the specific simulator instance.
+    """The simulator.
+
+    A simulator is bound to the simulation context that is current when it
+    is created (see `pyv.context`). It simulates all ports, registers and
+    memories of that context.
     """
 
-    _stable_callbacks: list[Callable] = []
+    EVENT_DRIVEN = 'event'
+    """Event-driven mode: Only process methods whose inputs changed are
+    evaluated (default)."""
+    CYCLE_BASED = 'cycle'
+    """Cycle-based (oblivious) mode: All process methods are evaluated exactly
+    once per cycle in their static schedule order. Port writes do not notify
+    any process methods."""
+
+    TRACE_OFF = Trace.OFF
+    """No tracing (default)."""
+    TRACE_INFO = Trace.INFO
+    """Trace cycles, probed port values, and events."""
+    TRACE_DEBUG = Trace.DEBUG
+    """Additionally trace process methods, port changes, and register and
+    memory accesses."""
 
     def __init__(self):
-        Simulator.globalSim = self
+        self._ctx: SimContext = get_context()
+        self._ctx.sim = self
+        self._trace: Trace = self._ctx.trace
 
         self._objs = []
-        self._change_queue = deque()
+        self._change_queue = _ChangeQueue()
+        self._schedule: Schedule = None
+        self._mode = Simulator.EVENT_DRIVEN
+        self._cycle_order: list[list[Callable]] = []
+        # Position of each method in the cycle order
+        self._cycle_pos: dict[Callable, int] = {}
+        # Net -> lowest cycle order position of its readers
+        self._net_readers: dict = {}
+        # Process methods that are only sensitive to constant-driven inputs
+        # (see `_fold_constants()`)
+        self._static_methods: list[Callable] = []
         self._event_queue = _EventQueue()
         self._cycles = 0
+        self._skipped_cycles = 0
+        # Whether the last clock tick left all clocked elements unchanged
+        self._idle = False
+        # Cycle after which port writes are no longer checked (None: always
+        # check, see `set_write_checks()`)
+        self._check_until: int = None
+        self._write_checks = True
 
     def init(self):
         """Initialize the simulator.
@@ -59,6 +336,75 @@ class Simulator:
         """
         for obj in self._objs:
             obj._init(self)
+        self._fold_constants()
+        self._ctx.ports.compile_nets(self._change_queue)
+        self._levelize()
+
+    def _fold_constants(self):
+        """Folds all inputs driven by a `Constant` (see
+        `PortList.fold_constants()`).
+
+        Process methods which are only sensitive to such inputs have no
+        dynamic inputs left: They are evaluated once in the first cycle, and
+        skipped in the cycle-based mode afterwards. These methods are
+        reported in the log.
+        """
+        ports = self._ctx.ports
+        folded = ports.fold_constants()
+        if not folded:
+            return
+        dynamic = set()
+        for p in ports.port_list:
+            if (isinstance(p, Input)
+                    and not isinstance(p._root_driver, Constant)):
+                dynamic.update(p._process_method_handler._process_methods)
+        static = self._static_methods
+        for p in folded:
+            for m in p._process_method_handler._process_methods:
+                if m is not None and m not in dynamic and m not in static:
+                    static.append(m)
+        logger.info(f"Folded {len(folded)} constant-driven inputs.")
+        for m in static:
+            logger.info(f"Process method {m.__qualname__} has no dynamic inputs left.")  # noqa: E501
+
+    def infer_sensitivity(self, num_cycles: int = 100) -> SensitivityReport:
+        """Checks the sensitivity lists of all process methods.
+
+        Runs the simulation for `num_cycles` cycles in the cycle-based mode,
+        while tracing which inputs each process method reads. Methods that
+        read inputs they are not sensitive to are logged as warnings. Call
+        `apply()` on the returned report to add the missing sensitivities
+        (see `pyv.sensitivity`).
+
+        Posted events are not triggered during the calibration run, and the
+        cycle counters are restored afterwards. The design's state, however,
+        is that at the end of the calibration run: Reset the design (and
+        reload memories) before the actual run.
+
+        Args:
+            num_cycles (int, optional): Length of the calibration run.
+
+        Returns:
+            The sensitivity report.
+        """
+        return infer_sensitivity(self, num_cycles)
+
+    def get_static_methods(self) -> list[Callable]:
+        """Returns the process methods that are only sensitive to
+        constant-driven inputs (see `init()`)."""
+        return self._static_methods
+
+    def _levelize(self):
+        """Computes the static schedule of all process methods.
+
+        Once a schedule exists, queued process methods are executed in the
+        order of their rank instead of their arrival order (see
+        `pyv.scheduler`).
+        """
+        self._schedule = Schedule.from_ports(
+            self._ctx.ports.port_list, self._objs)
+        self._change_queue.set_ranks(self._schedule.rank)
+        logger.debug(f"Levelized {self._schedule.num_methods()} process methods.")  # noqa: E501
 
     def addObj(self, obj: PyVObj):
         """Add an object to the simulator.
@@ -80,16 +426,72 @@ class Simulator:
         `probes` will be logged during simulation. If `probes` is empty, ALL
         ports will be logged.
 
+        Setting at least one probe enables tracing (at least `TRACE_INFO`, see
+        `set_trace_level()`). An empty `probes` list leaves the tracing level
+        unchanged; use `set_trace_level()` to log all ports.
+
         Args:
             probes (list[str]): List of strings to match ports to probe
         """
-        PortList.filter(probes)
+        self._ctx.ports.filter(probes)
+        if probes and not self._trace.info:
+            self._trace.set_level(Trace.INFO)
+
+    def set_trace_level(self, level: int):
+        """Sets the tracing level of this simulator's context. Other
+        simulation contexts are not affected.
+
+        With `TRACE_OFF` (default), the simulator doesn't format any trace
+        messages or read any ports for logging.
+
+        Args:
+            level (int): `Simulator.TRACE_OFF`, `Simulator.TRACE_INFO`, or
+                `Simulator.TRACE_DEBUG`.
+
+        Raises:
+            ValueError: Invalid level.
+        """
+        self._trace.set_level(level)
+
+    def set_write_checks(self, cycles: int = None):
+        """Limits the checks of port writes to the first `cycles` cycles.
+
+        By default, every `write()` checks that the port is a root port, and
+        that the value has the port's type. Once a design has been validated
+        for the given number of cycles, `run()` switches all root ports to a
+        write path without these checks, and logs a one-line summary.
+
+        Args:
+            cycles (int, optional): Number of cycles (counted from the start
+                of the simulation) to check port writes for. `None` (default)
+                checks all writes, and re-enables the checks if they were
+                already disabled.
+        """
+        self._check_until = cycles
+        if cycles is None and not self._write_checks:
+            self._ctx.ports.set_write_checks(True)
+            self._write_checks = True
+
+    def _check_validated(self):
+        if self._check_until is None or self._cycles < self._check_until:
+            return
+        self._check_until = None
+        if not self._write_checks:
+            return
+        ports = self._ctx.ports.set_write_checks(False)
+        self._write_checks = False
+        types = {p._type for p in ports}
+        logger.info(f"Validated port writes for {self._cycles} cycles: write checks disabled on {len(ports)} root ports ({len(types)} value types).")  # noqa: E501
+
+    def get_trace_level(self) -> int:
+        """Returns the current tracing level."""
+        return self._trace.level
 
     def _log_cycle(self):
         logger.info(f"\n**** Cycle {self._cycles} ****")
 
     def _log_ports(self):
-        PortList.log_ports()
+        self._ctx.ports.log_ports()
 
     def _log(self):
         self._log_cycle()
@@ -99,9 +501,11 @@ class Simulator:
         """Advance simulation to next cycle. Applies clock tick to registers
         and memories.
         """
-        self._log()
-        logger.debug("** Clock tick **")
-        Clock.tick()
+        if self._trace.info:
+            self._log()
+        if self._trace.debug:
+            logger.debug("** Clock tick **")
+        self._idle = self._ctx.clock.tick()
         self._cycles += 1
         return self
 
@@ -112,7 +516,10 @@ class Simulator:
             The current simulator instance to allow dot-chaining multiple
             commands.
         """
-        self._process_changes()
+        if self._mode == Simulator.CYCLE_BASED:
+            self._evaluate_all()
+        else:
+            self._process_changes()
         self._process_onstable_callbacks()
         return self
 
@@ -132,57 +539,228 @@ class Simulator:
     def _process_remaining(self):
         self._process_events()
         self.run_comb_logic()
-        self._log()
+        if self._trace.info:
+            self._log()
 
     def reset(self):
         """Applies global reset (registers, memories).
         """
-        Clock.reset()
-
-    def run(self, num_cycles=1, reset_regs: bool = True):
+        self._ctx.clock.reset()
+
+    def run(
+        self,
+        num_cycles=1,
+        reset_regs: bool = True,
+        mode: str = EVENT_DRIVEN,
+        fast_forward: bool = True
+    ):
         """Runs the simulation.
 
+        If `fast_forward` is enabled, the simulator detects when the design
+        has become quiescent: No clocked element changes with the clock tick,
+        and no process method is waiting to be run. As all further cycles
+        would be identical, the simulator directly jumps to the next posted
+        event, or to the end of the run. The number of skipped cycles can be
+        retrieved with `get_skipped_cycles()`.
+
+        Note: On-stable callbacks are not called for skipped cycles.
+
         Args:
             num_cycles (int, optional): Number of cycles to execute. Defaults
                 to 1.
             reset_regs (bool, optional): Whether to reset registers before the
                 simulation. Defaults to True.
+            mode (str, optional): Scheduling mode for this run
+                (`Simulator.EVENT_DRIVEN` or `Simulator.CYCLE_BASED`).
+                Defaults to event-driven.
+            fast_forward (bool, optional): Whether to skip cycles once the
+                design is quiescent. Defaults to True.
+
+        Raises:
+            ValueError: Invalid mode.
         """
+        if mode not in (Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED):
+            raise ValueError(f"Invalid simulation mode '{mode}'.")
+
         current_time = datetime.now().strftime("%A, %b %d, %Y at %H:%M:%S")
         logger.info(f"**** Simulation started on {current_time} ****\n")
 
         if reset_regs:
             self.reset()
 
-        for i in range(0, num_cycles):
-            self._cycle()
-        self._process_remaining()
+        self._set_mode(mode)
+        try:
+            end = self._cycles + num_cycles
+            self._check_validated()
+            while self._cycles < end:
+                self._cycle()
+                if self._check_until is not None:
+                    self._check_validated()
+                if fast_forward and self._is_quiescent():
+                    self._fast_forward(end)
+            self._process_remaining()
+        finally:
+            self._set_mode(Simulator.EVENT_DRIVEN)
+
+    def _is_quiescent(self) -> bool:
+        return self._idle and len(self._change_queue) == 0
+
+    def _fast_forward(self, end: int):
+        """Skips cycles up to the next posted event, or up to `end`."""
+        target = self._event_queue.next_event_time()
+        if target < 0 or target > end:
+            target = end
+        skipped = target - self._cycles
+        if skipped > 0:
+            if self._trace.info:
+                logger.info(f"\n**** Quiescent: skipping {skipped} cycles ({self._cycles} -> {target}) ****")  # noqa: E501
+            self._cycles = target
+            self._skipped_cycles += skipped
+
+    def _set_mode(self, mode: str):
+        if mode == Simulator.CYCLE_BASED:
+            if self._schedule is None:
+                self._levelize()
+            self._update_schedule()
+            self._update_cycle_order()
+            # Methods without dynamic inputs only need to be evaluated once
+            for m in self._static_methods:
+                m()
+            # All other methods get evaluated anyway
+            self._change_queue.clear()
+        self._mode = mode
+        self._ctx.notify_enabled = mode == Simulator.EVENT_DRIVEN
+
+    def _update_cycle_order(self):
+        static = self._static_methods
+        self._cycle_order = [
+            g for g in self._schedule.groups()
+            if not all(m in static for m in g)
+        ]
+        self._cycle_pos = {
+            m: i for i, g in enumerate(self._cycle_order) for m in g}
+        self._net_readers = {}
+
+    def _evaluate_all(self):
+        """Evaluates every process method once, in schedule order.
+
+        Methods of a feedback loop are evaluated repeatedly until none of
+        them changes a port value anymore.
+
+        If a method changes an input of a method that was already evaluated
+        in this pass (i.e., the static schedule missed a dependency), the
+        dependency is added to the schedule, and the pass is repeated in the
+        corrected order.
+        """
+        changes = self._ctx.silent_changes
+        while True:
+            changes.clear()
+            if not self._evaluate_pass(changes):
+                return
+            if not self._schedule.stale:
+                raise RuntimeError("ERROR: Cycle-based evaluation order could not be corrected.")  # noqa: E501
+            self._update_schedule()
+            self._update_cycle_order()
+
+    def _evaluate_pass(self, changes: list) -> bool:
+        """Evaluates all methods once.
+
+        Returns:
+            bool: True if a method changed an input of an earlier method.
+        """
+        readers = self._net_readers
+        out_of_order = False
+        for pos, group in enumerate(self._cycle_order):
+            start = len(changes)
+            if len(group) == 1:
+                group[0]()
+            else:
+                while True:
+                    num_changes = len(changes)
+                    for fn in group:
+                        fn()
+                    if len(changes) == num_changes:
+                        break
+            if len(changes) != start:
+                for i in range(start, len(changes)):
+                    net = changes[i]
+                    first = readers.get(net)
+                    if first is None:
+                        first = readers[net] = self._first_reader(net)
+                    if first < pos:
+                        self._learn_readers(net, group[0], pos)
+                        out_of_order = True
+        return out_of_order
+
+    def _net_reader_methods(self, net) -> list[Callable]:
+        root = net.root
+        inputs = list(root._downstream_inputs)
+        if isinstance(root, Input):
+            inputs.append(root)
+        return [m for p in inputs
+                for m in p._process_method_handler._process_methods
+                if m in self._cycle_pos]
+
+    def _first_reader(self, net) -> int:
+        pos = self._cycle_pos
+        return min((pos[m] for m in self._net_reader_methods(net)),
+                   default=len(self._cycle_order))
+
+    def _learn_readers(self, net, writer: Callable, pos: int):
+        for m in self._net_reader_methods(net):
+            if self._cycle_pos[m] < pos:
+                if self._trace.debug:
+                    logger.debug(f"{writer.__qualname__} changed an input of {m.__qualname__}, which was already evaluated.")  # noqa: E501
+                self._schedule.learn(writer, m)
 
     @staticmethod
     def clear():
-        """Clear list of registers, memories and ports"""
-        Clock.clear()
-        PortList.clear()
-        Simulator._stable_callbacks = []
+        """Clear list of registers, memories and ports of the current
+        simulation context, and turn its tracing off (see
+        `SimContext.clear()`)."""
+        get_context().clear()
 
     def _process_changes(self):
-        while len(self._change_queue) > 0:
-            nextFn = self._change_queue.popleft()
-            logger.debug(f"Running {nextFn.__qualname__}")
-            nextFn()
+        queue = self._change_queue
+        self._update_schedule()
+        debug = self._trace.debug
+
+        try:
+            while len(queue) > 0:
+                nextFn = queue.pop()
+                if debug:
+                    logger.debug(f"Running {nextFn.__qualname__}")
+                nextFn()
+        finally:
+            queue.done()
+
+    def _update_schedule(self):
+        """Feeds dependencies observed by the change queue back into the
+        schedule, and re-levelizes if needed."""
+        sched = self._schedule
+        if sched is None:
+            return
+        queue = self._change_queue
+        for src, dst in queue.backedges:
+            sched.learn(queue.get_fn(src), queue.get_fn(dst))
+        queue.backedges.clear()
+        if sched.stale:
+            sched.levelize()
+            queue.set_ranks(sched.rank)
 
     def _events_pending(self):
         return self._cycles == self._event_queue.next_event_time()
 
     def _process_events(self):
         while self._events_pending():
-            event: Event = self._event_queue.get_next_event()
-            callback = event[2]
-            logger.info(f"Triggering event -> {callback.__qualname__}()")
+            event = self._event_queue.get_next_event()
+            callback = event.callback
+            if self._trace.info:
+                logger.info(f"Triggering event -> {callback.__qualname__}()")
             callback()
 
     def _process_onstable_callbacks(self):
-        for cb in Simulator._stable_callbacks:
+        for cb in self._ctx.stable_callbacks:
             cb()
 
     def _add_to_change_queue(self, fn):
@@ -191,11 +769,26 @@ class Simulator:
         Args:
             fn (function): The function we want to add to the queue.
         """
-        if fn not in self._change_queue:
-            logger.debug(f"Adding {fn.__qualname__} to queue.")
-            self._change_queue.append(fn)
-        else:
-            logger.debug(f"{fn.__qualname__} already in queue.")
+        if self._trace.debug:
+            if fn not in self._change_queue:
+                logger.debug(f"Adding {fn.__qualname__} to queue.")
+            else:
+                logger.debug(f"{fn.__qualname__} already in queue.")
+        self._change_queue.push(fn)
+
+    def get_queue_stats(self) -> dict[Callable, tuple[int, int]]:
+        """Returns change queue statistics per process method.
+
+        Returns:
+            dict: For each process method, a tuple with the number of times it
+                was added to the change queue, and the number of times adding
+                it was suppressed because it was already pending.
+        """
+        queue = self._change_queue
+        return {
+            queue.get_fn(i): (queue.num_enqueued[i], queue.num_suppressed[i])
+            for i in range(len(queue.num_enqueued))
+        }
 
     def get_cycles(self):
         """Returns the current number of cycles.
@@ -205,12 +798,27 @@ class Simulator:
         """
         return self._cycles
 
-    def post_event_abs(self, time_abs, callback):
+    def get_skipped_cycles(self):
+        """Returns the number of cycles skipped due to quiescence.
+
+        See `run()`.
+
+        Returns:
+            int: The total number of skipped cycles.
+        """
+        return self._skipped_cycles
+
+    def post_event_abs(self, time_abs, callback, period=0) -> EventHandle:
         """Post an event into the future with *absolute* time.
 
         Args:
             time_abs (int): Absolute time of event
             callback (function): Callback function to call on event trigger
+            period (int, optional): If greater than 0, the event is triggered
+                again every `period` cycles (until it is cancelled).
+
+        Returns:
+            EventHandle: Handle which can be used to cancel the event.
 
         Raises:
             Exception: Event time is less then or equal to current cycle.
@@ -218,28 +826,40 @@ class Simulator:
         if time_abs <= self._cycles:
             raise Exception("Error: Event must lie in the future!")
 
-        self._event_queue.add_event(time_abs, callback)
+        return self._event_queue.add_event(time_abs, callback, period)
 
-    def post_event_rel(self, time_rel, callback):
+    def post_event_rel(self, time_rel, callback, period=0) -> EventHandle:
         """Post an event into the future with *relative* time.
 
         Args:
             time_rel (int): Relative time of event (wrt current cycle)
             callback (function): Callback function to call on event trigger
+            period (int, optional): If greater than 0, the event is triggered
+                again every `period` cycles (until it is cancelled).
+
+        Returns:
+            EventHandle: Handle which can be used to cancel the event.
 
         Raises:
             Exception: Resulting event time is less then or equal to current
                 cycle.
         """
-        self.post_event_abs(self._cycles + time_rel, callback)
+        return self.post_event_abs(self._cycles + time_rel, callback, period)
 
     @staticmethod
-    def register_stable_callback(callback: Callable):
+    def register_stable_callback(
+        callback: Callable,
+        depends_on: list[PortRW] = None
+    ):
         """Register a callback method to be called once signal values have
         stabilized during the current cycle, and before the next clock tick
         happens.
 
         Args:
             callback (Callable): The callback method
+            depends_on (list[PortRW], optional): Ports the callback depends
+                on. If given, the callback only runs in cycles in which at
+                least one of these ports changed (and in the first cycle).
+                Otherwise, it runs in every cycle. `Constant`s are ignored.
         """
-        Simulator._stable_callbacks.append(callback)
+        get_context().register_stable_callback(callback, depends_on)
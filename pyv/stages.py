@@ -6,17 +6,15 @@ from pyv.mem import ReadPort, WritePort
 import pyv.isa as isa
 from pyv.util import get_bit, get_bits, MASK_32, XLEN, msb_32, signext
 from pyv.log import logger
-from dataclasses import dataclass
+from pyv.latch import Latch
 
 
-@dataclass
-class IFID_t:
+class IFID_t(Latch):
     inst: int = 0
     pc: int = 0
 
 
-@dataclass
-class IDEX_t:
+class IDEX_t(Latch):
     rs1: int = 0
     rs2: int = 0
     imm: int = 0
@@ -33,8 +31,7 @@ class IDEX_t:
     csr_write_en: bool = False
 
 
-@dataclass
-class EXMEM_t:
+class EXMEM_t(Latch):
     rd: int = 0
     we: int = 0
     wb_sel: int = 0
@@ -50,8 +47,7 @@ class EXMEM_t:
     csr_write_val: int = 0
 
 
-@dataclass
-class MEMWB_t:
+class MEMWB_t(Latch):
     rd: int = 0
     we: int = 0
     alu_res: int = 0
@@ -108,6 +104,15 @@ class IFStage(Module):
         # Connect next PC to input of PC reg
         self.pc_reg.next << self.npc_i
 
+    def set_start_pc(self, pc: int):
+        """Sets the address of the first instruction fetched after a reset.
+
+        Args:
+            pc (int): Start address.
+        """
+        # The PC register holds the address *before* the first instruction
+        self.pc_reg._reset_val = pc - 4
+
     def write_output(self):
         self.IFID_o.write(IFID_t(self.ir_reg_w.read(), self.pc_reg_w.read()))
 
@@ -127,11 +132,12 @@ class IDStage(Module):
         self.regfile = regf
         self.csr = csr
 
-        self.register_stable_callbacks([self.check_exception])
-
         # Inputs
         self.IFID_i = Input(IFID_t)
 
+        self.register_stable_callbacks(
+            [self.check_exception], depends_on=[self.IFID_i])
+
         # Outputs
         self.IDEX_o = Output(IDEX_t)
         self.ecall_o = Output(bool)
@@ -404,41 +410,42 @@ class EXStage(Module):
     def __init__(self):
         super().__init__()
         self.IDEX_i = Input(
-            IDEX_t, sensitive_methods=[self.process, self.pass_through])
+            IDEX_t,
+            sensitive_methods=[self.process, self.pass_through],
+            sensitive_fields={
+                self.process: [
+                    'opcode', 'rs1', 'rs2', 'imm', 'pc', 'funct3', 'funct7',
+                    'csr_write_en', 'csr_read_val'
+                ],
+                self.pass_through: [
+                    'rd', 'we', 'wb_sel', 'rs2', 'mem', 'funct3', 'csr_addr',
+                    'csr_write_en', 'csr_read_val'
+                ]
+            }
+        )
 
-        self.register_stable_callbacks([self.check_exception])
+        self.register_stable_callbacks(
+            [self.check_exception], depends_on=[self.IDEX_i])
 
         self.EXMEM_o = Output(EXMEM_t)
         self.exmem_val = EXMEM_t()
 
     def write_output(self):
-        self.EXMEM_o.write(EXMEM_t(
-            self.exmem_val.rd,
-            self.exmem_val.we,
-            self.exmem_val.wb_sel,
-            self.exmem_val.take_branch,
-            self.exmem_val.alu_res,
-            self.exmem_val.pc4,
-            self.exmem_val.rs2,
-            self.exmem_val.mem,
-            self.exmem_val.funct3,
-            self.exmem_val.csr_addr,
-            self.exmem_val.csr_read_val,
-            self.exmem_val.csr_write_en,
-            self.exmem_val.csr_write_val
-        ))
+        self.EXMEM_o.write(self.exmem_val)
 
     def pass_through(self):
         val = self.IDEX_i.read()
-        self.exmem_val.rd = val.rd
-        self.exmem_val.we = val.we
-        self.exmem_val.wb_sel = val.wb_sel
-        self.exmem_val.rs2 = val.rs2
-        self.exmem_val.mem = val.mem
-        self.exmem_val.funct3 = val.funct3
-        self.exmem_val.csr_addr = val.csr_addr
-        self.exmem_val.csr_write_en = val.csr_write_en
-        self.exmem_val.csr_read_val = val.csr_read_val
+        self.exmem_val = self.exmem_val._replace(
+            rd=val.rd,
+            we=val.we,
+            wb_sel=val.wb_sel,
+            rs2=val.rs2,
+            mem=val.mem,
+            funct3=val.funct3,
+            csr_addr=val.csr_addr,
+            csr_write_en=val.csr_write_en,
+            csr_read_val=val.csr_read_val
+        )
 
         self.write_output()
 
@@ -476,10 +483,12 @@ class EXStage(Module):
             csr_write_val = self.csr(f3, csr_read_val, rs1)
 
         # Outputs
-        self.exmem_val.take_branch = take_branch
-        self.exmem_val.pc4 = pc4
-        self.exmem_val.alu_res = alu_res
-        self.exmem_val.csr_write_val = csr_write_val
+        self.exmem_val = self.exmem_val._replace(
+            take_branch=take_branch,
+            pc4=pc4,
+            alu_res=alu_res,
+            csr_write_val=csr_write_val
+        )
         self.write_output()
 
     def alu(self, opcode, rs1, rs2, imm, pc, f3, f7):
@@ -742,11 +751,22 @@ class MEMStage(Module):
     """
     def __init__(self, dmem_read: ReadPort, dmem_write: WritePort):
         super().__init__()
-        self.EXMEM_i = Input(EXMEM_t)
+        # All fields except take_branch (handled by the branch unit)
+        self.EXMEM_i = Input(
+            EXMEM_t,
+            sensitive_fields={
+                self.process: [
+                    'rd', 'we', 'wb_sel', 'alu_res', 'pc4', 'rs2', 'mem',
+                    'funct3', 'csr_addr', 'csr_read_val', 'csr_write_en',
+                    'csr_write_val'
+                ]
+            }
+        )
         self.MEMWB_o = Output(MEMWB_t)
         self.load_val = Wire(int, [self.process_load])
 
-        self.register_stable_callbacks([self.check_exception])
+        self.register_stable_callbacks(
+            [self.check_exception], depends_on=[self.EXMEM_i])
 
         # Main memory
         self.read_port = dmem_read
@@ -758,25 +778,14 @@ class MEMStage(Module):
         self.out_val = MEMWB_t()
 
     def write_output(self):
-        self.MEMWB_o.write(MEMWB_t(
-            rd=self.out_val.rd,
-            we=self.out_val.we,
-            alu_res=self.out_val.alu_res,
-            pc4=self.out_val.pc4,
-            mem_rdata=self.out_val.mem_rdata,
-            wb_sel=self.out_val.wb_sel,
-            csr_addr=self.out_val.csr_addr,
-            csr_read_val=self.out_val.csr_read_val,
-            csr_write_en=self.out_val.csr_write_en,
-            csr_write_val=self.out_val.csr_write_val
-        ))
+        self.MEMWB_o.write(self.out_val)
 
     def process_load(self):
         load_val = self.load_val.read()
         if self.signext_w != 0:
             load_val = signext(load_val, self.signext_w)
 
-        self.out_val.mem_rdata = load_val
+        self.out_val = self.out_val._replace(mem_rdata=load_val)
         self.write_output()
 
     def process(self):
@@ -833,15 +842,17 @@ class MEMStage(Module):
         self.write_port.we_i.write(we)
 
         # Outputs
-        self.out_val.rd = in_val.rd
-        self.out_val.we = in_val.we
-        self.out_val.alu_res = in_val.alu_res
-        self.out_val.pc4 = in_val.pc4
-        self.out_val.wb_sel = in_val.wb_sel
-        self.out_val.csr_addr = in_val.csr_addr
-        self.out_val.csr_read_val = in_val.csr_read_val
-        self.out_val.csr_write_en = in_val.csr_write_en
-        self.out_val.csr_write_val = in_val.csr_write_val
+        self.out_val = self.out_val._replace(
+            rd=in_val.rd,
+            we=in_val.we,
+            alu_res=in_val.alu_res,
+            pc4=in_val.pc4,
+            wb_sel=in_val.wb_sel,
+            csr_addr=in_val.csr_addr,
+            csr_read_val=in_val.csr_read_val,
+            csr_write_en=in_val.csr_write_en,
+            csr_write_val=in_val.csr_write_val
+        )
         self.write_output()
 
     def check_exception(self):
@@ -1,15 +1,59 @@
 """Utility stuff."""
 
-from typing import Any, Dict, List
+import copy
+from typing import Any, Callable, Dict, List
 import warnings
 
 
+_slot_names_cache: Dict[type, tuple] = {}
+
+
+def _slot_names(cls: type) -> tuple:
+    names = _slot_names_cache.get(cls)
+    if names is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            slots = c.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            names += [n for n in slots
+                      if n not in ('__dict__', '__weakref__')]
+        names = _slot_names_cache[cls] = tuple(names)
+    return names
+
+
+def pyv_attrs(obj) -> List[tuple]:
+    """Returns all attributes of `obj` that are `PyVObj` instances.
+
+    Both slots and regular (`__dict__`) attributes are taken into account.
+
+    Returns:
+        A list of `(name, obj)` pairs.
+    """
+    items = []
+    for name in _slot_names(type(obj)):
+        val = getattr(obj, name, None)
+        if isinstance(val, PyVObj):
+            items.append((name, val))
+    d = getattr(obj, '__dict__', None)
+    if d:
+        items += [(k, v) for k, v in d.items() if isinstance(v, PyVObj)]
+    return items
+
+
 # TODO: Move this class to its own module
 class PyVObj:
     """This class represent all Py-V objects (such as modules, ports,
     registers). Currently, this is used for initializing the names of every
     object in the design.
+
+    Ports and registers use `__slots__` to keep their memory footprint small.
+    Use `pyv_attrs()` instead of `__dict__` to find the sub-objects of an
+    object.
     """
+
+    __slots__ = ('name', '_visited')
+
     def __init__(self, name="noName") -> None:
         self.name = name
         """Name of this object"""
@@ -26,10 +70,9 @@ class PyVObj:
             return
         self._visited = True
 
-        for key, obj in self.__dict__.items():
-            if isinstance(obj, (PyVObj)):
-                obj.name = self.name + "." + key
-                obj._init(self)
+        for key, obj in pyv_attrs(self):
+            obj.name = self.name + "." + key
+            obj._init(self)
 
 
 class VContainer(PyVObj):
@@ -44,10 +87,9 @@ class VContainer(PyVObj):
             return
         self._visited = True
 
-        for key, obj in self.__dict__.items():
-            if isinstance(obj, (PyVObj)):
-                obj.name = self.name + "." + key
-                obj._init(parent)
+        for key, obj in pyv_attrs(self):
+            obj.name = self.name + "." + key
+            obj._init(parent)
 
 
 class VMap(PyVObj):
@@ -158,6 +200,74 @@ class VArray(PyVObj):
         return self._elems[idx]
 
 
+# Copy semantics of port value types (see `get_copy_fn()`)
+COPY_SHARED = 'shared'
+"""Values are immutable and can be shared (never copied)"""
+COPY_SHALLOW = 'shallow'
+"""Values are copied with `copy.copy()`"""
+COPY_DEEP = 'deep'
+"""Values are copied with `copy.deepcopy()` (default)"""
+
+_copy_modes: Dict[type, Any] = {
+    int: COPY_SHARED,
+    bool: COPY_SHARED,
+    float: COPY_SHARED,
+    complex: COPY_SHARED,
+    str: COPY_SHARED,
+    bytes: COPY_SHARED,
+    type(None): COPY_SHARED,
+}
+
+
+def register_copy_mode(type_: type, mode):
+    """Declares the copy semantics of a port value type.
+
+    Use this for types you cannot add a `_copy_mode` class attribute to.
+
+    Args:
+        type_: The type.
+        mode: `COPY_SHARED`, `COPY_SHALLOW`, `COPY_DEEP`, or a function
+            returning a copy of a value (custom clone).
+
+    Raises:
+        ValueError: Invalid mode.
+    """
+    _check_copy_mode(mode)
+    _copy_modes[type_] = mode
+
+
+def _check_copy_mode(mode):
+    if mode not in (COPY_SHARED, COPY_SHALLOW, COPY_DEEP) \
+            and not callable(mode):
+        raise ValueError(f"ERROR: Invalid copy mode {mode}.")
+
+
+def get_copy_fn(type_: type) -> Callable:
+    """Returns the function used to copy values of a port value type.
+
+    The copy semantics are looked up (in that order)
+    - in the types registered with `register_copy_mode()`,
+    - in the `_copy_mode` class attribute of the type, which takes the same
+      values as `register_copy_mode()`.
+
+    Types without declared copy semantics are deep-copied.
+
+    Returns:
+        The copy function, or `None` if values can be shared.
+    """
+    mode = _copy_modes.get(type_)
+    if mode is None:
+        mode = getattr(type_, '_copy_mode', COPY_DEEP)
+        _check_copy_mode(mode)
+    if mode == COPY_SHARED:
+        return None
+    if mode == COPY_SHALLOW:
+        return copy.copy
+    if mode == COPY_DEEP:
+        return copy.deepcopy
+    return mode
+
+
 # XLEN
 XLEN = 32
 
@@ -189,15 +299,13 @@ def get_bits(val, hiIdx: int, loIdx: int) -> int:
         The bit slice.
     """
 
-    return (~(MASK_32 << (hiIdx - loIdx + 1)) & (val >> loIdx))
+    return (val >> loIdx) & ((1 << (hiIdx - loIdx + 1)) - 1)
 
 
 def signext(val, width: int):
     """Sign-extends a value (`val`) of width `width` bits to 32-bits."""
 
-    msb = get_bit(val, width - 1)
-
-    if msb:  # 1
+    if val & (1 << (width - 1)):
         val = MASK_32 & ((-1) << width | val)
 
     return val
@@ -221,17 +329,11 @@ def get_bit_vector(val: int, len: int = 0):
         A list containing the bits of `val`.
     """
     if len == 0:
-        return [1 if digit == '1' else 0 for digit in bin(val)[2:]]
-    elif len >= val.bit_length():
-        leading_zeros = [0 for _ in range(len - val.bit_length())]
-        return (leading_zeros
-                + [1 if digit == '1' else 0 for digit in bin(val)[2:]])
-    else:
+        len = max(val.bit_length(), 1)
+    elif len < val.bit_length():
         num_trunc_bits = val.bit_length() - len
         warnings.warn(f"Util get_bit_vector(): Requested vector length ({len}) shorter than bit_length of value ({val.bit_length()}). Truncating upper {num_trunc_bits} bits.")  # noqa: E501
-        return [
-            1 if digit == '1' else 0 for digit in bin(val)[2 + num_trunc_bits:]
-        ]
+    return [(val >> i) & 1 for i in range(len - 1, -1, -1)]
 
 
 def bit_vector_2_num(bitVec: list):
@@ -245,5 +347,7 @@ def bit_vector_2_num(bitVec: list):
     Returns:
         Integer value of input bit vector.
     """
-    bitStr = ''.join(str(b) for b in bitVec)
-    return int(bitStr, 2)
+    val = 0
+    for b in bitVec:
+        val = (val << 1) | b
+    return val
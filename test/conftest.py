@@ -1,4 +1,7 @@
 import pytest
+from typing import Callable
+from pyv.context import SimContext
+from pyv.module import Module
 from pyv.simulator import Simulator
 
 
@@ -9,12 +12,25 @@ def enable_log():
 
 
 @pytest.fixture(autouse=True)
-def clear_sim():
-    yield
-    Simulator.clear()
-    Simulator.globalSim = None
+def ctx() -> SimContext:
+    with SimContext() as ctx:
+        yield ctx
 
 
 @pytest.fixture(autouse=True)
-def sim() -> Simulator:
+def sim(ctx: SimContext) -> Simulator:
     return Simulator()
+
+
+@pytest.fixture
+def init_top(sim: Simulator) -> Callable[..., Module]:
+    """Returns a function which names a top module (after its class by
+    default), adds it to the simulator of its context (`sim`, unless created
+    in another context), and initializes the simulation."""
+    def init(top: Module, name: str = None) -> Module:
+        top.name = type(top).__name__ if name is None else name
+        top_sim = top._ctx.sim
+        top_sim.addObj(top)
+        top_sim.init()
+        return top
+    return init
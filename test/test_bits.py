@@ -0,0 +1,141 @@
+import copy
+import pickle
+import pytest
+from pyv.bits import Bits, concat, concat_array
+from pyv.port import Input, Output
+from pyv.reg import Reg
+
+
+def test_type():
+    assert Bits[8] is Bits[8]
+    assert Bits[8] is not Bits[16]
+    assert Bits[8].width == 8
+    assert issubclass(Bits[8], int)
+    with pytest.raises(ValueError):
+        Bits[0]
+    with pytest.raises(TypeError):
+        Bits(3)
+
+
+def test_truncate():
+    a = Bits[8](0x1ff)
+    assert a == 0xff
+    assert len(a) == 8
+    assert Bits[8](-1) == 0xff
+    assert Bits[4]() == 0
+    assert repr(a) == 'Bits[8](0xff)'
+
+
+def test_wrap_around():
+    a = Bits[8](0xff)
+    assert a + 1 == 0
+    assert type(a + 1) is Bits[8]
+    assert 1 + a == 0
+    assert type(1 + a) is Bits[8]
+    assert Bits[8](0) - 1 == 0xff
+    assert 0 - Bits[8](1) == 0xff
+    assert a << 4 == 0xf0
+    assert ~Bits[8](0x0f) == 0xf0
+    assert -Bits[8](1) == 0xff
+    # The wider operand determines the width
+    assert type(Bits[4](1) + Bits[8](1)) is Bits[8]
+    # Other operations fall back to int
+    assert type(a // 2) is int
+    with pytest.raises(TypeError):
+        a + 'foo'
+
+
+def test_slice():
+    a = Bits[32](0xdeadbeef)
+    assert a[31:16] == 0xdead
+    assert type(a[31:16]) is Bits[16]
+    assert a[3:0] == 0xf
+    assert a[4] == 0
+    assert a[0] == 1
+    assert type(a[0]) is Bits[1]
+    with pytest.raises(IndexError):
+        a[32]
+    with pytest.raises(IndexError):
+        a[0:3]
+    with pytest.raises(IndexError):
+        a[32:0]
+
+
+def test_signed():
+    assert Bits[8](0xff).signed == -1
+    assert Bits[8](0x7f).signed == 127
+    assert Bits[8](0x80).unsigned == 128
+    assert Bits[8](0x80).sext(16) == 0xff80
+    assert Bits[8](0x80).zext(16) == 0x80
+    assert Bits[16](0x1234).zext(8) == 0x34
+
+
+def test_concat():
+    a = Bits[8](0xab)
+    c = concat(a[3:0], Bits[4](2), Bits[1](1))
+    assert type(c) is Bits[9]
+    assert c == 0b1011_0010_1
+
+
+def test_to_list():
+    assert Bits[4](5).to_list() == [0, 1, 0, 1]
+
+
+def test_copy():
+    a = Bits[12](42)
+    assert copy.deepcopy(a) is a
+    b = pickle.loads(pickle.dumps(a))
+    assert type(b) is Bits[12]
+    assert b == a
+
+
+def test_ports(sim):
+    A = Output(Bits[32])
+    B = Input(Bits[32])
+    B << A
+    assert type(B.read()) is Bits[32]
+    A.write(Bits[32](5))
+    assert B.read() == 5
+    with pytest.raises(TypeError):
+        A.write(6)
+
+    reg = Reg(Bits[4], Bits[4](3))
+    reg._init()
+    reg._reset()
+    assert reg.cur.read() == 3
+
+
+class TestArray:
+    @pytest.fixture(autouse=True)
+    def np(self):
+        return pytest.importorskip('numpy')
+
+    def test_array(self, np):
+        arr = Bits[8].array([0x1ff, -1, 3])
+        assert arr.dtype == np.uint64
+        assert arr.tolist() == [0xff, 0xff, 3]
+
+    def test_slice(self, np):
+        arr = Bits[32].slice_array([0xdeadbeef, 0x12345678], 31, 16)
+        assert arr.tolist() == [0xdead, 0x1234]
+        with pytest.raises(IndexError):
+            Bits[32].slice_array([0], 32, 0)
+
+    def test_signed(self, np):
+        arr = Bits[8].signed_array([0xff, 0x7f, 0x80])
+        assert arr.dtype == np.int64
+        assert arr.tolist() == [-1, 127, -128]
+        assert Bits[64].signed_array([2**64 - 1]).tolist() == [-1]
+
+    def test_bit_matrix(self, np):
+        mat = Bits[4].to_bit_matrix([5, 8])
+        assert mat.tolist() == [[0, 1, 0, 1], [1, 0, 0, 0]]
+        assert mat[0].tolist() == Bits[4](5).to_list()
+
+    def test_concat(self, np):
+        arr = concat_array((Bits[4], [0xa, 0x1]), (Bits[8], [0xbc, 0x23]))
+        assert arr.tolist() == [0xabc, 0x123]
+
+    def test_too_wide(self, np):
+        with pytest.raises(TypeError):
+            Bits[65].array([0])
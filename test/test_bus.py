@@ -0,0 +1,103 @@
+import pytest
+from pyv.bus import Bus, Device
+from pyv.mem import Memory
+from pyv.models.singlecycle import SingleCycleModel
+from pyv.simulator import Simulator
+
+
+class Mailbox(Device):
+    def __init__(self):
+        super().__init__()
+        self.val = 0x1234
+        self.writes = []
+
+    def read(self, offset, w):
+        return self.val + offset
+
+    def write(self, offset, w, wdata):
+        self.writes.append((offset, w, wdata))
+        self.val = wdata
+
+
+@pytest.fixture
+def bus() -> Bus:
+    mem = Memory(4096)
+    bus = Bus(mem)
+    bus.name = 'Bus_DUT'
+    bus._init()
+    return bus
+
+
+def access(bus: Bus, addr, re=True, we=False, wdata=0, w=4):
+    bus.read_port0.re_i.write(re)
+    bus.read_port0.addr_i.write(addr)
+    bus.read_port0.width_i.write(w)
+    bus.write_port.we_i.write(we)
+    bus.write_port.wdata_i.write(wdata)
+
+
+def test_ram(sim: Simulator, bus: Bus):
+    # No devices: RAM is accessed directly
+    assert bus._read == bus.ram._read
+    access(bus, 8, re=False, we=True, wdata=0xdeadbeef)
+    sim.step()
+    assert bus.ram._read(8, 4) == 0xdeadbeef
+    access(bus, 8)
+    sim.step()
+    assert bus.read_port0.rdata_o.read() == 0xdeadbeef
+
+
+def test_attach(ctx, bus: Bus):
+    dev = Mailbox()
+    bus.attach(dev, 0x10000000, 0x1800)
+    assert bus.get_device(0x10001ffc) is dev
+    assert bus.get_device(0x10002000) is None
+    assert bus.get_device(0) is None
+    assert bus._read(0x10001000, 4) == 0x1234 + 0x1000
+    bus._write(0, 4, 0xabcd)
+    assert bus.ram._read(0, 4) == 0xabcd
+    assert dev.writes == []
+
+    with pytest.raises(ValueError):
+        bus.attach(Mailbox(), 0x10001000)
+    with pytest.raises(ValueError):
+        bus.attach(Mailbox(), 0x20000004)
+    with pytest.raises(ValueError):
+        bus.attach(Mailbox(), 0x20000000, 0)
+
+
+def test_device(sim: Simulator, bus: Bus):
+    dev = Mailbox()
+    bus.attach(dev, 0x2000)
+    access(bus, 0x2004, re=False, we=True, wdata=42)
+    sim.step()
+    assert dev.writes == [(4, 4, 42)]
+
+    access(bus, 0x2008)
+    sim.step()
+    assert dev.writes == [(4, 4, 42)]
+    assert bus.read_port0.rdata_o.read() == 50
+    # The read is repeated after each clock edge
+    dev.val = 100
+    assert not bus._is_idle()
+    sim.step()
+    assert bus.read_port0.rdata_o.read() == 108
+
+
+def test_model():
+    prog = [
+        0x100002b7,  # lui x5,0x10000
+        0x02a00313,  # li x6,42
+        0x0062a023,  # sw x6,0(x5)
+        0x0042a383,  # lw x7,4(x5)
+        0x0000006f,  # j .
+    ]
+    model = SingleCycleModel()
+    with model.ctx:
+        dev = Mailbox()
+    model.core.bus.attach(dev, 0x10000000)
+    model.load_instructions(b''.join(i.to_bytes(4, 'little') for i in prog))
+
+    model.run(10)
+    assert dev.writes == [(0, 4, 42)]
+    assert model.readReg(7) == 46
@@ -1,14 +1,15 @@
 import pytest
 from pyv.mem import Memory
 from pyv.reg import Reg
-from pyv.clocked import Clock, Clocked, MemList, RegList
+from pyv.clocked import Clocked
+from pyv.context import get_context
 
 
 # A dummy memory
 class Mem(Clocked):
     def __init__(self):
         super().__init__()
-        MemList.add_to_mem_list(self)
+        get_context().mems.add_to_mem_list(self)
         self.val = 0
 
     def _prepare_next_val(self):
@@ -21,13 +22,13 @@ class Mem(Clocked):
         pass
 
 
-def test_init():
+def test_init(ctx):
     reg1 = Reg(int)
     reg2 = Reg(int)
     mem1 = Mem()
     mem2 = Mem()
-    assert RegList._reg_list == [reg1, reg2]
-    assert MemList._mem_list == [mem1, mem2]
+    assert ctx.regs._reg_list == [reg1, reg2]
+    assert ctx.mems._mem_list == [mem1, mem2]
 
 
 def test_abstract_methods():
@@ -38,7 +39,7 @@ def test_abstract_methods():
         _ = Foo()
 
 
-def test_tick():
+def test_tick(ctx):
     reg1 = Reg(int)
     reg2 = Reg(int)
     mem = Mem()
@@ -50,24 +51,36 @@ def test_tick():
     reg2.next.write(45)
     assert mem.val == 0
 
-    Clock.tick()
+    ctx.clock.tick()
     assert reg1.cur.read() == 43
     assert reg2.cur.read() == 45
     assert mem.val == 12
 
 
-def test_clear():
+def test_tick_idle(ctx):
+    reg = Reg(int)
+    reg._init()
+    reg.next.write(43)
+    assert not ctx.clock.tick()
+    assert ctx.clock.tick()
+
+    # Clocked elements without _is_idle() are never idle
+    _ = Mem()
+    assert not ctx.clock.tick()
+
+
+def test_clear(ctx):
     _ = Reg(int)
     _ = Reg(int)
     _ = Mem()
     _ = Mem()
 
-    Clock.clear()
-    assert RegList._reg_list == []
-    assert MemList._mem_list == []
+    ctx.clock.clear()
+    assert ctx.regs._reg_list == []
+    assert ctx.mems._mem_list == []
 
 
-def test_reg_mem_chain(sim):
+def test_reg_mem_chain(sim, ctx):
     reg = Reg(int)
     mem = Memory()
 
@@ -83,5 +96,70 @@ def test_reg_mem_chain(sim):
     mem.write_port.we_i.write(True)
     mem.read_port0.width_i.write(1)
 
-    Clock.tick()
+    ctx.clock.tick()
+    assert mem.mem[0] == 42
+
+
+def test_dirty_regs(ctx):
+    reg1 = Reg(int)
+    reg2 = Reg(int)
+    reg1._init()
+    reg2._init()
+
+    # New registers are dirty
+    assert ctx.regs._dirty == [reg1, reg2]
+    ctx.clock.tick()
+    assert ctx.regs._dirty == []
+
+    # Writing the next value marks a register dirty
+    reg1.next.write(42)
+    reg1.next.write(43)
+    assert ctx.regs._dirty == [reg1]
+
+    # Changing the current value keeps it dirty for one more edge
+    ctx.clock.tick()
+    assert reg1.cur.read() == 43
+    assert ctx.regs._dirty == [reg1]
+    ctx.clock.tick()
+    assert ctx.regs._dirty == []
+
+    # Connected inputs
+    reg3 = Reg(int)
+    reg3._init()
+    reg3.next << reg2.cur
+    ctx.clock.tick()
+    reg2.next.write(5)
+    ctx.clock.tick()
+    assert reg3 in ctx.regs._dirty
+    ctx.clock.tick()
+    assert reg3.cur.read() == 5
+
+
+def test_untracked_always_visited(ctx):
+    mem = Mem()
+    ctx.clock.tick()
+    assert mem.val == 12
+
+    mem.val = 0
+    ctx.clock.tick()
+    assert mem.val == 12
+
+
+def test_dirty_mem(sim, ctx):
+    mem = Memory()
+    mem._init()
+    mem.read_port0.width_i.write(1)
+    mem.write_port.wdata_i.write(42)
+    ctx.clock.tick()
+    assert ctx.mems._dirty == []
+
+    # A pending write keeps the memory dirty
+    mem.write_port.we_i.write(True)
+    assert ctx.mems._dirty == [mem]
+    ctx.clock.tick()
     assert mem.mem[0] == 42
+    assert ctx.mems._dirty == [mem]
+
+    mem.write_port.we_i.write(False)
+    ctx.clock.tick()
+    assert ctx.mems._dirty == []
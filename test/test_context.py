@@ -0,0 +1,80 @@
+import threading
+from pyv.context import SimContext, get_context
+from pyv.models.singlecycle import SingleCycleModel
+from pyv.port import Input
+from pyv.reg import Reg
+from pyv.simulator import Simulator
+from test.test_singlecycle import LOOP_ACC, mem_write_word
+
+
+def loop_acc_model() -> SingleCycleModel:
+    model = SingleCycleModel()
+    for i, inst in enumerate(LOOP_ACC):
+        mem_write_word(model.core, 4 * i, inst)
+    return model
+
+
+def test_with_restores_previous_context(ctx):
+    assert get_context() is ctx
+    with SimContext() as inner:
+        assert get_context() is inner
+        A = Input(int)
+        reg = Reg(int)
+    assert get_context() is ctx
+    assert inner.ports.port_list[0] is A
+    assert inner.regs._reg_list == [reg]
+    assert A not in ctx.ports.port_list
+    assert ctx.regs._reg_list == []
+
+
+def test_simulator_binds_to_context(ctx):
+    with SimContext() as inner:
+        sim = Simulator()
+    assert inner.sim is sim
+    assert ctx.sim is not sim
+
+
+def test_default_context_per_thread(ctx):
+    ctxs = []
+    t = threading.Thread(target=lambda: ctxs.append(get_context()))
+    t.start()
+    t.join()
+    assert ctxs[0] is not ctx
+
+
+def test_models_interleaved():
+    model1 = loop_acc_model()
+    model2 = loop_acc_model()
+    assert model1.ctx is not model2.ctx
+
+    model1.sim.reset()
+    model2.sim.reset()
+    for _ in range(20):
+        model1.sim.run(1, reset_regs=False)
+        model2.sim.run(2, reset_regs=False)
+
+    # model2 has finished the loop already
+    assert model1.get_cycles() == 20
+    assert model2.get_cycles() == 40
+    assert model2.readDataMem(4096, 4) == ['0xa', '0x0', '0x0', '0x0']
+    assert model1.readDataMem(4096, 4) == ['0x0', '0x0', '0x0', '0x0']
+
+    model1.sim.run(20, reset_regs=False)
+    assert model1.readDataMem(4096, 4) == ['0xa', '0x0', '0x0', '0x0']
+
+
+def test_models_in_threads():
+    results = {}
+
+    def run(i):
+        model = loop_acc_model()
+        model.run(40)
+        results[i] = model.readDataMem(4096, 4)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: ['0xa', '0x0', '0x0', '0x0'] for i in range(4)}
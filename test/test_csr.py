@@ -1,6 +1,5 @@
 import pytest
 from pyv import isa
-from pyv.clocked import Clock
 from pyv.csr import CSRBank, CSRBlock, CSRUnit
 from pyv.simulator import Simulator
 
@@ -90,10 +89,10 @@ class TestCSRBank:
 
 
 @pytest.fixture
-def csr_unit() -> CSRUnit:
+def csr_unit(ctx) -> CSRUnit:
     csr_unit = CSRUnit()
     csr_unit._init()
-    Clock.reset()
+    ctx.clock.reset()
     return csr_unit
 
 
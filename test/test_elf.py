@@ -0,0 +1,115 @@
+import struct
+import pytest
+from pyv.elf import STT_FUNC, STT_NOTYPE, STT_OBJECT, ElfFile, Symbol
+from pyv.mem import Memory, PagedMemory
+from pyv.models.singlecycle import SingleCycleModel
+from test.test_singlecycle import LOOP_ACC
+
+
+def make_elf(entry, segments, symbols=()):
+    """Builds an ELF32 RISC-V executable.
+
+    Args:
+        segments: (addr, data, memsz) tuples
+        symbols: (name, addr, size, type) tuples
+    """
+    phoff = 52
+    body = bytearray()
+    offset = phoff + 32 * len(segments)
+    phdrs = b''
+    for addr, data, memsz in segments:
+        phdrs += struct.pack('<IIIIIIII', 1, offset + len(body), addr, addr,
+                             len(data), memsz, 5, 4)
+        body += data
+
+    strtab = b'\0'
+    symtab = bytes(16)
+    for name, addr, size, type in symbols:
+        symtab += struct.pack('<IIIBBH', len(strtab), addr, size, 0x10 | type,
+                              0, 1)
+        strtab += name.encode() + b'\0'
+    # A section symbol, which is skipped
+    symtab += struct.pack('<IIIBBH', 1, 0, 0, 3, 0, 1)
+
+    symoff = offset + len(body)
+    stroff = symoff + len(symtab)
+    shoff = stroff + len(strtab)
+    shdrs = bytes(40)
+    shdrs += struct.pack('<IIIIIIIIII', 0, 2, 0, 0, symoff, len(symtab), 2,
+                         0, 4, 16)
+    shdrs += struct.pack('<IIIIIIIIII', 0, 3, 0, 0, stroff, len(strtab), 0,
+                         0, 1, 0)
+    ehdr = struct.pack('<16sHHIIIIIHHHHHH', b'\x7fELF\x01\x01\x01', 2, 243,
+                       1, entry, phoff, shoff, 0, 52, 32, len(segments), 40,
+                       3, 0)
+    return ehdr + phdrs + bytes(body) + symtab + strtab + shdrs
+
+
+@pytest.fixture
+def elf() -> ElfFile:
+    return ElfFile(make_elf(
+        0x1000,
+        [(0x1000, b'\x13\x00\x00\x00' * 2, 8),
+         (0x2000, b'\x01\x02', 8)],
+        [('_start', 0x1000, 0, STT_NOTYPE),
+         ('main', 0x1004, 4, STT_FUNC),
+         ('buf', 0x2000, 8, STT_OBJECT)]))
+
+
+def test_parse(elf: ElfFile):
+    assert elf.entry == 0x1000
+    segments = [(s.addr, s.size) for s in elf.segments]
+    assert segments == [(0x1000, 8), (0x2000, 8)]
+    assert elf.segments[1].data == b'\x01\x02'
+    assert elf.symbols == {
+        '_start': Symbol('_start', 0x1000, 0, STT_NOTYPE),
+        'main': Symbol('main', 0x1004, 4, STT_FUNC),
+        'buf': Symbol('buf', 0x2000, 8, STT_OBJECT),
+    }
+
+
+def test_lookup(elf: ElfFile):
+    assert elf.lookup(0xfff) is None
+    assert elf.lookup(0x1000).name == '_start'
+    assert elf.lookup(0x1006).name == 'main'
+    assert elf.lookup(0x1008) is None
+    assert elf.lookup(0x2007).name == 'buf'
+
+
+def test_load(ctx, elf: ElfFile):
+    mem = Memory(0x3000)
+    mem.mem[0x2000:0x2010] = b'\xff' * 16
+    elf.load(mem)
+    assert mem.read_bytes(0x1000, 4) == b'\x13\x00\x00\x00'
+    # .bss is zero-filled
+    assert mem.read_bytes(0x2000, 10) == b'\x01\x02' + bytes(6) + b'\xff\xff'
+    with pytest.raises(ValueError):
+        elf.load(Memory(0x1000))
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'\x7fELX' + bytes(60),
+    make_elf(0, [])[:4] + b'\x02' + make_elf(0, [])[5:],
+    make_elf(0, [(0, bytes(8), 8)])[:60],
+])
+def test_invalid(data):
+    with pytest.raises(ValueError):
+        ElfFile(data)
+
+
+def test_model(tmp_path):
+    prog = list(LOOP_ACC)
+    prog[2] = 0x800012b7  # lui x5,0x80001
+    code = b''.join(i.to_bytes(4, 'little') for i in prog)
+    path = tmp_path / 'loop_acc.out'
+    path.write_bytes(make_elf(0x80000000, [(0x80000000, code, len(code))],
+                              [('end', 0x80000020, 0, STT_NOTYPE)]))
+
+    model = SingleCycleModel(mem=PagedMemory)
+    elf = model.load_elf(str(path))
+    model.run(40)
+    assert model.readReg(1) == 10
+    assert model.readPC() == 0x80000020
+    assert elf.lookup(model.readPC()).name == 'end'
+    assert model.readDataMem(0x80001000, 4) == ['0xa', '0x0', '0x0', '0x0']
@@ -76,3 +76,13 @@ def test_feedback(sim: Simulator):
     sim.run(3)
 
     assert dut.OUT.read() == 298
+
+
+def test_feedback_cycle_based(sim: Simulator, init_top):
+    dut = init_top(Top())
+
+    dut.IN.write(4)
+
+    sim.run(3, mode=Simulator.CYCLE_BASED)
+
+    assert dut.OUT.read() == 298
@@ -0,0 +1,169 @@
+import copy
+import pickle
+import pytest
+from pyv.latch import Field, Latch, Struct
+from pyv.port import Input, Output
+from pyv.reg import Reg
+
+
+class Foo_t(Latch):
+    a: int = 0
+    b: bool = False
+
+
+class Bar_t(Foo_t):
+    c: int = 3
+
+
+def test_fields():
+    foo = Foo_t(1)
+    assert foo.a == 1
+    assert foo.b is False
+    assert Foo_t._fields == ('a', 'b')
+    assert Bar_t._fields == ('a', 'b', 'c')
+    assert Bar_t(1, True)._asdict() == {'a': 1, 'b': True, 'c': 3}
+    assert repr(Bar_t(c=5)) == 'Bar_t(a=0, b=False, c=5)'
+
+
+def test_slots():
+    foo = Foo_t()
+    assert not hasattr(foo, '__dict__')
+    assert Bar_t.__slots__ == ('c',)
+
+
+def test_immutable():
+    foo = Foo_t()
+    with pytest.raises(AttributeError):
+        foo.a = 1
+    with pytest.raises(AttributeError):
+        foo.x = 1
+    with pytest.raises(AttributeError):
+        del foo.a
+
+
+def test_eq():
+    foo = Foo_t(1, True)
+    assert foo == foo
+    assert foo == Foo_t(1, True)
+    assert not foo != Foo_t(1, True)
+    assert foo != Foo_t(1, False)
+    assert foo != Foo_t(2, True)
+    # Different types never compare equal
+    assert Bar_t(1, True, 0) != Foo_t(1, True)
+    assert Foo_t() != (0, False)
+
+
+def test_hash():
+    foo = Foo_t(1, True)
+    assert foo._hash is None
+    assert hash(foo) == hash(Foo_t(1, True))
+    assert foo._hash == hash(foo)
+    assert {foo: 1}[Foo_t(1, True)] == 1
+
+
+def test_replace():
+    foo = Foo_t(1, True)
+    bar = foo._replace(b=False)
+    assert bar == Foo_t(1, False)
+    assert foo == Foo_t(1, True)
+    assert bar._hash is None
+    with pytest.raises(TypeError):
+        foo._replace(c=3)
+
+
+def test_copy():
+    foo = Foo_t(1, True)
+    assert copy.copy(foo) is foo
+    assert copy.deepcopy(foo) is foo
+    assert pickle.loads(pickle.dumps(foo)) == foo
+
+
+def test_ports(sim):
+    A = Output(Foo_t)
+    B = Input(Foo_t)
+    B << A
+    assert B.read() == Foo_t()
+
+    val = Foo_t(42)
+    A.write(val)
+    assert B.read() is val
+
+
+def test_reg(sim):
+    reg = Reg(Foo_t)
+    reg._init()
+    val = Foo_t(42)
+    reg.next.write(val)
+    sim.step()
+    # Immutable values are not copied
+    assert reg.cur.read() is val
+
+
+class Pkt_t(Struct):
+    op: int = Field(4)
+    valid: bool = Field(1)
+    off: int = Field(8, default=-1, signed=True)
+
+
+class TestStruct:
+    def test_layout(self):
+        assert Pkt_t._fields == ('op', 'valid', 'off')
+        assert Pkt_t._width == 13
+        assert Pkt_t._layout['valid'].offset == 4
+        assert Pkt_t._layout['off'].mask == 0xff << 5
+
+    def test_fields(self):
+        pkt = Pkt_t(3, True, -2)
+        assert pkt.op == 3
+        assert pkt.valid is True
+        assert pkt.off == -2
+        assert Pkt_t().off == -1
+        assert int(pkt) == 3 | 1 << 4 | 0xfe << 5
+        assert repr(pkt) == 'Pkt_t(op=3, valid=True, off=-2)'
+        assert f'{pkt}' == repr(pkt)
+
+    def test_truncate(self):
+        assert Pkt_t(op=0x13).op == 3
+        assert Pkt_t(off=128).off == -128
+
+    def test_missing_width(self):
+        with pytest.raises(TypeError):
+            class Foo(Struct):
+                a: int = 0
+
+    def test_invalid_width(self):
+        with pytest.raises(ValueError):
+            Field(0)
+
+    def test_eq(self):
+        assert Pkt_t(3) == Pkt_t(3)
+        assert Pkt_t(3) != Pkt_t(4)
+        assert hash(Pkt_t(3)) == hash(Pkt_t(3))
+
+    def test_replace(self):
+        pkt = Pkt_t(3, True, -2)
+        new = pkt._replace(valid=False, off=5)
+        assert type(new) is Pkt_t
+        assert new == Pkt_t(3, False, 5)
+        assert pkt == Pkt_t(3, True, -2)
+        with pytest.raises(TypeError):
+            pkt._replace(foo=1)
+
+    def test_changed(self):
+        pkt = Pkt_t(3, True, -2)
+        assert pkt._changed(pkt) == []
+        assert pkt._changed(pkt._replace(op=4, off=0)) == ['op', 'off']
+
+    def test_copy(self):
+        pkt = Pkt_t(3, True, -2)
+        assert copy.deepcopy(pkt) is pkt
+        new = pickle.loads(pickle.dumps(pkt))
+        assert type(new) is Pkt_t
+        assert new == pkt
+
+    def test_reg(self, sim):
+        reg = Reg(Pkt_t)
+        reg._init()
+        reg.next.write(Pkt_t(5))
+        sim.step()
+        assert reg.cur.read() == Pkt_t(5)
@@ -1,7 +1,6 @@
 import pytest
-from pyv.clocked import MemList
 from pyv.port import Input, Output
-from pyv.mem import Memory
+from pyv.mem import Memory, MemoryBase, PagedMemory
 from pyv.simulator import Simulator
 
 
@@ -14,14 +13,14 @@ def mem() -> Memory:
     return mem
 
 
-def test_MemList():
+def test_MemList(ctx):
     mem = Memory()
-    assert MemList._mem_list == [mem]
+    assert ctx.mems._mem_list == [mem]
 
 
 class TestInit():
     def test_init(self, mem: Memory):
-        assert isinstance(mem.mem, list)
+        assert isinstance(mem.mem, bytearray)
 
     def test_read_port_0(self, mem: Memory):
         rp0 = mem.read_port0
@@ -189,6 +188,15 @@ class TestLoad:
 
 
 class TestStore:
+    def test_is_idle(self, mem: Memory):
+        mem.write_port.we_i.write(False)
+        mem._prepare_next_val()
+        assert mem._is_idle()
+
+        mem.write_port.we_i.write(True)
+        mem._prepare_next_val()
+        assert not mem._is_idle()
+
     def test_store_we_disabled(self, sim: Simulator, mem: Memory):
         mem.write_port.we_i.write(False)
         mem.read_port0.addr_i.write(0)
@@ -244,3 +252,159 @@ class TestStore:
 
         with pytest.raises(Exception):
             sim.step()
+
+
+class TestBuffer:
+    def test_unaligned(self, ctx):
+        mem = Memory(8)
+        mem.mem[0:8] = bytes(range(1, 9))
+        assert mem._read(1, 4) == 0x05040302
+        assert mem._read(3, 2) == 0x0504
+        assert mem._read(4, 4) == 0x08070605
+        # Out of range
+        assert mem._read(6, 4) == 0
+
+    def test_unaligned_store(self, sim: Simulator):
+        mem = Memory(8)
+        mem._init()
+        mem.write_port.we_i.write(True)
+        mem.read_port0.addr_i.write(1)
+        mem.write_port.wdata_i.write(0xaffedead)
+        mem.read_port0.width_i.write(4)
+        sim.step()
+        assert list(mem.mem[0:6]) == [0, 0xad, 0xde, 0xfe, 0xaf, 0]
+
+    def test_odd_size(self, ctx):
+        mem = Memory(7)
+        assert mem._words is None
+        mem.mem[0:4] = [0xef, 0xbe, 0xad, 0xde]
+        assert mem._read(0, 4) == 0xdeadbeef
+
+    def test_load(self, ctx):
+        mem = Memory(8)
+        mem.load(b'\x01\x02', 2)
+        assert list(mem.mem) == [0, 0, 1, 2, 0, 0, 0, 0]
+        assert mem._read(0, 4) == 0x02010000
+        with pytest.raises(ValueError):
+            mem.load(bytes(4), 6)
+        assert len(mem.mem) == 8
+
+
+class TestPaged:
+    def test_lazy_alloc(self, ctx):
+        mem = PagedMemory()
+        assert mem.get_pages() == []
+        assert mem._read(0xfffffffc, 4) == 0
+        assert mem.get_pages() == []
+        mem._write(0xfffffffc, 4, 0xdeadbeef)
+        assert mem._read(-4, 4) == 0xdeadbeef
+        assert mem._read(0xfffffffe, 2) == 0xdead
+        assert mem.get_pages() == [0xfffff000]
+        stats = mem.get_page_stats()
+        assert stats['pages'] == 1
+        assert stats['bytes'] == 4096
+        assert stats['unmapped_reads'] == 1
+        with pytest.raises(AttributeError):
+            mem.mem
+
+    def test_last_page(self, ctx):
+        mem = PagedMemory()
+        mem._write(0x80000000, 4, 1)
+        lookups = mem.get_page_stats()['lookups']
+        for addr in range(0x80000000, 0x80001000, 4):
+            mem._write(addr, 4, addr)
+            assert mem._read(addr, 4) == addr
+        assert mem.get_page_stats()['lookups'] == lookups
+
+    def test_cross_page(self, ctx):
+        mem = PagedMemory()
+        mem._write(0xffe, 4, 0x12345678)
+        assert mem.get_pages() == [0, 0x1000]
+        assert mem._read(0xffe, 4) == 0x12345678
+        assert mem._read(0xfff, 2) == 0x3456
+        assert mem._read(0xffd, 4) == 0x34567800
+        assert mem.read_bytes(0xffe, 4) == b'\x78\x56\x34\x12'
+        with pytest.raises(Exception):
+            mem._read(0xfff, 3)
+        with pytest.raises(Exception):
+            mem._read(0x8000, 3)
+
+    def test_load(self, ctx):
+        mem = PagedMemory()
+        mem.load(bytes(range(1, 9)), 0x2ffc)
+        assert mem.get_pages() == [0x2000, 0x3000]
+        assert mem._read(0x2ffe, 4) == 0x06050403
+        assert mem.read_bytes(0x2ffa, 4) == b'\x00\x00\x01\x02'
+        with pytest.raises(ValueError):
+            mem.load(bytes(8), 0xfffffffc)
+        mem.mem = [0xef, 0xbe, 0xad, 0xde]
+        assert mem.get_pages() == [0]
+        assert mem._read(0, 4) == 0xdeadbeef
+
+    def test_store(self, sim: Simulator):
+        mem = PagedMemory()
+        mem._init()
+        mem.write_port.we_i.write(True)
+        mem.read_port0.addr_i.write(0x80000001)
+        mem.write_port.wdata_i.write(0xaffedead)
+        mem.read_port0.width_i.write(4)
+        sim.step()
+        assert mem.read_bytes(0x80000000, 6) == b'\x00\xad\xde\xfe\xaf\x00'
+
+
+class TestMapped:
+    @pytest.fixture
+    def image(self, tmp_path):
+        path = tmp_path / 'image.bin'
+        path.write_bytes(bytes(range(256)) * 17)  # 4352 bytes, 2 pages
+        return path
+
+    def test_lazy(self, ctx, image):
+        mem = PagedMemory()
+        mem.map_image(str(image), 0x80000000)
+        assert mem.get_pages() == []
+        assert mem._read(0x80000004, 4) == 0x07060504
+        assert mem._read(0x800010fe, 2) == 0xfffe
+        # Beyond the image
+        assert mem._read(0x80001100, 4) == 0
+        assert mem.get_pages() == [0x80000000, 0x80001000]
+        stats = mem.get_page_stats()
+        assert stats['mapped'] == 1
+        assert stats['bytes'] == 4096
+
+    def test_copy_on_write(self, ctx, image):
+        mem = PagedMemory()
+        mem.map_image(str(image))
+        other = PagedMemory()
+        other.map_image(str(image))
+        mem._write(0, 4, 0xdeadbeef)
+        mem.load(b'\xff', 1)
+        assert mem._read(0, 4) == 0xdeadffef
+        assert other._read(0, 4) == 0x03020100
+        assert image.read_bytes()[:4] == bytes(range(4))
+
+    def test_replace(self, ctx, image):
+        mem = PagedMemory()
+        mem._write(0x1000, 4, 0xdeadbeef)
+        mem._write(0x2000, 4, 0xdeadbeef)
+        mem.map_image(str(image), 0x1000)
+        assert mem._read(0x1000, 4) == 0x03020100
+        assert mem._read(0x2000, 4) == 0x03020100
+        assert mem.read_bytes(0x20fe, 4) == b'\xfe\xff\x00\x00'
+
+    def test_invalid(self, ctx, image):
+        mem = PagedMemory()
+        with pytest.raises(ValueError):
+            mem.map_image(str(image), 4)
+        with pytest.raises(ValueError):
+            mem.map_image(str(image), 0xfffff000)
+
+
+class TestMemoryBase:
+    def test_abstract(self):
+        class ReadOnly(MemoryBase):
+            def _read(self, addr, w):
+                return 0
+
+        with pytest.raises(TypeError):
+            ReadOnly('ReadOnly')
@@ -43,12 +43,12 @@ class TestModule:
     def test_port_init(self, modA: ModA):
         modA._init()
         assert modA.A_i._process_method_handler._process_methods == [modA.process]
-        assert modA.B_i._process_method_handler._process_methods == []
+        assert list(modA.B_i._process_method_handler._process_methods) == []
         assert modA.C_i._process_method_handler._process_methods == [modA.foo]
 
     def test_port_init_without_process_method(self, modB: ModB):
         modB._init()
-        assert modB.A_i._process_method_handler._process_methods == []
+        assert list(modB.A_i._process_method_handler._process_methods) == []
 
 
 class TestOnStable:
@@ -71,5 +71,23 @@ class TestOnStable:
     def test_stable_callbacks_are_added_to_sim_on_init(self, sim: Simulator):
         dut = self.DummyModule()
         dut._init()
-        assert dut.stable_callback_1 in sim._stable_callbacks
-        assert dut.stable_callback_2 in sim._stable_callbacks
+        assert dut.stable_callback_1 in sim._ctx.stable_callbacks
+        assert dut.stable_callback_2 in sim._ctx.stable_callbacks
+
+    def test_gated_stable_callbacks(self, sim: Simulator):
+        class GatedModule(Module):
+            def __init__(self):
+                super().__init__()
+                self.A_i = Input(int)
+                self.register_stable_callbacks(
+                    [self.stable_callback], depends_on=[self.A_i])
+
+            def stable_callback(self):
+                pass
+
+        dut = GatedModule()
+        assert dut._stable_callback_deps == [dut.A_i]
+        dut._init()
+        cb = sim._ctx.stable_callbacks[0]
+        assert cb.callback == dut.stable_callback
+        assert cb in dut.A_i._net.watchers
@@ -1,17 +1,28 @@
-from collections import deque
+import logging
 from unittest.mock import MagicMock
 import pytest
-from pyv.port import Constant, Input, Output, PortList, Wire
+from pyv.port import Constant, Input, Output, Wire
+from pyv.latch import Field, Latch, Struct
 from pyv.module import Module
 from pyv.simulator import Simulator
 
 
+class Pair_t(Latch):
+    a: int = 0
+    b: int = 0
+
+
+class PackedPair_t(Struct):
+    a: int = Field(8)
+    b: int = Field(8)
+
+
 class TestPort:
     def test_init(self):
         A = Input(int)
         assert type(A._val) is int
         assert A._val == 0
-        assert A._process_method_handler._process_methods == []
+        assert list(A._process_method_handler._process_methods) == []
 
         A = Output(float)
         assert type(A._val) is float
@@ -72,8 +83,8 @@ class TestPort:
         C.connect(A)
 
         assert A._downstream_inputs == [B]
-        assert B._downstream_inputs == []
-        assert C._downstream_inputs == []
+        assert list(B._downstream_inputs) == []
+        assert list(C._downstream_inputs) == []
 
         #       ┌── E(I)
         # D(O) ─┤
@@ -95,9 +106,124 @@ class TestPort:
         # A(I)─┤                 └── F(O) ── G(I)
         #      └── C(O)
         D.connect(B)
-        assert D._downstream_inputs == []
+        assert list(D._downstream_inputs) == []
         assert A._downstream_inputs == [B, E, G]
 
+    def test_net(self):
+        # Chain A->B and C->D
+        A = Input(int)
+        B = Output(int)
+        C = Input(int)
+        D = Input(int)
+        B.connect(A)
+        D.connect(C)
+        assert B._net is A._net
+        assert D._net is C._net
+        assert C._net is not A._net
+
+        # Now do A->B->C->D: all ports share A's net
+        C.connect(B)
+        assert C._net is A._net
+        assert D._net is A._net
+        assert A._net.root is A
+
+        A.write(42)
+        assert D.read() == 42
+        assert D._val == 42
+
+    def test_compile_net(self, sim: Simulator, ctx):
+        def fooA(): pass
+        def fooB(): pass
+        def fooC(): pass
+
+        #      ┌── B(I) ── C(I)
+        # A(I)─┤
+        #      └── D(I)
+        A = Input(int, [fooA])
+        B = Input(int, [fooB, fooA])
+        C = Input(int, [fooC])
+        D = Input(int, [None])
+        B.connect(A)
+        C.connect(B)
+        D.connect(A)
+        for p in [A, B, C, D]:
+            p._init(None)
+
+        queue = sim._change_queue
+        ctx.ports.compile_nets(queue)
+        net = A._net
+        assert net._queue is queue
+        assert [queue.get_fn(i) for i in net._ids] == [fooA, fooB, fooC]
+
+        # Connecting another input invalidates the listener list
+        def fooE(): pass
+        E = Input(int, [fooE])
+        E._init(None)
+        E.connect(C)
+        assert net._queue is None
+
+        queue.clear()
+        A.write(1)
+        assert list(queue) == [fooA, fooB, fooC, fooE]
+
+    @pytest.mark.parametrize('type_', [Pair_t, PackedPair_t])
+    def test_sensitive_fields(self, sim: Simulator, type_):
+        def fooA(): pass
+        def fooB(): pass
+        def fooC(): pass
+
+        A = Output(type_)
+        B = Input(type_, [fooA, fooB], sensitive_fields={fooA: ['a']})
+        C = Input(type_, [fooC], sensitive_fields={fooC: ['b']})
+        B.connect(A)
+        C.connect(A)
+        for p in [A, B, C]:
+            p._init(None)
+        queue = sim._change_queue
+        queue.clear()
+
+        A.write(type_(a=1))
+        assert list(queue) == [fooB, fooA]
+        queue.clear()
+
+        A.write(type_(a=1, b=2))
+        assert list(queue) == [fooB, fooC]
+        queue.clear()
+
+        A.write(type_(a=2, b=3))
+        assert list(queue) == [fooB, fooA, fooC]
+
+    def test_sensitive_fields_whole_value_wins(self, sim: Simulator):
+        def foo(): pass
+
+        # foo is sensitive to the whole value via C
+        A = Output(Pair_t)
+        B = Input(Pair_t, [foo], sensitive_fields={foo: ['a']})
+        C = Input(Pair_t, [foo])
+        B.connect(A)
+        C.connect(A)
+        for p in [A, B, C]:
+            p._init(None)
+        queue = sim._change_queue
+        queue.clear()
+
+        A.write(Pair_t(b=1))
+        assert list(queue) == [foo]
+
+    def test_sensitive_fields_errors(self):
+        def foo(): pass
+        def bar(): pass
+
+        with pytest.raises(TypeError):
+            Input(int, [foo], sensitive_fields={foo: ['a']})
+        with pytest.raises(ValueError):
+            Input(Pair_t, [foo], sensitive_fields={foo: ['c']})
+        with pytest.raises(ValueError):
+            Input(Pair_t, [foo], sensitive_fields={foo: []})
+        A = Input(Pair_t, [foo], sensitive_fields={bar: ['a']})
+        with pytest.raises(ValueError):
+            A._init(None)
+
     def test_connect(self):
         A = Input(int)
         B = Input(int)
@@ -110,8 +236,8 @@ class TestPort:
         # Check children
         assert A._children == [B]
         assert B._children == [C, D]
-        assert C._children == []
-        assert D._children == []
+        assert list(C._children) == []
+        assert list(D._children) == []
 
         # Check parents
         assert A._parent is None
@@ -143,10 +269,12 @@ class TestPort:
         assert B.read() == 420
         assert C.read() == 420
 
-    def test_connect_shortcut(self):
+    def test_connect_shortcut(self, monkeypatch):
         A = Input(int)
         B = Input(int)
-        connect = A.connect = MagicMock()
+        # Ports have no __dict__, so mock the method on the class
+        connect = MagicMock()
+        monkeypatch.setattr(Input, 'connect', connect)
         A << B
         connect.assert_called_once_with(B)
 
@@ -263,7 +391,7 @@ class TestPort:
 
         p = Input(int, sensitive_methods=[foo, bar])
         p._init(parent=None)
-        assert sim._change_queue == deque([foo, bar])
+        assert list(sim._change_queue) == [foo, bar]
 
     def test_basic_change(self, sim):
         def foo():
@@ -275,7 +403,7 @@ class TestPort:
         p = Input(int, sensitive_methods=[foo, bar])
 
         p.write(42)
-        assert sim._change_queue == deque([foo, bar])
+        assert list(sim._change_queue) == [foo, bar]
 
     def test_downstream_change(self, sim: Simulator):
         def fooA(): pass
@@ -305,7 +433,7 @@ class TestPort:
         D.connect(B)
 
         A.write(42)
-        assert sim._change_queue == deque([fooA, fooB, fooE, fooG])
+        assert list(sim._change_queue) == [fooA, fooB, fooE, fooG]
 
     def test_constant(self):
         c = Constant(42)
@@ -334,21 +462,21 @@ class TestPort:
 
 
 class TestPortList:
-    def test_port_list(self):
-        PortList.clear()
+    def test_port_list(self, ctx):
+        ctx.ports.clear()
         A = Input(int)
         B = Input(int)
         C = Output(int)
         D = Wire(int)
         E = Constant(5)
 
-        assert PortList.port_list == [A, B, C, D, E]
+        assert ctx.ports.port_list == [A, B, C, D, E]
 
-        PortList.clear()
-        assert PortList.port_list == []
+        ctx.ports.clear()
+        assert ctx.ports.port_list == []
 
-    def test_filter(self):
-        PortList.clear()
+    def test_filter(self, ctx):
+        ctx.ports.clear()
         A = Input(int)
         A.name = 'top.mod1.A'
         B = Input(int)
@@ -360,70 +488,67 @@ class TestPortList:
         E = Constant(5)
         E.name = 'top.mod2.sub1.E'
 
-        PortList.filter([
+        ctx.ports.filter([
             'top.mod1'
         ])
-        assert PortList.port_list_filtered == [A, B]
+        assert ctx.ports.port_list_filtered == [A, B]
 
-        PortList.port_list_filtered = []
-        PortList.filter([
+        ctx.ports.port_list_filtered = []
+        ctx.ports.filter([
             'mod2'
         ])
-        assert PortList.port_list_filtered == [C, D, E]
+        assert ctx.ports.port_list_filtered == [C, D, E]
 
-        PortList.port_list_filtered = []
-        PortList.filter([
+        ctx.ports.port_list_filtered = []
+        ctx.ports.filter([
             'mod1.A', 'sub1'
         ])
-        assert PortList.port_list_filtered == [A, E]
+        assert ctx.ports.port_list_filtered == [A, E]
 
-        PortList.port_list_filtered = []
-        PortList.filter([
+        ctx.ports.port_list_filtered = []
+        ctx.ports.filter([
             'mod1.A', 'mod1.A', 'sub1'
         ])
-        assert PortList.port_list_filtered == [A, E]
+        assert ctx.ports.port_list_filtered == [A, E]
 
-        PortList.clear()
-        assert PortList.port_list_filtered == []
+        ctx.ports.clear()
+        assert ctx.ports.port_list_filtered == []
 
-    def test_log_ports(self):
-        PortList.clear()
+    def test_log_ports(self, ctx, caplog):
+        ctx.ports.clear()
         A = Input(int)
         A.name = 'top.mod1.A'
-        A.read = MagicMock()
 
         B = Input(int)
         B.name = 'top.mod1.B'
-        B.read = MagicMock()
 
         C = Output(int)
         C.name = 'top.mod2.C'
-        C.read = MagicMock()
 
         D = Wire(int)
         D.name = 'top.mod2.D'
-        D.read = MagicMock()
 
         E = Constant(5)
         E.name = 'top.mod2.sub1.E'
-        E.read = MagicMock()
+
+        def logged():
+            names = [r.getMessage().split(':')[0] for r in caplog.records]
+            caplog.clear()
+            return names
 
         # First, test logging all ports
-        PortList.log_ports()
-        assert A.read.call_count == 1
-        assert B.read.call_count == 1
-        assert C.read.call_count == 1
-        assert D.read.call_count == 1
-        assert E.read.call_count == 1
+        with caplog.at_level(logging.INFO):
+            ctx.ports.log_ports()
+        assert logged() == [
+            'top.mod1.A', 'top.mod1.B', 'top.mod2.C', 'top.mod2.D',
+            'top.mod2.sub1.E'
+        ]
 
         # Now, filter some ports
-        PortList.port_list_filtered = []
-        PortList.filter([
+        ctx.ports.port_list_filtered = []
+        ctx.ports.filter([
             'mod2'
         ])
-        PortList.log_ports()
-        assert A.read.call_count == 1
-        assert B.read.call_count == 1
-        assert C.read.call_count == 2
-        assert D.read.call_count == 2
-        assert E.read.call_count == 2
+        with caplog.at_level(logging.INFO):
+            ctx.ports.log_ports()
+        assert logged() == ['top.mod2.C', 'top.mod2.D', 'top.mod2.sub1.E']
@@ -1,7 +1,14 @@
 from unittest.mock import MagicMock
 import pytest
-from pyv.reg import Reg, Regfile
-from pyv.clocked import RegList
+from pyv.latch import Latch
+from pyv.port import Wire
+from pyv.module import Module
+from pyv.reg import Reg, RegArray, Regfile
+from pyv.util import COPY_SHALLOW
+
+
+class Foo_t(Latch):
+    a: int = 0
 
 
 @pytest.fixture
@@ -26,48 +33,49 @@ def test_sensitive_methods():
 
     regA = Reg(int)
     regA._init()
-    assert regA.cur._process_method_handler._process_methods == []
+    assert list(regA.cur._process_method_handler._process_methods) == []
 
     regB = Reg(int, sensitive_methods=[foo])
     assert regB.cur._process_method_handler._process_methods == [foo]
 
 
-def test_reg(reg):
-    RegList.reset()
+def test_reg(reg, ctx):
+    ctx.regs.reset()
     assert reg.cur.read() == 0
 
     reg.next.write(0x42)
     assert reg.cur.read() == 0
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg.cur.read() == 0x42
 
     reg.next.write(0x69)
     assert reg.cur.read() == 0x42
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg.cur.read() == 0x69
 
 
-def test_reg_tick(reg):
+def test_reg_tick(reg, ctx, monkeypatch):
     reg.next.write(42)
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg._do_tick == True
     assert reg.cur._val == 42
 
     # Tick again, but as port value is unchanged, register should skip _tick
-    reg.cur.write = MagicMock()
-    RegList.prepare_next_val()
-    RegList.tick()
+    write = MagicMock()
+    monkeypatch.setattr(Wire, 'write', write)
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg._do_tick == False
-    reg.cur.write.assert_not_called()
+    write.assert_not_called()
 
 
-def test_RegList(reg):
-    assert RegList._reg_list == [reg]
+def test_RegList(reg, ctx):
+    assert ctx.regs._reg_list == [reg]
 
 
 def test_regfile():
@@ -109,7 +117,7 @@ def test_regfile():
     assert rf.regs == [0 for _ in range(0, 32)]
 
 
-def test_reg_chain():
+def test_reg_chain(ctx):
     A = Reg(int)
     B = Reg(int)
     C = Reg(int)
@@ -119,12 +127,12 @@ def test_reg_chain():
     B.next.connect(A.cur)
     C.next.connect(B.cur)
     D.next.connect(C.cur)
-    RegList.reset()
+    ctx.regs.reset()
 
     A.next.write(0x42)
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert A.cur.read() == 0x42
     assert B.cur.read() == 0
     assert C.cur.read() == 0
@@ -132,69 +140,274 @@ def test_reg_chain():
 
     A.next.write(0)
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert A.cur.read() == 0
     assert B.cur.read() == 0x42
     assert C.cur.read() == 0
     assert D.cur.read() == 0
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert A.cur.read() == 0
     assert B.cur.read() == 0
     assert C.cur.read() == 0x42
     assert D.cur.read() == 0
 
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert A.cur.read() == 0
     assert B.cur.read() == 0
     assert C.cur.read() == 0
     assert D.cur.read() == 0x42
 
 
-def test_next_value_does_not_propagate():
+def test_next_value_does_not_propagate(ctx):
     A = Reg(list)
     A._init()
 
     foo = [1, 2]
 
     A.next.write(foo)
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
 
     foo[0] = 3
     assert A.cur._val == [1, 2]
 
 
-def test_reset():
+class Shallow(list):
+    _copy_mode = COPY_SHALLOW
+
+
+class Clonable:
+    clones = 0
+
+    def __init__(self, val=0):
+        self.val = val
+
+    def clone(self):
+        Clonable.clones += 1
+        return Clonable(self.val)
+
+    _copy_mode = clone
+
+
+def test_copy_modes(ctx):
+    A = Reg(Foo_t)
+    B = Reg(Shallow)
+    C = Reg(Clonable)
+    for r in [A, B, C]:
+        r._init()
+
+    foo = Foo_t(1)
+    inner = [1]
+    shallow = Shallow([inner])
+    clonable = Clonable(3)
+    A.next.write(foo)
+    B.next.write(shallow)
+    C.next.write(clonable)
+    Clonable.clones = 0
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
+
+    # Immutable values are shared
+    assert A.cur.read() is foo
+    # Shallow copy
+    assert B.cur.read() is not shallow
+    assert B.cur.read()[0] is inner
+    # Custom clone
+    assert Clonable.clones == 1
+    assert C.cur.read() is not clonable
+    assert C.cur.read().val == 3
+
+
+def test_reset(ctx):
     reg1 = Reg(int)
     reg2 = Reg(int, 42)
 
-    RegList.reset()
+    ctx.regs.reset()
 
     assert reg1.cur.read() == 0
     assert reg2.cur.read() == 42
 
 
-def test_sync_reset(reg):
+def test_sync_reset(reg, ctx):
 
     # No reset -> next val
     reg.next.write(42)
     reg.rst.write(0)
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg.cur.read() == 42
 
     # Now assert reset
     reg.rst.write(1)
-    RegList.prepare_next_val()
-    RegList.tick()
+    ctx.regs.prepare_next_val()
+    ctx.regs.tick()
     assert reg.cur.read() == 0
 
     # Throw exception on wrong reset value
     reg.rst.write(44)
     with pytest.raises(Exception, match="Error: Invalid rst signal!"):
-        RegList.prepare_next_val()
-        RegList.tick()
+        ctx.regs.prepare_next_val()
+        ctx.regs.tick()
+
+
+def test_lazy_reset(sim, init_top):
+    class Top(Module):
+        def __init__(self):
+            super().__init__()
+            self.reg = Reg(int, 5)
+            self.reg2 = Reg(int)
+            self.reg2.rst.write(0)
+
+    top = init_top(Top())
+    assert top.reg._rst is None
+    assert top.reg2.rst.name == 'Top.reg2.rst'
+
+    top.reg.next.write(42)
+    sim.step()
+    assert top.reg.cur.read() == 42
+
+    # Allocated after init
+    top.reg.rst.write(1)
+    assert top.reg.rst.name == 'Top.reg.rst'
+    sim.step()
+    assert top.reg.cur.read() == 5
+
+
+def test_is_idle(reg, ctx):
+    reg.next.write(42)
+    ctx.regs.prepare_next_val()
+    assert not reg._is_idle()
+    ctx.regs.tick()
+
+    ctx.regs.prepare_next_val()
+    assert reg._is_idle()
+    ctx.regs.tick()
+
+    # Reset to a different value
+    reg.rst.write(1)
+    ctx.regs.prepare_next_val()
+    assert not reg._is_idle()
+    ctx.regs.tick()
+
+    # Reset again -> value doesn't change
+    ctx.regs.prepare_next_val()
+    assert reg._is_idle()
+
+
+def test_regfile_is_idle():
+    rf = Regfile()
+    assert rf._is_idle()
+
+    rf.write_request(0, 42)
+    assert rf._is_idle()
+
+    rf.write_request(1, 42)
+    assert not rf._is_idle()
+    rf._tick()
+    assert rf._is_idle()
+
+
+def test_regfile_dirty(ctx):
+    rf = Regfile()
+    ctx.regs.take_dirty()
+    assert ctx.regs._dirty == []
+
+    rf.write_request(0, 42)
+    assert ctx.regs._dirty == []
+
+    rf.write_request(3, 42)
+    assert ctx.regs._dirty == [rf]
+
+
+class TestRegArray:
+    def test_init(self, ctx):
+        arr = RegArray(int, 64, 3)
+        assert len(arr) == 64
+        assert arr.vals == [3] * 64
+        # One clocked element, no ports
+        assert ctx.regs._reg_list == [arr]
+        assert ctx.ports.port_list == []
+
+        arr.name = 'arr'
+        out = arr.output(5)
+        arr._init()
+        assert out.name == 'arr[5]'
+        assert out.read() == 3
+
+    def test_write(self, ctx):
+        arr = RegArray(int, 8)
+        ctx.regs.take_dirty()
+        assert arr._is_idle()
+
+        arr.write_request(2, 42)
+        arr.write_request(5, 7)
+        arr.write_request(5, 8)
+        assert ctx.regs._dirty == [arr]
+        assert arr.read(2) == 0
+        assert not arr._is_idle()
+
+        ctx.clock.tick()
+        assert arr.read(2) == 42
+        assert arr.read(5) == 8
+        assert arr._is_idle()
+
+        # Writing the current value is idle
+        arr.write_request(2, 42)
+        assert arr._is_idle()
+
+        with pytest.raises(IndexError):
+            arr.write_request(8, 1)
+
+    def test_copy(self):
+        arr = RegArray(list, 2, [])
+        assert arr.vals[0] is not arr.vals[1]
+        val = [1]
+        arr.write_request(0, val)
+        arr._tick()
+        assert arr.read(0) == val
+        assert arr.read(0) is not val
+
+    def test_output(self, sim, init_top):
+        class Top(Module):
+            def __init__(self):
+                super().__init__()
+                self.arr = RegArray(int, 4)
+                self.out = self.arr.output(1, [self.process])
+                self.calls = 0
+
+            def process(self):
+                self.calls += 1
+
+        top = Top()
+        assert top.arr.output(1) is top.out
+        init_top(top)
+        sim.step()
+        assert top.calls == 1
+
+        # Unsubscribed elements don't trigger anything
+        top.arr.write_request(0, 42)
+        sim.step()
+        sim.step()
+        assert top.calls == 1
+
+        top.arr.write_request(1, 42)
+        sim.step()
+        sim.step()
+        assert top.out.read() == 42
+        assert top.calls == 2
+
+    def test_reset(self, ctx):
+        arr = RegArray(int, 4, 5)
+        out = arr.output(3)
+        arr.write_request(3, 42)
+        arr._tick()
+        assert out.read() == 42
+        arr.write_request(0, 1)
+        arr._reset()
+        assert arr.vals == [5] * 4
+        assert out.read() == 5
+        assert arr._pending == {}
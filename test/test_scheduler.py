@@ -0,0 +1,162 @@
+from pyv.module import Module
+from pyv.port import Input, Output
+from pyv.scheduler import Schedule
+from pyv.simulator import Simulator
+
+
+class Pass(Module):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.A_i = Input(int)
+        self.A_o = Output(int)
+
+    def process(self):
+        self.calls += 1
+        self.A_o.write(self.A_i.read())
+
+
+class Add(Module):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.A_i = Input(int)
+        self.B_i = Input(int)
+        self.A_o = Output(int)
+
+    def process(self):
+        self.calls += 1
+        self.A_o.write(self.A_i.read() + self.B_i.read())
+
+
+class Reconverge(Module):
+    """Two paths of different length that meet again in `add`.
+
+    ```
+         ┌─────────────────┐
+    in ──┤                 ├── add
+         └── p1 ── p2 ─────┘
+    ```
+    """
+    def __init__(self):
+        super().__init__()
+        self.in_o = Output(int)
+        self.add = Add()
+        self.p1 = Pass()
+        self.p2 = Pass()
+
+        # Connect the short path first, so add is queued before p1
+        self.add.A_i << self.in_o
+        self.p1.A_i << self.in_o
+        self.p2.A_i << self.p1.A_o
+        self.add.B_i << self.p2.A_o
+
+
+class Loop(Module):
+    def __init__(self):
+        super().__init__()
+        self.in_o = Output(int)
+        self.add = Add()
+        self.p = Pass()
+
+        self.add.A_i << self.in_o
+        self.add.B_i << self.p.A_o
+        self.p.A_i << self.add.A_o
+
+    def process(self):
+        pass
+
+
+class Peek(Module):
+    """Reads the output of another module without being sensitive to it."""
+    def __init__(self, other: Pass):
+        super().__init__()
+        self.other = other
+        self.A_i = Input(int)
+        self.A_o = Output(int)
+
+    def process(self):
+        self.A_o.write(self.A_i.read() + self.other.A_o.read())
+
+
+class Reference(Module):
+    def __init__(self):
+        super().__init__()
+        self.in_o = Output(int)
+        self.p = Pass()
+        self.peek = Peek(self.p)
+
+        # Connect peek first, so it is queued before p
+        self.peek.A_i << self.in_o
+        self.p.A_i << self.in_o
+
+
+class TestSchedule:
+    def test_ranks(self, sim: Simulator, init_top):
+        dut = init_top(Reconverge())
+        sched = sim._schedule
+
+        assert sched.rank(dut.p1.process) < sched.rank(dut.p2.process)
+        assert sched.rank(dut.p2.process) < sched.rank(dut.add.process)
+        assert not sched.is_feedback(dut.add.process)
+
+    def test_evaluate_once(self, sim: Simulator, init_top):
+        dut = init_top(Reconverge())
+        sim.run_comb_logic()
+        dut.add.calls = 0
+
+        dut.in_o.write(3)
+        sim.run_comb_logic()
+        assert dut.add.A_o.read() == 6
+        assert dut.add.calls == 1
+
+    def test_evaluate_without_schedule(self, sim: Simulator):
+        # Arrival order: add is evaluated before p2 has settled
+        dut = Reconverge()
+        dut.name = 'dut'
+        dut._init()
+        sim.run_comb_logic()
+        dut.add.calls = 0
+
+        dut.in_o.write(3)
+        sim.run_comb_logic()
+        assert dut.add.A_o.read() == 6
+        assert dut.add.calls == 2
+
+    def test_feedback(self, sim: Simulator, init_top):
+        dut = init_top(Loop())
+        sched = sim._schedule
+
+        assert sched.is_feedback(dut.add.process)
+        assert sched.is_feedback(dut.p.process)
+        assert sched.rank(dut.add.process) == sched.rank(dut.p.process)
+        assert not sched.is_feedback(dut.process)
+
+    def test_read_dependency(self, sim: Simulator, init_top):
+        dut = init_top(Reference())
+        sched = sim._schedule
+        assert sched.rank(dut.p.process) < sched.rank(dut.peek.process)
+
+        dut.in_o.write(5)
+        sim.run_comb_logic()
+        assert dut.peek.A_o.read() == 10
+
+    def test_learn(self):
+        def foo(): pass
+        def bar(): pass
+
+        sched = Schedule([foo, bar])
+        sched.add_edge(foo, bar)
+        sched.levelize()
+        assert sched.rank(foo) < sched.rank(bar)
+
+        # Edge matches current ranks -> nothing to do
+        sched.learn(foo, bar)
+        assert not sched.stale
+
+        # Edge contradicts current ranks -> bar and foo form a loop
+        sched.learn(bar, foo)
+        assert sched.stale
+        sched.levelize()
+        assert sched.is_feedback(foo)
+        assert sched.is_feedback(bar)
@@ -0,0 +1,118 @@
+import logging
+from pyv.module import Module
+from pyv.port import Input, Output
+from pyv.sensitivity import ReadTracer
+from pyv.simulator import Simulator
+
+
+class Adder(Module):
+    """Sensitive to `c_i` (never read), but not to `b_i` (read)."""
+    def __init__(self):
+        super().__init__()
+        self.a_i = Input(int, [self.process])
+        self.b_i = Input(int, [None])
+        self.c_i = Input(int, [self.process])
+        self.sum_o = Output(int)
+        self.calls = 0
+
+    def process(self):
+        self.calls += 1
+        self.sum_o.write(self._a() + self.b_i.read())
+
+    def _a(self):
+        # Reads via helpers are attributed to the calling process method
+        return self.a_i.read()
+
+
+class Top(Module):
+    def __init__(self):
+        super().__init__()
+        self.a_i = Input(int)
+        self.b_i = Input(int)
+        self.c_i = Input(int)
+        self.adder = Adder()
+        self.adder.a_i << self.a_i
+        self.adder.b_i << self.b_i
+        self.adder.c_i << self.c_i
+
+
+def test_tracer(ctx):
+    A = Input(int)
+    B = Output(int)
+
+    def foo():
+        A.read()
+
+    with ReadTracer([A, B], [foo]) as tracer:
+        assert type(A) is not Input
+        foo()
+        B.read()
+    assert type(A) is Input
+    assert type(B) is Output
+    assert list(tracer.reads[foo].values()) == [A]
+
+
+def test_report(sim: Simulator, init_top, caplog):
+    top = init_top(Top())
+    with caplog.at_level(logging.INFO):
+        report = sim.infer_sensitivity(5)
+
+    m = top.adder.process
+    assert report.read[m] == [top.adder.a_i, top.adder.b_i]
+    assert report.sensitive[m] == [top.adder.a_i, top.adder.c_i]
+    assert report.missing(m) == [top.adder.b_i]
+    assert report.unused(m) == [top.adder.c_i]
+    assert "reads inputs it is not sensitive to: Top.adder.b_i" in caplog.text
+    assert sim.get_cycles() == 0
+
+
+def test_apply(sim: Simulator, init_top):
+    top = init_top(Top())
+    report = sim.infer_sensitivity(5)
+    report.apply()
+
+    # Unused sensitivities are kept
+    m = top.adder.process
+    assert top.adder.b_i._process_method_handler._process_methods == [m]
+    assert top.adder.c_i._process_method_handler._process_methods == [m]
+
+
+def test_apply_prune(sim: Simulator, init_top):
+    top = init_top(Top())
+    report = sim.infer_sensitivity(5)
+    report.apply(prune=True)
+
+    m = top.adder.process
+    assert top.adder.b_i._process_method_handler._process_methods == [m]
+    assert list(top.adder.c_i._process_method_handler._process_methods) == []
+
+    sim.run(2)
+    calls = top.adder.calls
+    top.b_i.write(2)
+    sim.step()
+    assert top.adder.sum_o.read() == 2
+    top.c_i.write(3)
+    sim.step()
+    assert top.adder.calls == calls + 1
+
+
+def test_state_restored(sim: Simulator, init_top):
+    init_top(Top())
+    sim.run(3)
+    called = []
+    sim.post_event_rel(2, lambda: called.append(sim.get_cycles()))
+    sim.infer_sensitivity(5)
+    assert sim.get_cycles() == 3
+    assert called == []
+    sim.run(3)
+    assert called == [5]
+
+
+def test_write_checks(sim: Simulator, init_top):
+    top = init_top(Top())
+    sim.set_write_checks(2)
+    sim.infer_sensitivity(5)
+    # Write checks were disabled during calibration, and stay disabled
+    assert type(top.a_i)._checked_type is Input
+    assert type(top.a_i).read is Input.read
+    assert type(top.adder.a_i) is Input
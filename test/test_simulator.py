@@ -1,11 +1,10 @@
+import logging
 import pytest
+from pyv.context import SimContext
 from pyv.module import Module
-from pyv.port import Input, Output, PortList, Wire
-from pyv.simulator import Simulator, _EventQueue
+from pyv.port import Constant, Input, Output, Wire
+from pyv.simulator import EventHandle, Simulator, _ChangeQueue, _EventQueue
 from pyv.reg import Reg
-from pyv.clocked import Clock
-from collections import deque
-from queue import PriorityQueue
 from unittest.mock import MagicMock
 
 
@@ -124,9 +123,9 @@ class ExampleTop2(Module):
 
 class TestSimulator:
     def test_init(self, sim: Simulator):
-        assert sim._change_queue == deque([])
+        assert len(sim._change_queue) == 0
         assert sim._cycles == 0
-        assert Simulator.globalSim == sim
+        assert sim._ctx.sim is sim
 
     def test_obj_registry(self, sim: Simulator):
         dut = ExampleTop()
@@ -159,41 +158,41 @@ class TestSimulator:
         dut = ExampleTop()
         dut.name = 'ExampleTop'
         dut._init()
-        PortList.filter = MagicMock()
+        sim._ctx.ports.filter = MagicMock()
         sim.set_probes(['ExampleTop.inA', 'ExampleTop.B1_i'])
-        PortList.filter.assert_called_once_with(['ExampleTop.inA', 'ExampleTop.B1_i'])
+        sim._ctx.ports.filter.assert_called_once_with(['ExampleTop.inA', 'ExampleTop.B1_i'])
 
     def test_queue(self, sim: Simulator):
         dut = ExampleTop()
         dut.name = 'ExampleTop'
         dut._init()
         # Clear pre-populated process queue; we want to test it in isolation here
-        sim._change_queue = deque()
-        Clock.reset()
+        sim._change_queue.clear()
+        sim._ctx.clock.reset()
 
         dut.inA.write(42)
         dut.inB.write(43)
-        assert sim._change_queue == deque([dut.process, dut.A_i.process])
+        assert list(sim._change_queue) == [dut.process, dut.A_i.process]
 
-        fn = sim._change_queue.popleft()
+        fn = sim._change_queue.pop()
         fn()
-        assert sim._change_queue == deque([dut.A_i.process])
+        assert list(sim._change_queue) == [dut.A_i.process]
 
-        fn = sim._change_queue.popleft()
+        fn = sim._change_queue.pop()
         fn()
-        assert sim._change_queue == deque([dut.B1_i.process, dut.B2_i.process])
+        assert list(sim._change_queue) == [dut.B1_i.process, dut.B2_i.process]
 
-        fn = sim._change_queue.popleft()
+        fn = sim._change_queue.pop()
         fn()
-        assert sim._change_queue == deque([dut.B2_i.process, dut.C_i.process])
+        assert list(sim._change_queue) == [dut.B2_i.process, dut.C_i.process]
 
-        fn = sim._change_queue.popleft()
+        fn = sim._change_queue.pop()
         fn()
-        assert sim._change_queue == deque([dut.C_i.process])
+        assert list(sim._change_queue) == [dut.C_i.process]
 
-        fn = sim._change_queue.popleft()
+        fn = sim._change_queue.pop()
         fn()
-        assert sim._change_queue == deque([])
+        assert len(sim._change_queue) == 0
         assert dut.out.read() == 42 + 43
 
     def test_run(self, sim: Simulator):
@@ -202,7 +201,7 @@ class TestSimulator:
         dut._init()
 
         sim._process_events = MagicMock()
-        Clock.reset()
+        sim._ctx.clock.reset()
 
         sim.run(4)
         assert dut.out.read() == -2225
@@ -275,20 +274,421 @@ class TestStep:
         assert foo.comb_o.read() == 40
 
 
+class TestCycleBased:
+    def test_run(self, sim: Simulator, init_top):
+        dut = init_top(ExampleTop2())
+
+        sim.run(4, mode=Simulator.CYCLE_BASED)
+        assert dut.out.read() == -2225
+        assert sim.get_cycles() == 4
+
+    def test_no_notifications(self, sim: Simulator, init_top):
+        dut = init_top(ExampleTop())
+        push_id = sim._change_queue.push_id = MagicMock()
+
+        dut.inA.write(1)
+        push_id.assert_called()
+        push_id.reset_mock()
+
+        sim._set_mode(Simulator.CYCLE_BASED)
+        dut.inA.write(42)
+        dut.inB.write(43)
+        sim.run_comb_logic()
+        push_id.assert_not_called()
+        assert dut.out.read() == 42 + 43
+
+    def test_mode_restored(self, sim: Simulator, init_top):
+        init_top(ExampleTop())
+
+        sim.run(2, mode=Simulator.CYCLE_BASED)
+        assert sim._mode == Simulator.EVENT_DRIVEN
+        assert sim._ctx.notify_enabled
+
+    def test_invalid_mode(self, sim: Simulator):
+        with pytest.raises(ValueError):
+            sim.run(1, mode='foo')
+
+
+class Chain(Module):
+    """Two methods of the same module, connected by a wire."""
+    def __init__(self):
+        super().__init__()
+        self.A_i = Input(int, [self.first])
+        self.w = Wire(int, [self.second])
+        self.A_o = Output(int)
+
+    def second(self):
+        self.A_o.write(self.w.read() * 2)
+
+    def first(self):
+        self.w.write(self.A_i.read() + 1)
+
+
+class HiddenChain(Chain):
+    """Writes the wire in a way the static schedule can't see."""
+    def first(self):
+        getattr(self, 'w').write(self.A_i.read() + 1)
+
+
+class ChainLoop(Module):
+    def __init__(self, chain: Chain):
+        super().__init__()
+        self.chain = chain
+        self.cnt = Reg(int)
+        self.chain.A_i << self.cnt.cur
+        self.cnt.next << self.chain.A_o
+
+
+class TestIntraModule:
+    @pytest.mark.parametrize("mode", [Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED])  # noqa: E501
+    @pytest.mark.parametrize("chain", [Chain, HiddenChain])
+    def test_chain(self, sim: Simulator, init_top, mode, chain):
+        dut = init_top(ChainLoop(chain()))
+
+        sim.run(4, mode=mode)
+        # 0 -> 2 -> 6 -> 14 -> 30
+        assert dut.cnt.cur.read() == 30
+        sched = sim._schedule
+        assert sched.rank(dut.chain.first) < sched.rank(dut.chain.second)
+
+    def test_static_edge(self, sim: Simulator, init_top):
+        dut = init_top(ChainLoop(Chain()))
+        sched = sim._schedule
+        assert sched.rank(dut.chain.first) < sched.rank(dut.chain.second)
+
+
+class Counter(Module):
+    """Counts up to `limit`, then stays there."""
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.calls = 0
+        self.reg = Reg(int, sensitive_methods=[self.process])
+        self.cnt_o = Output(int)
+
+    def process(self):
+        self.calls += 1
+        cnt = self.reg.cur.read()
+        self.reg.next.write(min(cnt + 1, self.limit))
+        self.cnt_o.write(cnt)
+
+
+class TestFastForward:
+    @pytest.mark.parametrize(
+        "mode", [Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED])
+    def test_skip_to_end(self, sim: Simulator, init_top, mode):
+        dut = init_top(Counter(5))
+
+        sim.run(1000, mode=mode)
+        assert sim.get_cycles() == 1000
+        assert dut.cnt_o.read() == 5
+        # Cycles 0..4 count, cycle 5 sees no change in reg
+        assert sim.get_skipped_cycles() == 1000 - 6
+        if mode == Simulator.EVENT_DRIVEN:
+            assert dut.calls == 6
+
+    def test_disabled(self, sim: Simulator, init_top):
+        dut = init_top(Counter(5))
+
+        sim.run(100, fast_forward=False)
+        assert sim.get_cycles() == 100
+        assert dut.cnt_o.read() == 5
+        assert sim.get_skipped_cycles() == 0
+
+    def test_skip_to_event(self, sim: Simulator, init_top):
+        dut = init_top(Counter(5))
+        cycles = []
+
+        def callback():
+            cycles.append(sim.get_cycles())
+            dut.reg.cur.write(0)
+
+        sim.post_event_abs(500, callback)
+        sim.run(1000)
+        assert cycles == [500]
+        assert sim.get_cycles() == 1000
+        assert dut.cnt_o.read() == 5
+        assert sim.get_skipped_cycles() == (500 - 6) + (1000 - 506)
+
+    def test_not_idle(self, sim: Simulator, init_top):
+        init_top(Counter(1000))
+
+        sim.run(100)
+        assert sim.get_skipped_cycles() == 0
+
+
+class TestWriteChecks:
+    def test_checked_by_default(self, sim: Simulator, init_top):
+        dut = init_top(Counter(1000))
+        sim.run(10)
+        with pytest.raises(TypeError):
+            dut.cnt_o.write('foo')
+
+    def test_disable_after(self, sim: Simulator, init_top, caplog):
+        dut = init_top(Counter(1000))
+        sim.set_write_checks(5)
+
+        sim.run(4)
+        assert type(dut.cnt_o) is Output
+        with caplog.at_level(logging.INFO):
+            sim.run(4, reset_regs=False)
+        assert type(dut.cnt_o) is not Output
+        assert isinstance(dut.cnt_o, Output)
+        assert "Validated port writes for 5 cycles" in caplog.text
+        # Simulation continues unaffected
+        assert dut.cnt_o.read() == 8
+        dut.cnt_o.write(42)
+        assert dut.cnt_o.read() == 42
+
+    def test_reenable(self, sim: Simulator, init_top):
+        dut = init_top(Counter(1000))
+        sim.set_write_checks(0)
+        sim.run(1)
+        assert type(dut.cnt_o) is not Output
+        sim.set_write_checks()
+        assert type(dut.cnt_o) is Output
+        with pytest.raises(TypeError):
+            dut.cnt_o.write('foo')
+
+    def test_cycle_based(self, sim: Simulator, init_top):
+        dut = init_top(Counter(1000))
+        sim.set_write_checks(0)
+        sim.run(10, mode=Simulator.CYCLE_BASED, fast_forward=False)
+        assert type(dut.cnt_o) is not Output
+        assert dut.cnt_o.read() == 10
+
+    def test_connect_restores_checks(self, ctx):
+        A = Output(int)
+        B = Input(int)
+        B._set_write_checks(False)
+        assert type(B) is not Input
+        B << A
+        assert type(B) is Input
+
+
+class Scaled(Module):
+    def __init__(self):
+        super().__init__()
+        self.factor_i = Input(int, [self.update_factor])
+        self.val_i = Input(int)
+        self.factor_o = Output(int)
+        self.val_o = Output(int)
+        self.factor_calls = 0
+
+    def update_factor(self):
+        self.factor_calls += 1
+        self.factor_o.write(2 * self.factor_i.read())
+
+    def process(self):
+        self.val_o.write(self.factor_i.read() * self.val_i.read())
+
+
+class ConstTop(Module):
+    def __init__(self):
+        super().__init__()
+        self.val_i = Input(int)
+        self.k = Constant(3)
+        self.dut = Scaled()
+        self.dut.factor_i << self.k
+        self.dut.val_i << self.val_i
+
+
+class TestConstantFolding:
+    def test_fold(self, sim: Simulator, init_top):
+        top = init_top(ConstTop())
+        assert top.k._downstream_inputs == ()
+        assert sim.get_static_methods() == [top.dut.update_factor]
+        assert top.dut.factor_i.read() == 3
+
+    def test_event_driven(self, sim: Simulator, init_top):
+        top = init_top(ConstTop())
+        sim.run(3)
+        assert top.dut.factor_o.read() == 6
+        assert top.dut.factor_calls == 1
+
+        top.val_i.write(5)
+        sim.step()
+        assert top.dut.val_o.read() == 15
+
+    def test_cycle_based(self, sim: Simulator, init_top):
+        top = init_top(ConstTop())
+        top.val_i.write(5)
+        sim.run(10, mode=Simulator.CYCLE_BASED, fast_forward=False)
+        assert top.dut.factor_o.read() == 6
+        assert top.dut.val_o.read() == 15
+        # Only evaluated once per run
+        assert top.dut.factor_calls == 1
+
+
+class TestTrace:
+    def test_off_by_default(self, sim: Simulator, init_top, caplog, monkeypatch):
+        init_top(ExampleTop())
+        log_ports = MagicMock()
+        monkeypatch.setattr(sim._ctx.ports, 'log_ports', log_ports)
+        assert sim.get_trace_level() == Simulator.TRACE_OFF
+
+        sim.run(3)
+        log_ports.assert_not_called()
+        assert "Cycle" not in caplog.text
+
+    def test_info(self, sim: Simulator, init_top, caplog):
+        init_top(ExampleTop())
+        sim.set_trace_level(Simulator.TRACE_INFO)
+
+        sim.run(2, fast_forward=False)
+        assert "**** Cycle 0 ****" in caplog.text
+        assert "**** Cycle 2 ****" in caplog.text
+        assert "ExampleTop.inA: 0" in caplog.text
+
+    def test_probes_enable_tracing(self, sim: Simulator):
+        # Empty probes don't enable tracing
+        sim.set_probes([])
+        assert sim.get_trace_level() == Simulator.TRACE_OFF
+
+        sim.set_probes(['foo'])
+        assert sim.get_trace_level() == Simulator.TRACE_INFO
+
+        # Probes don't lower the level
+        sim.set_trace_level(Simulator.TRACE_DEBUG)
+        sim.set_probes(['foo'])
+        assert sim.get_trace_level() == Simulator.TRACE_DEBUG
+
+    def test_clear(self, sim: Simulator):
+        sim.set_trace_level(Simulator.TRACE_DEBUG)
+        Simulator.clear()
+        assert sim.get_trace_level() == Simulator.TRACE_OFF
+
+    def test_invalid_level(self, sim: Simulator):
+        with pytest.raises(ValueError):
+            sim.set_trace_level(3)
+
+    def test_per_context(self, sim: Simulator, init_top, caplog):
+        init_top(ExampleTop(), 'TopA')
+        with SimContext() as ctx_b:
+            sim_b = Simulator()
+            init_top(ExampleTop(), 'TopB')
+
+        sim.set_probes(['TopA.inA'])
+        assert sim_b.get_trace_level() == Simulator.TRACE_OFF
+
+        sim_b.run(3)
+        assert "Cycle" not in caplog.text
+        assert "TopB" not in caplog.text
+
+        sim.run(1, fast_forward=False)
+        assert "TopA.inA: 0" in caplog.text
+        assert "TopB" not in caplog.text
+
+        # Clearing one context leaves the other one tracing
+        sim_b.set_trace_level(Simulator.TRACE_DEBUG)
+        with ctx_b:
+            Simulator.clear()
+        assert sim_b.get_trace_level() == Simulator.TRACE_OFF
+        assert sim.get_trace_level() == Simulator.TRACE_INFO
+
+
+class TestChangeQueue:
+    def test_register(self):
+        def foo(): pass
+        def bar(): pass
+
+        q = _ChangeQueue()
+        assert q.register(foo) == 0
+        assert q.register(bar) == 1
+        assert q.register(foo) == 0
+        assert q.get_fn(1) == bar
+
+    def test_dedup(self):
+        def foo(): pass
+        def bar(): pass
+
+        q = _ChangeQueue()
+        q.push(foo)
+        q.push(bar)
+        q.push(foo)
+        q.push(foo)
+        assert list(q) == [foo, bar]
+        assert len(q) == 2
+        assert foo in q
+        assert q.num_enqueued == [1, 1]
+        assert q.num_suppressed == [2, 0]
+
+        assert q.pop() == foo
+        assert foo not in q
+        q.push(foo)
+        assert list(q) == [bar, foo]
+        assert q.num_enqueued == [2, 1]
+
+    def test_pop_empty(self):
+        q = _ChangeQueue()
+        with pytest.raises(IndexError):
+            q.pop()
+
+    def test_ranks(self):
+        def foo(): pass
+        def bar(): pass
+        def baz(): pass
+
+        ranks = {foo: 2, bar: 0, baz: 1}
+        q = _ChangeQueue()
+        q.push(foo)
+        q.push(bar)
+        q.push(baz)
+        assert list(q) == [foo, bar, baz]
+
+        # Pending methods get re-ordered
+        q.set_ranks(ranks.get)
+        assert list(q) == [bar, baz, foo]
+        assert q.num_enqueued == [1, 1, 1]
+        assert q.pop() == bar
+        assert q.pop() == baz
+        assert q.pop() == foo
+
+    def test_backedges(self):
+        def foo(): pass
+        def bar(): pass
+
+        ranks = {foo: 0, bar: 1}
+        q = _ChangeQueue()
+        q.set_ranks(ranks.get)
+        q.push(foo)
+        assert q.pop() == foo
+        q.push(bar)
+        assert q.backedges == set()
+        assert q.pop() == bar
+        q.push(foo)
+        assert q.backedges == {(1, 0)}
+
+        q.done()
+        q.pop()
+        q.done()
+        q.push(foo)
+        assert q.backedges == {(1, 0)}
+
+    def test_queue_stats(self, sim: Simulator):
+        def foo(): pass
+
+        p = Input(int, [foo])
+        p.write(1)
+        p.write(2)
+        assert sim.get_queue_stats() == {foo: (1, 1)}
+
+
 class TestEventQueue:
     def test_init(self, eq: _EventQueue):
-        assert isinstance(eq._queue, PriorityQueue)
+        assert eq._get_num_events() == 0
+        assert eq.next_event_time() == -1
 
     def test_add_event(self, eq: _EventQueue):
         def callback():
             pass
 
-        eq.add_event(101, callback)
-        event = eq._queue.get(False)
-        time = event[0]
-        cb = event[2]
-        assert time == 101
-        assert cb == callback
+        handle = eq.add_event(101, callback)
+        assert isinstance(handle, EventHandle)
+        event = eq.get_next_event()
+        assert event is handle
+        assert event.time == 101
+        assert event.callback == callback
 
     def test_add_events_with_same_time(self, eq: _EventQueue):
         callback1 = MagicMock()
@@ -297,7 +697,73 @@ class TestEventQueue:
         eq.add_event(101, callback1)
         eq.add_event(101, callback2)
 
-        assert len(eq._queue.queue) == 2
+        assert eq._get_num_events() == 2
+        assert len(eq._buckets[101]) == 2
+
+    def test_same_time_fifo(self, eq: _EventQueue):
+        callbacks = [MagicMock() for _ in range(5)]
+        for cb in callbacks:
+            eq.add_event(7, cb)
+        eq.add_event(3, None)
+
+        assert eq.get_next_event().time == 3
+        assert [eq.get_next_event().callback for _ in range(5)] == callbacks
+
+    def test_cancel(self, eq: _EventQueue):
+        cb1 = MagicMock()
+        cb2 = MagicMock()
+        h1 = eq.add_event(5, cb1)
+        eq.add_event(5, cb2)
+        h3 = eq.add_event(8, None)
+
+        h1.cancel()
+        assert h1.cancelled
+        assert eq._get_num_events() == 2
+        assert eq.get_next_event().callback == cb2
+
+        # Cancelling twice has no effect
+        h1.cancel()
+        assert eq._get_num_events() == 1
+
+        h3.cancel()
+        assert eq._get_num_events() == 0
+        assert eq.next_event_time() == -1
+
+    def test_cancel_triggered_event(self, eq: _EventQueue):
+        h = eq.add_event(5, None)
+        eq.add_event(6, None)
+        eq.get_next_event()
+
+        h.cancel()
+        assert eq._get_num_events() == 1
+        assert eq.next_event_time() == 6
+
+    def test_reuse_cancelled_time(self, eq: _EventQueue):
+        eq.add_event(5, None).cancel()
+        eq.add_event(5, None)
+        assert eq.next_event_time() == 5
+        eq.get_next_event()
+        assert eq.next_event_time() == -1
+
+    def test_periodic(self, eq: _EventQueue):
+        h = eq.add_event(4, None, period=10)
+        eq.add_event(20, None)
+
+        times = [eq.next_event_time()]
+        assert eq.get_next_event() is h
+        times.append(eq.next_event_time())
+        assert eq.get_next_event() is h
+        times.append(eq.next_event_time())
+        assert eq.get_next_event() is not h
+        times.append(eq.next_event_time())
+        assert times == [4, 14, 20, 24]
+
+        h.cancel()
+        assert eq.next_event_time() == -1
+
+    def test_invalid_period(self, eq: _EventQueue):
+        with pytest.raises(Exception):
+            eq.add_event(1, None, period=-1)
 
     def test_add_negative_time_event(self, eq: _EventQueue):
         with pytest.raises(Exception):
@@ -308,9 +774,9 @@ class TestEventQueue:
         eq.add_event(20, None)
         eq.add_event(3, None)
 
-        assert eq.get_next_event()[0] == 1
-        assert eq.get_next_event()[0] == 3
-        assert eq.get_next_event()[0] == 20
+        assert eq.get_next_event().time == 1
+        assert eq.get_next_event().time == 3
+        assert eq.get_next_event().time == 20
 
     def test_next_event_time(self, eq: _EventQueue):
         eq.add_event(42, None)
@@ -348,7 +814,7 @@ class TestEvents:
 
         add_event = sim._event_queue.add_event = MagicMock()
         sim.post_event_abs(1024, callback)
-        add_event.assert_called_once_with(1024, callback)
+        add_event.assert_called_once_with(1024, callback, 0)
 
     def test_add_event_relative(self, sim: Simulator):
         def callback():
@@ -356,7 +822,7 @@ class TestEvents:
         sim._cycles = 100
         add_event = sim._event_queue.add_event = MagicMock()
         sim.post_event_rel(42, callback)
-        add_event.assert_called_once_with(142, callback)
+        add_event.assert_called_once_with(142, callback, 0)
 
     def test_process_events(self, sim: Simulator):
         callback1 = MagicMock()
@@ -396,6 +862,27 @@ class TestEvents:
         callback4.assert_called_once()
         assert sim._event_queue.next_event_time() == -1
 
+    def test_periodic_event(self, sim: Simulator):
+        cb = MagicMock()
+        cb.__qualname__ = "cb"
+        handle = sim.post_event_abs(3, cb, period=4)
+
+        sim.run(12)
+        assert cb.call_count == 3  # Cycles 3, 7 and 11
+
+        handle.cancel()
+        sim.run(10, reset_regs=False)
+        assert cb.call_count == 3
+
+    def test_cancel_event(self, sim: Simulator):
+        cb = MagicMock()
+        cb.__qualname__ = "cb"
+        handle = sim.post_event_rel(5, cb)
+        handle.cancel()
+
+        sim.run(10)
+        cb.assert_not_called()
+
     def test_invalid_event_time(self, sim: Simulator):
         sim._cycles = 10
         with pytest.raises(Exception):
@@ -409,19 +896,61 @@ class TestOnStable:
     def test_stable_callbacks_are_triggered_during_cycle(self, sim: Simulator):
         cb1 = MagicMock()
         cb2 = MagicMock()
-        Simulator._stable_callbacks = [cb1, cb2]
+        sim._ctx.stable_callbacks = [cb1, cb2]
         sim._cycle()
         cb1.assert_called_once()
         cb2.assert_called_once()
 
     def test_stable_callbacks_are_cleared_on_sim_clear(self, sim: Simulator):
         sim.clear()
-        assert Simulator._stable_callbacks == []
+        assert sim._ctx.stable_callbacks == []
 
     def test_register_stable_callback(self, sim: Simulator):
         cb1 = MagicMock()
         cb2 = MagicMock()
         cb3 = MagicMock()
-        Simulator._stable_callbacks = [cb1, cb2]
+        sim._ctx.stable_callbacks = [cb1, cb2]
         Simulator.register_stable_callback(cb3)
-        assert Simulator._stable_callbacks == [cb1, cb2, cb3]
+        assert sim._ctx.stable_callbacks == [cb1, cb2, cb3]
+
+    def test_gated_stable_callback(self, sim: Simulator):
+        cb_gated = MagicMock()
+        cb = MagicMock()
+        A = Input(int)
+        B = Output(int)
+        A << B
+        Simulator.register_stable_callback(cb_gated, depends_on=[A])
+        Simulator.register_stable_callback(cb)
+
+        # Gated callbacks always run in the first cycle
+        sim._cycle()
+        sim._cycle()
+        assert cb_gated.call_count == 1
+        assert cb.call_count == 2
+
+        B.write(42)
+        sim._cycle()
+        sim._cycle()
+        assert cb_gated.call_count == 2
+        assert cb.call_count == 4
+
+        # Same value -> no change
+        B.write(42)
+        sim._cycle()
+        assert cb_gated.call_count == 2
+
+    def test_gated_stable_callback_constant(self, sim: Simulator):
+        cb = MagicMock()
+        A = Input(int)
+        B = Output(int)
+        A << B
+        C = Constant(3)
+        Simulator.register_stable_callback(cb, depends_on=[C, A])
+
+        sim._cycle()
+        sim._cycle()
+        assert cb.call_count == 1
+
+        B.write(42)
+        sim._cycle()
+        assert cb.call_count == 2
@@ -1,8 +1,22 @@
 import pytest
 
-from pyv.models.singlecycle import SingleCycle
+from pyv.mem import PagedMemory
+from pyv.models.singlecycle import SingleCycle, SingleCycleModel
 from pyv.simulator import Simulator
 
+# programs/loop_acc (counting to 10 only)
+LOOP_ACC = [
+    0x00001137,  # li sp,4096
+    0x0040006f,  # j main
+    0x000012b7,  # lui x5,1
+    0x00a00113,  # li x2,10
+    0x00000093,  # li x1,0
+    0x00108093,  # addi x1,x1,1
+    0xfe209ee3,  # bne x1,x2,loop
+    0x0012a023,  # sw x1,0(x5)
+    0x0000006f,  # j end
+]
+
 
 @pytest.fixture
 def core() -> SingleCycle:
@@ -120,6 +134,20 @@ class TestCSR:
         assert core.regf.regs[5] == 0x4000_0100
         assert core.csr_unit.read(0x301) == 0x4000_0100
 
+    @pytest.mark.parametrize("mode", [Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED])
+    def test_csr_read_after_write(self, sim: Simulator, init_top, mode):
+        # Use the static schedule
+        core = init_top(SingleCycle(), 'core')
+        sim.reset()
+
+        # csrrwi x0, misa, 26
+        # csrrs x5, misa, x0
+        mem_write_word(core, 0, 0x301d5073)
+        mem_write_word(core, 4, 0x301022f3)
+        mem_write_word(core, 8, 0x13)
+        sim.run(3, False, mode)
+        assert core.regf.regs[5] == 26
+
 
 class TestExceptions:
     def test_ecall(self, sim: Simulator, core: SingleCycle):
@@ -153,3 +181,62 @@ class TestExceptions:
         mem_write_word(core, 16, nop)
         sim.run(3, False)
         assert core.pc.read() == mepc
+
+
+@pytest.mark.parametrize("mode", [Simulator.EVENT_DRIVEN, Simulator.CYCLE_BASED])
+def test_loop_acc(mode):
+    model = SingleCycleModel()
+    for i, inst in enumerate(LOOP_ACC):
+        mem_write_word(model.core, 4 * i, inst)
+
+    model.run(40, mode=mode)
+    assert model.get_cycles() == 40
+    assert model.readReg(1) == 10
+    assert model.readReg(2) == 10
+    assert model.readReg(5) == 4096
+    assert model.readPC() == 0x20
+    assert model.readDataMem(4096, 4) == ['0xa', '0x0', '0x0', '0x0']
+
+
+def test_loop_acc_fast_forward():
+    model = SingleCycleModel()
+    for i, inst in enumerate(LOOP_ACC):
+        mem_write_word(model.core, 4 * i, inst)
+
+    # The program ends in an endless loop (`j end`), so the core becomes
+    # quiescent after 28 cycles
+    model.run(100000)
+    assert model.get_cycles() == 100000
+    assert model.sim.get_skipped_cycles() == 100000 - 28
+    assert model.readReg(1) == 10
+    assert model.readPC() == 0x20
+    assert model.readDataMem(4096, 4) == ['0xa', '0x0', '0x0', '0x0']
+
+
+def test_loop_acc_paged():
+    model = SingleCycleModel(mem=PagedMemory)
+    prog = list(LOOP_ACC)
+    prog[2] = 0x800012b7  # lui x5,0x80001
+    model.load_instructions(b''.join(i.to_bytes(4, 'little') for i in prog))
+
+    model.run(40)
+    assert model.readReg(1) == 10
+    assert model.readPC() == 0x20
+    assert model.readDataMem(0x80001000, 4) == ['0xa', '0x0', '0x0', '0x0']
+    assert model.core.mem.get_pages() == [0, 0x80001000]
+
+
+def test_load_binary_mapped(tmp_path):
+    path = tmp_path / 'loop_acc.bin'
+    prog = b''.join(i.to_bytes(4, 'little') for i in LOOP_ACC)
+    # Pad to a full page, as partial pages are copied
+    path.write_bytes(prog.ljust(4096, b'\0'))
+    model = SingleCycleModel(mem=PagedMemory)
+    model.load_binary(str(path))
+    assert model.core.mem.get_pages() == []
+
+    model.run(40)
+    assert model.readReg(1) == 10
+    assert model.readDataMem(4096, 4) == ['0xa', '0x0', '0x0', '0x0']
+    assert model.core.mem.get_page_stats()['mapped'] == 1
+    assert path.read_bytes()[:4] == (0x00001137).to_bytes(4, 'little')
@@ -796,6 +796,19 @@ class TestEXStage:
         assert out.csr_write_en == True
         assert out.csr_read_val == 45
 
+    def test_sensitive_fields(self, sim: Simulator, ex: EXStage):
+        sim.step()
+
+        # Only pass_through() cares about rd
+        sim._change_queue.clear()
+        ex.IDEX_i.write(IDEX_t(rd=1))
+        assert list(sim._change_queue) == [ex.pass_through]
+
+        # Only process() cares about imm
+        sim._change_queue.clear()
+        ex.IDEX_i.write(IDEX_t(rd=1, imm=4))
+        assert list(sim._change_queue) == [ex.process]
+
     def test_alu(self, ex: EXStage):
         # LUI
         res = ex.alu(0b01101, 0, 0, 0x41AF3000, 0, 0, 0)
@@ -1775,6 +1788,17 @@ class TestMEMStage:
         assert out.csr_write_en == True
         assert out.csr_write_val == 34
 
+    def test_ignores_take_branch(self, mem_stage, sim):
+        mem_stage._init()
+        sim.step()
+
+        sim._change_queue.clear()
+        mem_stage.EXMEM_i.write(EXMEM_t(take_branch=True))
+        assert mem_stage.process not in list(sim._change_queue)
+
+        mem_stage.EXMEM_i.write(EXMEM_t(take_branch=True, rd=1))
+        assert mem_stage.process in list(sim._change_queue)
+
     def test_load(self, mem_stage, sim):
         mem_stage._init()
 
@@ -1860,7 +1884,7 @@ class TestMEMStage:
             funct3=1  # sh
         ))
         sim.step()
-        assert mem.mem[0:2] == [0xbe, 0xba]
+        assert list(mem.mem[0:2]) == [0xbe, 0xba]
 
         # SW
         mem_stage.EXMEM_i.write(EXMEM_t(
@@ -1870,7 +1894,7 @@ class TestMEMStage:
             funct3=2  # sw
         ))
         sim.step()
-        assert mem.mem[0:4] == [0xbe, 0xba, 0xad, 0xab]
+        assert list(mem.mem[0:4]) == [0xbe, 0xba, 0xad, 0xab]
 
     def test_exception(self, mem_stage, caplog, sim):
         mem_stage._init()
@@ -1982,19 +2006,19 @@ class TestWBStage:
         )
 
         # ALU op
-        val.wb_sel = 0
+        val = val._replace(wb_sel=0)
         wb.MEMWB_i.write(val)
         sim.step()
         assert wb.regfile.read(25) == 1234
 
         # PC+4 (JAL)
-        val.wb_sel = 1
+        val = val._replace(wb_sel=1)
         wb.MEMWB_i.write(val)
         sim.step()
         assert wb.regfile.read(25) == 1234
 
         # Memory load
-        val.wb_sel = 2
+        val = val._replace(wb_sel=2)
         wb.MEMWB_i.write(val)
         sim.step()
         assert wb.regfile.read(25) == 1234
@@ -1,5 +1,7 @@
 import pytest
-from pyv.util import VContainer, get_bit, get_bits, get_bit_vector, VMap, PyVObj, VArray
+import copy
+from pyv.util import VContainer, get_bit, get_bits, get_bit_vector, VMap, PyVObj, VArray, pyv_attrs
+from pyv.util import COPY_DEEP, COPY_SHALLOW, COPY_SHARED, get_copy_fn, register_copy_mode
 from unittest.mock import MagicMock
 from pyv.module import Module
 from pyv.port import Input
@@ -26,14 +28,68 @@ def test_get_bit_vector():
         assert get_bit_vector(0x39, 4) == [1, 0, 0, 1]
 
 
+class TestCopyMode:
+    def test_builtin(self):
+        assert get_copy_fn(int) is None
+        assert get_copy_fn(bool) is None
+        assert get_copy_fn(list) is copy.deepcopy
+
+    def test_class_attr(self):
+        class Foo:
+            _copy_mode = COPY_SHALLOW
+
+        class Bar:
+            _copy_mode = 'foo'
+
+        assert get_copy_fn(Foo) is copy.copy
+        with pytest.raises(ValueError):
+            get_copy_fn(Bar)
+
+    def test_register(self):
+        class Foo:
+            _copy_mode = COPY_DEEP
+
+        register_copy_mode(Foo, COPY_SHARED)
+        assert get_copy_fn(Foo) is None
+
+        def clone(val):
+            return val
+        register_copy_mode(Foo, clone)
+        assert get_copy_fn(Foo) is clone
+
+        with pytest.raises(ValueError):
+            register_copy_mode(Foo, 'foo')
+
+
+class Obj(PyVObj):
+    """PyVObj with a `__dict__`, so methods can be mocked."""
+
+
+def test_pyv_attrs():
+    class Slotted(PyVObj):
+        __slots__ = ('a', 'b')
+
+    class Mixed(Slotted):
+        pass
+
+    obj = Mixed()
+    obj.a = Obj()
+    obj.b = 42
+    obj.c = Obj()
+    assert not hasattr(Slotted(), '__dict__')
+    assert pyv_attrs(obj) == [('a', obj.a), ('c', obj.c)]
+    # Unset slots are skipped
+    assert pyv_attrs(Slotted()) == []
+
+
 class TestVContainer:
     class DUT_Container(VContainer):
         def __init__(self):
             super().__init__()
 
-            self.obj1 = PyVObj()
+            self.obj1 = Obj()
             self.obj1._init = MagicMock()
-            self.obj2 = PyVObj()
+            self.obj2 = Obj()
             self.obj2._init = MagicMock()
             self.A_i = Input(int)
 
@@ -47,7 +103,7 @@ class TestVContainer:
         assert con._visited == True
 
     def test_init_parent_passthrough(self, con: DUT_Container):
-        parent = PyVObj()
+        parent = Obj()
         con._init(parent)
         con.obj1._init.assert_called_once_with(parent)
         con.obj2._init.assert_called_once_with(parent)
@@ -77,9 +133,9 @@ class TestVContainer:
 class TestVMap:
     @pytest.fixture
     def map(self) -> VMap:
-        obj1 = PyVObj()
+        obj1 = Obj()
         obj1._init = MagicMock()
-        obj2 = PyVObj()
+        obj2 = Obj()
         obj2._init = MagicMock()
         map_ = VMap({'foo': obj1, 'bar': obj2})
         return map_
@@ -110,12 +166,12 @@ class TestVMap:
 
     def test_init_subobj_naming_int_key(self, map: VMap):
         map.name = "alpha.map"
-        map._elems[42] = PyVObj()
+        map._elems[42] = Obj()
         map._init(None)
         assert map._elems[42].name == 'alpha.map.42'
 
     def test_init_parent_passthrough(self, map: VMap):
-        parent = PyVObj()
+        parent = Obj()
         map._init(parent)
         map._elems['foo']._init.assert_called_once_with(parent)
         map._elems['bar']._init.assert_called_once_with(parent)
@@ -151,9 +207,9 @@ class TestVMap:
 class TestVArray:
     @pytest.fixture
     def arr(self) -> VArray:
-        obj1 = PyVObj()
+        obj1 = Obj()
         obj1._init = MagicMock()
-        obj2 = PyVObj()
+        obj2 = Obj()
         obj2._init = MagicMock()
         arr_ = VArray(obj1, obj2)
         return arr_
@@ -179,7 +235,7 @@ class TestVArray:
         assert arr._elems[1].name == 'alpha.arr[1]'
 
     def test_init_parent_passthrough(self, arr: VArray):
-        parent = PyVObj()
+        parent = Obj()
         arr._init(parent)
         arr._elems[0]._init.assert_called_once_with(parent)
         arr._elems[1]._init.assert_called_once_with(parent)